@@ -0,0 +1,56 @@
+# Auth dependency overhead per request.
+# Times get_current_user + require_teacher on the same cookie, the way a
+# dashboard burst hits them, with the verified-claims cache off and on, for
+# each JWT backend that is installed:
+#   python bench/bench_auth.py
+# Exits non-zero when the warm cache is not faster than decoding every time.
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+from utils import security
+from utils.security import create_access_token
+from dependencies.auth import get_current_user, require_teacher
+
+BENCH_REQUESTS = int(os.getenv("BENCH_REQUESTS", "20000"))
+
+
+def _request(token: str) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/",
+        "headers": [(b"cookie", f"access_token={token}".encode())], "query_string": b""
+    })
+
+
+async def _per_request_us(token: str) -> float:
+    request = _request(token)
+    started = time.perf_counter()
+    for _ in range(BENCH_REQUESTS):
+        require_teacher(await get_current_user(request))
+    return (time.perf_counter() - started) / BENCH_REQUESTS * 1e6
+
+
+def main() -> int:
+    token = create_access_token({"sub": "user-1", "role": "teacher"})
+    cache_size = security.JWT_CACHE_SIZE
+    backends = ["jose"] + (["pyjwt"] if security.pyjwt is not None else [])
+    results = {}
+    for backend in backends:
+        security.JWT_BACKEND = backend
+        security._claims_cache.clear()
+        security.JWT_CACHE_SIZE = 0
+        results[(backend, "off")] = asyncio.run(_per_request_us(token))
+        security.JWT_CACHE_SIZE = cache_size
+        results[(backend, "on")] = asyncio.run(_per_request_us(token))
+
+    for (backend, cache), us in results.items():
+        print(f"backend={backend} cache={cache} {us:.1f}us/request")
+    return 0 if all(results[(b, "on")] < results[(b, "off")] for b in backends) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
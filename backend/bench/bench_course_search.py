@@ -0,0 +1,89 @@
+# Course prefix-search benchmark.
+# Seeds a throwaway database on MONGO_URI with BENCH_COURSES courses, then times
+# the autocomplete query searchCoursesController(mode="prefix") runs:
+#   MONGO_URI=... python bench/bench_course_search.py
+# Exits non-zero when p99 latency is above BENCH_TARGET_MS.
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import DBRef, ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from controllers.courseController import _courseSearchQuery
+from models.courseModel import Course
+from utils.text import normalize_text
+
+load_dotenv()
+
+BENCH_COURSES = int(os.getenv("BENCH_COURSES", "100000"))
+BENCH_QUERIES = int(os.getenv("BENCH_QUERIES", "2000"))
+BENCH_TARGET_MS = float(os.getenv("BENCH_TARGET_MS", "10"))
+PAGE = 10
+
+
+def _title(rng: random.Random) -> str:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(2, 5))]
+    return " ".join(words).capitalize()
+
+
+def _seed(collection, rng: random.Random):
+    collection.create_indexes(list(Course.Settings.indexes))
+    teacher = DBRef("users", ObjectId())
+    batch = []
+    for _ in range(BENCH_COURSES):
+        title = _title(rng)
+        batch.append({
+            "title": title,
+            "title_normalized": normalize_text(title),
+            "description": "Benchmark course description",
+            "thumbnail": "",
+            "teacher": teacher,
+            "created_at": datetime.utcnow()
+        })
+        if len(batch) == 10000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def main() -> int:
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        print("MONGO_URI is not set", file=sys.stderr)
+        return 2
+    client = MongoClient(uri)
+    name = f"liplearn_bench_{uuid.uuid4().hex[:12]}"
+    collection = client[name]["courses"]
+    rng = random.Random(42)
+    try:
+        _seed(collection, rng)
+        prefixes = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 4))) for _ in range(BENCH_QUERIES)]
+        timings = []
+        for q in prefixes:
+            started = time.perf_counter()
+            list(_courseSearchQuery(collection, q, mode="prefix", limit=PAGE))
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        client.drop_database(name)
+        client.close()
+
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"courses={BENCH_COURSES} queries={len(timings)} "
+        f"p50={statistics.median(timings):.2f}ms p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms p99={p99:.2f}ms"
+    )
+    return 0 if p99 <= BENCH_TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
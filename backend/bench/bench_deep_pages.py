@@ -0,0 +1,102 @@
+# Deep-page latency: skip/limit versus keyset cursors.
+# Seeds a throwaway database on MONGO_URI with BENCH_COURSES courses, then times
+# the course listing query as getAllCoursesController runs it, at growing page
+# numbers, once with skip and once with a cursor pointing at the same page:
+#   MONGO_URI=... python bench/bench_deep_pages.py
+# Exits non-zero when the deepest cursor page is over BENCH_MAX_RATIO times the first.
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import DBRef, ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from controllers.courseController import COURSE_LIST_PROJECTION, LIST_SORT
+from models.courseModel import Course
+from utils.pagination import after_cursor, encode_cursor
+
+load_dotenv()
+
+BENCH_COURSES = int(os.getenv("BENCH_COURSES", "200000"))
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+BENCH_MAX_RATIO = float(os.getenv("BENCH_MAX_RATIO", "3"))
+PAGE = 10
+PAGES = [1, 10, 100, 1000, 10000]
+
+
+def _seed(collection):
+    collection.create_indexes(list(Course.Settings.indexes))
+    teacher = DBRef("users", ObjectId())
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(BENCH_COURSES):
+        batch.append({
+            "title": f"Course {i}",
+            "title_normalized": f"course {i}",
+            "description": "Benchmark course description",
+            "thumbnail": "",
+            "teacher": teacher,
+            "created_at": start + timedelta(seconds=i // 4)  # ties exercise the _id tiebreak
+        })
+        if len(batch) == 10000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def _time(run) -> float:
+    timings = []
+    for _ in range(BENCH_REPEAT):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        print("MONGO_URI is not set", file=sys.stderr)
+        return 2
+    client = MongoClient(uri)
+    name = f"liplearn_bench_{uuid.uuid4().hex[:12]}"
+    collection = client[name]["courses"]
+    results = []
+    try:
+        _seed(collection)
+        for page in [p for p in PAGES if (p - 1) * PAGE < BENCH_COURSES]:
+            skip = (page - 1) * PAGE
+
+            def by_skip():
+                return list(collection.find({}, COURSE_LIST_PROJECTION).sort(LIST_SORT).skip(skip).limit(PAGE + 1))
+
+            # The cursor a client holds after walking to this page
+            query = {}
+            if skip:
+                last = collection.find({}, {"created_at": 1}).sort(LIST_SORT).skip(skip - 1).limit(1).next()
+                query = after_cursor(encode_cursor(last["created_at"], last["_id"]))
+
+            def by_cursor():
+                return list(collection.find(query, COURSE_LIST_PROJECTION).sort(LIST_SORT).limit(PAGE + 1))
+
+            assert [row["_id"] for row in by_skip()] == [row["_id"] for row in by_cursor()]
+            results.append((page, _time(by_skip), _time(by_cursor)))
+    finally:
+        client.drop_database(name)
+        client.close()
+
+    for page, skip_ms, cursor_ms in results:
+        print(f"page={page} skip={skip_ms:.2f}ms cursor={cursor_ms:.2f}ms")
+    ratio = results[-1][2] / max(results[0][2], 0.01)
+    print(f"courses={BENCH_COURSES} deepest/first cursor ratio={ratio:.2f}")
+    return 0 if ratio <= BENCH_MAX_RATIO else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# Course list serialization throughput: Document hydration versus projected rows.
+# Builds BENCH_PAGE_SIZE stored course documents in memory and serializes the
+# page the way the listing used to (Course documents -> CourseResponse) and the
+# way getAllCoursesController does now (projected rows -> response dicts).
+# Beanie needs a database to initialise its models, so MONGO_URI must be set;
+# nothing is written to it and no query is timed:
+#   MONGO_URI=... python bench/bench_list_serialization.py
+# Exits non-zero when the projected path is slower than the hydrated one.
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import DBRef, ObjectId
+from dotenv import load_dotenv
+from controllers.courseController import COURSE_LIST_PROJECTION, _courseListItem, _teacherSummaryItem
+from models.courseModel import Course
+from schemas.courseSchema import CourseListResponse, CourseResponse
+
+load_dotenv()
+
+BENCH_PAGE_SIZE = int(os.getenv("BENCH_PAGE_SIZE", "1000"))
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+
+def _rows() -> list:
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(BENCH_PAGE_SIZE):
+        teacher_id = ObjectId()
+        rows.append({
+            "_id": ObjectId(),
+            "title": f"Course {i}",
+            "title_normalized": f"course {i}",
+            "description": "Benchmark course description",
+            "thumbnail": "https://example.test/thumbnail.png",
+            "thumbnail_public_id": "thumbs/thumbnail",
+            "thumbnail_variants": [
+                {"width": w, "height": w * 9 // 16, "format": "webp", "url": f"https://example.test/{w}.webp", "public_id": f"thumbs/{w}"}
+                for w in (320, 640)
+            ],
+            "teacher": DBRef("users", teacher_id),
+            "teacher_summary": {"id": teacher_id, "first_name": "Ada", "last_name": "Lovelace"},
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i)
+        })
+    return rows
+
+
+def _hydrated(rows: list) -> bytes:
+    courses = [Course.model_validate(row) for row in rows]
+    page = CourseListResponse(
+        courses=[
+            CourseResponse(
+                id=str(course.id),
+                title=course.title,
+                description=course.description,
+                thumbnail=course.thumbnail,
+                thumbnail_variants=[variant.model_dump() for variant in course.thumbnail_variants],
+                teacher_id=str(course.teacher.ref.id),
+                teacher=_teacherSummaryItem(course.teacher_summary),
+                created_at=course.created_at
+            )
+            for course in courses
+        ],
+        total=len(courses), skip=0, limit=len(courses)
+    )
+    return page.model_dump_json().encode()
+
+
+def _projected(rows: list) -> bytes:
+    page = {"courses": [_courseListItem(row) for row in rows], "total": len(rows), "skip": 0, "limit": len(rows)}
+    return CourseListResponse.model_validate(page).model_dump_json().encode()
+
+
+def _docs_per_second(serialize, rows: list) -> float:
+    best = float("inf")
+    for _ in range(BENCH_REPEAT):
+        started = time.perf_counter()
+        serialize(rows)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+async def _init(uri: str):
+    from beanie import init_beanie
+    from pymongo import AsyncMongoClient
+    from config.database import DOCUMENT_MODELS
+    client = AsyncMongoClient(uri)
+    await init_beanie(database=client[f"liplearn_bench_{uuid.uuid4().hex[:12]}"], document_models=DOCUMENT_MODELS, skip_indexes=True)
+    return client
+
+
+def main() -> int:
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        print("MONGO_URI is not set", file=sys.stderr)
+        return 2
+    client = asyncio.run(_init(uri))
+    rows = _rows()
+    projected_rows = [{key: row[key] for key in ("_id", *COURSE_LIST_PROJECTION)} for row in rows]
+
+    hydrated = _docs_per_second(_hydrated, rows)
+    projected = _docs_per_second(_projected, projected_rows)
+    asyncio.run(client.close())
+
+    print(f"page={BENCH_PAGE_SIZE} hydrated={hydrated:,.0f} docs/s projected={projected:,.0f} docs/s speedup={projected / hydrated:.1f}x")
+    return 0 if projected >= hydrated else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Listing throughput with per-item debug logging off, sampled and on.
+# Serializes BENCH_PAGES course pages the way getAllCoursesController does,
+# including its per-course debug records, with the queued JSON logger writing
+# to /dev/null:
+#   python bench/bench_logging.py
+# Exits non-zero when DEBUG off is not faster than DEBUG on.
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import DBRef, ObjectId
+from controllers.courseController import _courseListItem
+from schemas.courseSchema import CourseListResponse
+from utils.logger import DebugSampler, ROOT_LOGGER, get_logger, setup_logging, shutdown_logging
+
+BENCH_PAGES = int(os.getenv("BENCH_PAGES", "2000"))
+PAGE = 100
+
+logger = get_logger("bench")
+
+
+def _rows() -> list:
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Course {i}",
+            "description": "Benchmark course description",
+            "thumbnail": "https://example.test/thumbnail.png",
+            "teacher": DBRef("users", ObjectId()),
+            "created_at": datetime(2024, 1, 1)
+        }
+        for i in range(PAGE)
+    ]
+
+
+def _list_page(rows: list) -> bytes:
+    if logger.isEnabledFor(logging.DEBUG):
+        for row in rows:
+            logger.debug("Listed course", extra={"course_id": str(row["_id"]), "title": row["title"]})
+    page = {"courses": [_courseListItem(row) for row in rows], "total": PAGE, "skip": 0, "limit": PAGE}
+    return CourseListResponse.model_validate(page).model_dump_json().encode()
+
+
+def _pages_per_second(level: str, sample_rate: float) -> float:
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    for handler in root.handlers:
+        handler.filters = [DebugSampler(sample_rate)]
+    rows = _rows()
+    started = time.perf_counter()
+    for _ in range(BENCH_PAGES):
+        _list_page(rows)
+    return BENCH_PAGES / (time.perf_counter() - started)
+
+
+def main() -> int:
+    sys.stdout = open(os.devnull, "w")
+    setup_logging()
+    try:
+        off = _pages_per_second("INFO", 1.0)
+        sampled = _pages_per_second("DEBUG", 0.01)
+        on = _pages_per_second("DEBUG", 1.0)
+    finally:
+        shutdown_logging()
+        sys.stdout = sys.__stdout__
+    print(f"pages={BENCH_PAGES}x{PAGE} debug_off={off:,.0f}/s debug_sampled_1%={sampled:,.0f}/s debug_on={on:,.0f}/s")
+    return 0 if off > on else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Login storm: password verification throughput and unrelated-request latency.
+# Fires BENCH_LOGINS concurrent verify_password calls (the bcrypt work of
+# loginController) at BCRYPT_ROUNDS while a probe measures how late the event
+# loop wakes up - the delay any other route on this worker would see:
+#   python bench/bench_login_storm.py
+# Rejected (503) logins are counted, not retried. Exits non-zero when the
+# probe's p99 wake-up delay is above BENCH_TARGET_MS.
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from utils.passwords import BCRYPT_ROUNDS, PASSWORD_POOL_SIZE, hash_password, shutdown_password_pool, verify_password
+
+BENCH_LOGINS = int(os.getenv("BENCH_LOGINS", "200"))
+BENCH_TARGET_MS = float(os.getenv("BENCH_TARGET_MS", "20"))
+PROBE_INTERVAL = 0.005
+
+
+def _p(values: list, q: float) -> float:
+    return values[max(int(len(values) * q) - 1, 0)]
+
+
+async def _probe(stop: asyncio.Event, delays: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def _login(hashed: str, latencies: list) -> bool:
+    started = time.perf_counter()
+    try:
+        await verify_password("correct horse battery staple", hashed)
+    except HTTPException:
+        return False
+    latencies.append((time.perf_counter() - started) * 1000)
+    return True
+
+
+async def _run():
+    hashed = await hash_password("correct horse battery staple")
+    stop = asyncio.Event()
+    delays, latencies = [], []
+    probe = asyncio.create_task(_probe(stop, delays))
+    started = time.perf_counter()
+    accepted = await asyncio.gather(*(_login(hashed, latencies) for _ in range(BENCH_LOGINS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return sum(accepted), elapsed, sorted(latencies), sorted(delays)
+
+
+def main() -> int:
+    try:
+        accepted, elapsed, latencies, delays = asyncio.run(_run())
+    finally:
+        shutdown_password_pool()
+    print(
+        f"rounds={BCRYPT_ROUNDS} pool={PASSWORD_POOL_SIZE} logins={BENCH_LOGINS} accepted={accepted} "
+        f"rejected={BENCH_LOGINS - accepted} throughput={accepted / elapsed:.1f}/s"
+    )
+    if latencies:
+        print(f"login p50={statistics.median(latencies):.0f}ms p99={_p(latencies, 0.99):.0f}ms")
+    p99 = _p(delays, 0.99)
+    print(f"other requests: probes={len(delays)} p50={statistics.median(delays):.2f}ms p99={p99:.2f}ms")
+    return 0 if p99 <= BENCH_TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Event-loop responsiveness during media uploads.
+# Runs BENCH_UPLOADS uploads through media_store against the fake Cloudinary
+# (FAKE_MEDIA_LATENCY seconds each, blocking like the real SDK) while a probe
+# measures how late the event loop wakes up - the delay every other request,
+# /api/v1/course/all included, would see on this worker:
+#   python bench/bench_media_offload.py
+# Exits non-zero when the p99 wake-up delay is above BENCH_TARGET_MS.
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MEDIA_BACKEND"] = "fake"
+os.environ.setdefault("FAKE_MEDIA_LATENCY", "0.5")
+
+from utils.media_store import media_store
+
+BENCH_UPLOADS = int(os.getenv("BENCH_UPLOADS", "16"))
+BENCH_TARGET_MS = float(os.getenv("BENCH_TARGET_MS", "20"))
+PROBE_INTERVAL = 0.005
+
+
+async def _probe(stop: asyncio.Event, delays: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def _run(uploads: int) -> list:
+    stop = asyncio.Event()
+    delays = []
+    probe = asyncio.create_task(_probe(stop, delays))
+    if uploads:
+        await asyncio.gather(*(
+            media_store.upload(io.BytesIO(b"video"), resource_type="video", folder="bench") for _ in range(uploads)
+        ))
+    else:
+        await asyncio.sleep(1)
+    stop.set()
+    await probe
+    return sorted(delays)
+
+
+def _summary(label: str, delays: list) -> float:
+    p99 = delays[int(len(delays) * 0.99) - 1]
+    print(f"{label}: probes={len(delays)} p50={statistics.median(delays):.2f}ms p99={p99:.2f}ms")
+    return p99
+
+
+def main() -> int:
+    _summary("idle", asyncio.run(_run(0)))
+    p99 = _summary(f"uploads={BENCH_UPLOADS}", asyncio.run(_run(BENCH_UPLOADS)))
+    return 0 if p99 <= BENCH_TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# Course list with teacher names: embedded teacher_summary versus fetch_links.
+# Seeds a throwaway database on MONGO_URI with BENCH_TEACHERS teachers and
+# BENCH_COURSES courses, then times one page of courses with teacher names
+# read from teacher_summary (what getAllCoursesController does) and resolved
+# through Beanie's fetch_links ($lookup per course):
+#   MONGO_URI=... python bench/bench_teacher_summary.py
+# Exits non-zero when the embedded summary is not faster.
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import DBRef, ObjectId
+from dotenv import load_dotenv
+from controllers.courseController import COURSE_LIST_PROJECTION, LIST_SORT
+from models.courseModel import Course
+
+load_dotenv()
+
+BENCH_TEACHERS = int(os.getenv("BENCH_TEACHERS", "1000"))
+BENCH_COURSES = int(os.getenv("BENCH_COURSES", "50000"))
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "50"))
+PAGE = int(os.getenv("BENCH_PAGE_SIZE", "100"))
+
+
+async def _seed():
+    from models.userModel import User
+    teachers = [
+        {"_id": ObjectId(), "email": f"teacher{i}@example.com", "password": "x" * 60, "role": "teacher",
+         "first_name": f"First{i}", "last_name": f"Last{i}", "created_at": datetime(2024, 1, 1)}
+        for i in range(BENCH_TEACHERS)
+    ]
+    await User.get_pymongo_collection().insert_many(teachers)
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(BENCH_COURSES):
+        teacher = teachers[i % BENCH_TEACHERS]
+        batch.append({
+            "title": f"Course {i}",
+            "title_normalized": f"course {i}",
+            "description": "Benchmark course description",
+            "thumbnail": "",
+            "teacher": DBRef("users", teacher["_id"]),
+            "teacher_summary": {"id": teacher["_id"], "first_name": teacher["first_name"], "last_name": teacher["last_name"]},
+            "created_at": start + timedelta(seconds=i)
+        })
+        if len(batch) == 10000:
+            await Course.get_pymongo_collection().insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await Course.get_pymongo_collection().insert_many(batch, ordered=False)
+
+
+async def _embedded():
+    rows = await Course.get_pymongo_collection().find({}, COURSE_LIST_PROJECTION).sort(LIST_SORT).limit(PAGE).to_list(length=PAGE)
+    return [row["teacher_summary"]["first_name"] for row in rows]
+
+
+async def _fetch_links():
+    courses = await Course.find({}, fetch_links=True).sort([("created_at", 1), ("_id", 1)]).limit(PAGE).to_list()
+    return [course.teacher.first_name for course in courses]
+
+
+async def _median_ms(run) -> float:
+    timings = []
+    for _ in range(BENCH_REPEAT):
+        started = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def _run(uri: str):
+    from beanie import init_beanie
+    from pymongo import AsyncMongoClient
+    from config.database import DOCUMENT_MODELS
+    client = AsyncMongoClient(uri)
+    name = f"liplearn_bench_{uuid.uuid4().hex[:12]}"
+    try:
+        await init_beanie(database=client[name], document_models=DOCUMENT_MODELS)
+        await _seed()
+        assert await _embedded() == await _fetch_links()
+        return await _median_ms(_embedded), await _median_ms(_fetch_links)
+    finally:
+        await client.drop_database(name)
+        await client.close()
+
+
+def main() -> int:
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        print("MONGO_URI is not set", file=sys.stderr)
+        return 2
+    embedded, fetched = asyncio.run(_run(uri))
+    print(f"courses={BENCH_COURSES} page={PAGE} embedded={embedded:.2f}ms fetch_links={fetched:.2f}ms")
+    return 0 if embedded < fetched else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
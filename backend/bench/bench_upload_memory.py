@@ -0,0 +1,70 @@
+# Upload spooling memory benchmark.
+# Streams BENCH_UPLOADS concurrent BENCH_UPLOAD_MB uploads through
+# save_upload_to_disk (the path every lesson video takes) and reports the
+# process's peak RSS growth, which must not depend on the file size:
+#   python bench/bench_upload_memory.py
+# Exits non-zero when peak RSS grew by more than BENCH_MAX_RSS_MB.
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import UploadFile
+from utils.uploads import save_upload_to_disk
+
+BENCH_UPLOADS = int(os.getenv("BENCH_UPLOADS", "8"))
+BENCH_UPLOAD_MB = int(os.getenv("BENCH_UPLOAD_MB", "50"))
+BENCH_MAX_RSS_MB = float(os.getenv("BENCH_MAX_RSS_MB", "64"))
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _source(folder: str) -> str:
+    """A BENCH_UPLOAD_MB file on disk, written without holding it in memory"""
+    path = os.path.join(folder, "source.bin")
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as out:
+        for _ in range(BENCH_UPLOAD_MB):
+            out.write(block)
+    return path
+
+
+async def _upload(source: str, destination: str) -> int:
+    with open(source, "rb") as file:
+        # size=None: the limit is enforced while streaming, as for chunked requests
+        upload = UploadFile(file, filename="lesson.mp4")
+        return await save_upload_to_disk(upload, destination, max_bytes=BENCH_UPLOAD_MB * 1024 * 1024)
+
+
+async def _run(folder: str, source: str):
+    return await asyncio.gather(*(
+        _upload(source, os.path.join(folder, f"upload-{i}.mp4")) for i in range(BENCH_UPLOADS)
+    ))
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as folder:
+        source = _source(folder)
+        baseline = _peak_rss_mb()
+        started = time.perf_counter()
+        written = asyncio.run(_run(folder, source))
+        elapsed = time.perf_counter() - started
+        growth = _peak_rss_mb() - baseline
+
+    total_mb = sum(written) / (1024 * 1024)
+    print(
+        f"uploads={BENCH_UPLOADS} size={BENCH_UPLOAD_MB}MB total={total_mb:.0f}MB "
+        f"time={elapsed:.2f}s throughput={total_mb / elapsed:.0f}MB/s peak_rss_growth={growth:.1f}MB"
+    )
+    return 0 if growth <= BENCH_MAX_RSS_MB else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
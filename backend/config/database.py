@@ -1,32 +1,265 @@
+import asyncio
+from collections import defaultdict
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, UpdateOne
+from pymongo.read_preferences import ReadPreference
 from fastapi import FastAPI
 from models.userModel import User
 from models.courseModel import Course
 from models.lessonModel import Lesson
+from models.mediaJobModel import MediaJob
+from models.mediaContentModel import MediaContent
+from models.uploadSessionModel import UploadSession
 
 import os
 from dotenv import load_dotenv
+from utils.logger import get_logger
+from utils.text import normalize_text
 
 load_dotenv()
+logger = get_logger("database")
 
-MONGO_URI=os.getenv("MONGO_URI")
 dbName="LipLearn"
 
-if not MONGO_URI:
-    raise RuntimeError("Mongo Uri is not set correctly")
+# Connection pool / driver settings (per uvicorn worker process)
+MONGO_MAX_POOL_SIZE=int(os.getenv("MONGO_MAX_POOL_SIZE","100"))
+MONGO_MIN_POOL_SIZE=int(os.getenv("MONGO_MIN_POOL_SIZE","0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS","5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS","5000"))
+# Comma separated, e.g. "zstd,snappy" (needs the zstandard / python-snappy packages)
+MONGO_COMPRESSORS=os.getenv("MONGO_COMPRESSORS","")
+# Read preference for list endpoints, e.g. "secondaryPreferred" to offload the primary
+MONGO_LIST_READ_PREFERENCE=os.getenv("MONGO_LIST_READ_PREFERENCE","primary")
+
+_READ_PREFERENCES={
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+# Fail at import (startup) rather than with a KeyError on every list request
+if MONGO_LIST_READ_PREFERENCE not in _READ_PREFERENCES:
+    raise RuntimeError(
+        f"Invalid MONGO_LIST_READ_PREFERENCE {MONGO_LIST_READ_PREFERENCE!r}; "
+        f"expected one of: {', '.join(_READ_PREFERENCES)}"
+    )
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Counts connection pool events per server for the /health/db endpoint"""
+
+    def __init__(self):
+        self.servers=defaultdict(lambda: {
+            "open": 0,
+            "checked_out": 0,
+            "checkout_failures": 0,
+            "created_total": 0
+        })
+
+    def _server(self, event):
+        return self.servers["%s:%s" % event.address]
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): self.servers.pop("%s:%s" % event.address, None)
+    def connection_check_out_started(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_created(self, event):
+        server=self._server(event)
+        server["open"]+=1
+        server["created_total"]+=1
+
+    def connection_closed(self, event):
+        self._server(event)["open"]-=1
+
+    def connection_check_out_failed(self, event):
+        self._server(event)["checkout_failures"]+=1
+
+    def connection_checked_out(self, event):
+        self._server(event)["checked_out"]+=1
+
+    def connection_checked_in(self, event):
+        self._server(event)["checked_out"]-=1
+
+    def snapshot(self):
+        """Totals across servers; addresses stay out of the unauthenticated health output"""
+        servers=list(self.servers.values())
+        busiest=max((stats["checked_out"] for stats in servers), default=0)
+        return {
+            "servers": len(servers),
+            **{key: sum(stats[key] for stats in servers) for key in ("open", "checked_out", "checkout_failures", "created_total")},
+            # Each server has its own pool, so the fullest one is what runs out first
+            "utilization": round(busiest / MONGO_MAX_POOL_SIZE, 3)
+        }
+
+
+pool_metrics=PoolMetrics()
+client=None
+
+
+def getClient():
+    """Build the Mongo client on first use; importing this module needs no MONGO_URI"""
+    global client
+    if client is None:
+        mongo_uri=os.getenv("MONGO_URI")
+        if not mongo_uri:
+            raise RuntimeError("Mongo Uri is not set correctly")
+        options={
+            "maxPoolSize": MONGO_MAX_POOL_SIZE,
+            "minPoolSize": MONGO_MIN_POOL_SIZE,
+            "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "event_listeners": [pool_metrics],
+        }
+        if MONGO_COMPRESSORS:
+            options["compressors"]=MONGO_COMPRESSORS
+        client=AsyncIOMotorClient(mongo_uri, **options)
+    return client
+
+
+def listCollection(model):
+    """Collection handle for list endpoints, honouring MONGO_LIST_READ_PREFERENCE"""
+    collection=model.get_pymongo_collection()
+    if MONGO_LIST_READ_PREFERENCE=="primary":
+        return collection
+    return collection.with_options(read_preference=_READ_PREFERENCES[MONGO_LIST_READ_PREFERENCE])
+
+
+def poolStats():
+    return {
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        **pool_metrics.snapshot()
+    }
+
+DOCUMENT_MODELS=[User,Course,Lesson,MediaJob,MediaContent,UploadSession]
+# Drop indexes that exist in MongoDB but are no longer declared in Settings.indexes
+DROP_UNDECLARED_INDEXES=os.getenv("MONGO_DROP_UNDECLARED_INDEXES","false").lower()=="true"
+
+_index_task=None
+
+
+async def reconcileIndexes():
+    """Create every index declared in the models' Settings.indexes"""
+    for model in DOCUMENT_MODELS:
+        declared=list(getattr(model.Settings,"indexes",[]))
+        collection=model.get_pymongo_collection()
+        try:
+            if declared:
+                await collection.create_indexes(declared)
+            existing=await collection.index_information()
+            wanted={index.document["name"] for index in declared} | {"_id_"}
+            for name in existing:
+                if name in wanted:
+                    continue
+                if DROP_UNDECLARED_INDEXES:
+                    await collection.drop_index(name)
+                    logger.info("Dropped undeclared index", extra={"collection": collection.name, "index": name})
+                else:
+                    logger.warning("Undeclared index present", extra={"collection": collection.name, "index": name})
+            logger.info("Indexes reconciled", extra={"collection": collection.name, "declared": len(declared)})
+        except Exception:
+            # e.g. duplicate emails blocking the unique index - keep serving, report it
+            logger.exception("Index reconciliation failed", extra={"collection": collection.name})
+
+
+async def backfillTitleNormalized(batch_size: int=500):
+    """Fill Course.title_normalized on courses written before it existed"""
+    collection=Course.get_pymongo_collection()
+    filled=0
+    while True:
+        rows=await collection.find({"title_normalized": None},{"title": 1}).limit(batch_size).to_list(length=batch_size)
+        if not rows:
+            break
+        await collection.bulk_write([
+            UpdateOne({"_id": row["_id"]},{"$set": {"title_normalized": normalize_text(row.get("title",""))}})
+            for row in rows
+        ],ordered=False)
+        filled+=len(rows)
+    if filled:
+        logger.info("Backfilled course title_normalized", extra={"courses": filled})
+
+
+async def backfillTeacherSummary(batch_size: int=500):
+    """Fill Course.teacher_summary on courses written before it existed"""
+    collection=Course.get_pymongo_collection()
+    filled=0
+    last_id=None
+    while True:
+        # Walk by _id so courses whose teacher no longer exists are passed over, not re-read
+        query={"teacher_summary": None}
+        if last_id is not None:
+            query["_id"]={"$gt": last_id}
+        rows=await collection.find(query,{"teacher": 1}).sort("_id",1).limit(batch_size).to_list(length=batch_size)
+        if not rows:
+            break
+        last_id=rows[-1]["_id"]
+        teacher_ids={row["teacher"].id for row in rows if row.get("teacher")}
+        teachers={
+            user["_id"]: user
+            for user in await User.get_pymongo_collection().find(
+                {"_id": {"$in": list(teacher_ids)}},{"first_name": 1,"last_name": 1}
+            ).to_list(length=None)
+        }
+        updates=[]
+        for row in rows:
+            teacher=teachers.get(row["teacher"].id) if row.get("teacher") else None
+            if not teacher:
+                continue
+            updates.append(UpdateOne({"_id": row["_id"],"teacher_summary": None},{"$set": {"teacher_summary": {
+                "id": teacher["_id"],
+                "first_name": teacher["first_name"],
+                "last_name": teacher["last_name"]
+            }}}))
+        if updates:
+            await collection.bulk_write(updates,ordered=False)
+            filled+=len(updates)
+    if filled:
+        logger.info("Backfilled course teacher_summary", extra={"courses": filled})
+
+
+async def _startupMaintenance():
+    await reconcileIndexes()
+    try:
+        await backfillTitleNormalized()
+    except Exception:
+        logger.exception("Course title_normalized backfill failed")
+    try:
+        await backfillTeacherSummary()
+    except Exception:
+        logger.exception("Course teacher_summary backfill failed")
 
-client=AsyncIOMotorClient(MONGO_URI)
 
 async def connectDB():
+    global _index_task
     
     try:
         
+       # Index builds can take a while on big collections; don't hold up startup
+       db=getClient()[dbName]
+       # Fail fast if the server isn't reachable instead of on the first request
+       await db.command("ping")
        await init_beanie(
-            database=client[dbName],
-            document_models=[User,Course,Lesson]
+            database=db,
+            document_models=DOCUMENT_MODELS,
+            skip_indexes=True
             )
-       print("Mongo db connected successfully")
-    except Exception as e:
-        print("Mongodb connection failed ",str(e))
-        raise
\ No newline at end of file
+       logger.info("Mongo db connected successfully", extra={"db": dbName})
+       _index_task=asyncio.create_task(_startupMaintenance())
+    except Exception:
+        logger.exception("Mongodb connection failed")
+        raise
+
+
+async def closeDB():
+    global client, _index_task
+    if _index_task is not None and not _index_task.done():
+        _index_task.cancel()
+    _index_task=None
+    if client is not None:
+        client.close()
+        client=None
@@ -1,32 +1,75 @@
-from models.courseModel import Course
+from models.courseModel import Course, TeacherSummary
+from models.userModel import User
+from models.lessonModel import Lesson
 from schemas.courseSchema import CourseResponse,CourseUpdateResponse,DeleteCourseResponse
 from fastapi import HTTPException, status
-import cloudinary.uploader
+from utils.media_store import media_store
+from utils.media_cleanup import schedule_media_cleanup
+from utils.media_content import upload_deduplicated, release_content
+from utils.thumbnails import ensure_variants, course_variants
 # controllers/courseController.py
+import hashlib
+import logging
+from collections import Counter
 from datetime import datetime
 from beanie import PydanticObjectId
+from config.database import listCollection
+from utils.pagination import after_cursor, next_cursor
+from utils.counts import CachedCount, COURSE_COUNT_REFRESH_SECONDS
+from utils.response_cache import course_catalog_cache
+from utils.logger import get_logger
+from utils.text import prefix_range
+
+logger = get_logger("course")
+
+# Unfiltered catalog size - cheap metadata count instead of count_documents per request
+course_count = CachedCount(Course, COURSE_COUNT_REFRESH_SECONDS)
+
+def _teacherSummaryItem(summary):
+    """TeacherSummaryResponse shape from a TeacherSummary or its raw dict"""
+    if not summary:
+        return None
+    if isinstance(summary, TeacherSummary):
+        summary = summary.model_dump()
+    return {
+        "id": str(summary["id"]),
+        "first_name": summary["first_name"],
+        "last_name": summary["last_name"]
+    }
+
+
 async def createCourseController(title: str, description: str, thumbnail, teacher_id: str):
-    # 1️⃣ Upload image to Cloudinary
-    print("=" * 50)
-    print("here is metadata in controller", title, description)
-    print("Thumbnail object:", thumbnail)
-    print("Thumbnail file:", thumbnail.file)
-    print("Thumbnail filename:", thumbnail.filename)
-    print("Thumbnail content_type:", thumbnail.content_type)
-    print("=" * 50)
+    # 1️⃣ Upload image to media storage
+    logger.debug(
+        "Creating course",
+        extra={"title": title, "thumbnail_filename": thumbnail.filename, "content_type": thumbnail.content_type}
+    )
+    
+    # Teacher name snapshot embedded on the course (one read at write time
+    # instead of a Link fetch per course on every list)
+    teacher = await User.get(PydanticObjectId(teacher_id))
+    teacher_summary = TeacherSummary(
+        id=teacher.id,
+        first_name=teacher.first_name,
+        last_name=teacher.last_name
+    ) if teacher else None
     
     try:
-        print("☁️ Attempting Cloudinary upload...")
-        upload_result = cloudinary.uploader.upload(thumbnail.file)
-        thumbnail_url = upload_result["secure_url"]
-        print(f"✅ Upload successful: {thumbnail_url}")
+        # Identical thumbnails (same bytes) share one stored image
+        file_bytes = await thumbnail.read()
+        await thumbnail.seek(0)
+        thumbnail_hash = hashlib.blake2b(file_bytes, digest_size=32).hexdigest()
+        content = await upload_deduplicated(thumbnail.file, thumbnail_hash)
+        thumbnail_url = content["url"]
+        # Responsive WebP/AVIF sizes for catalog tiles (rendered on a process pool)
+        thumbnail_variants = course_variants(await ensure_variants(content, file_bytes))
+        logger.debug("Thumbnail uploaded", extra={"url": thumbnail_url, "variants": len(thumbnail_variants)})
         
+    except HTTPException:
+        # Busy / timed out media pool - keep the 503/504
+        raise
     except Exception as e:
-        # 👇 THIS IS THE KEY - PRINT THE ACTUAL ERROR
-        print(f"❌ Cloudinary Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()  # This shows the full error
+        logger.exception("Thumbnail upload failed")
         raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
 
     # 2️⃣ Create course document
@@ -34,11 +77,21 @@ async def createCourseController(title: str, description: str, thumbnail, teache
         title=title,
         description=description,
         thumbnail=thumbnail_url,
-        teacher=teacher_id
+        thumbnail_public_id=content["public_id"],
+        thumbnail_hash=thumbnail_hash,
+        thumbnail_variants=thumbnail_variants,
+        teacher=teacher_id,
+        teacher_summary=teacher_summary
     )
 
     # 3️⃣ Save to MongoDB
-    await course.insert()
+    try:
+        await course.insert()
+    except Exception:
+        await release_content("image", thumbnail_hash)
+        raise
+    course_count.adjust(+1)
+    await course_catalog_cache.invalidate()
 
     # 4️⃣ Return response
     return CourseResponse(
@@ -46,7 +99,9 @@ async def createCourseController(title: str, description: str, thumbnail, teache
         title=course.title,
         description=course.description,
         thumbnail=course.thumbnail,
-        teacher_id=str(course.teacher),
+        thumbnail_variants=[variant.model_dump() for variant in course.thumbnail_variants],
+        teacher_id=teacher_id,
+        teacher=_teacherSummaryItem(course.teacher_summary),
         created_at=course.created_at
     )
     
@@ -55,41 +110,124 @@ async def createCourseController(title: str, description: str, thumbnail, teache
 
 
 # controllers/courseController.py
-async def getAllCoursesController(skip: int = 0, limit: int = 10):
-    """Get all courses with pagination"""
+# Only the fields CourseResponse needs
+COURSE_LIST_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "thumbnail": 1,
+    "thumbnail_variants": 1,
+    "teacher": 1,
+    "teacher_summary": 1,
+    "created_at": 1
+}
+LIST_SORT = [("created_at", 1), ("_id", 1)]
+
+
+def _courseFilters(teacher_id: str = None) -> dict:
+    """Listing filter; teacher-scoped lists and counts use the teacher_created_at_id index"""
+    return {"teacher.$id": PydanticObjectId(teacher_id)} if teacher_id else {}
+
+
+def _coursePageQuery(collection, skip: int = 0, limit: int = 10, cursor: str = None, teacher_id: str = None):
+    """One page of projected courses plus a lookahead row, in (created_at, _id) order"""
+    filters = _courseFilters(teacher_id)
+    query = {**filters, **after_cursor(cursor)} if cursor else filters
+    rows = collection.find(query, COURSE_LIST_PROJECTION)
+    if not cursor:
+        rows = rows.skip(skip)
+    return rows.sort(LIST_SORT).limit(limit + 1)
+
+
+def _courseSearchQuery(collection, q: str, mode: str = "text", skip: int = 0, limit: int = 10):
+    """
+    Search cursor over projected courses
+    - `prefix`: range scan on title_normalized, already in index order
+    - `text`: $text match, best textScore first
+    """
+    if mode == "prefix":
+        rows = collection.find(
+            {"title_normalized": prefix_range(q)}, COURSE_LIST_PROJECTION
+        ).sort("title_normalized", 1)
+    else:
+        rows = collection.find(
+            {"$text": {"$search": q}},
+            {**COURSE_LIST_PROJECTION, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+    return rows.skip(skip).limit(limit)
+LESSON_OUTLINE_PROJECTION = {"video_name": 1, "video_url": 1, "media_status": 1, "created_at": 1}
+
+
+def _courseDetailPipeline(course_id: PydanticObjectId, lesson_limit: int) -> list:
+    """
+    Stages after the course _id match: lesson outline and lesson count come
+    from uncorrelated $lookup sub-pipelines that use the lessons
+    (course_id.$id, created_at, _id) index, all in one round trip
+    """
+    lessons_of_course = {"$match": {"course_id.$id": course_id}}
+    outline = [
+        lessons_of_course,
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$limit": lesson_limit},
+        {"$project": LESSON_OUTLINE_PROJECTION}
+    ]
+    return [
+        {"$project": {**COURSE_LIST_PROJECTION, "updated_at": 1}},
+        {"$lookup": {"from": Lesson.get_collection_name(), "pipeline": outline, "as": "lessons"}},
+        {"$lookup": {
+            "from": Lesson.get_collection_name(),
+            "pipeline": [lessons_of_course, {"$count": "n"}],
+            "as": "lesson_count"
+        }}
+    ]
+
+
+def _courseListItem(row: dict) -> dict:
+    """Map a projected course document straight to the CourseResponse shape"""
+    return {
+        "id": str(row["_id"]),
+        "title": row["title"],
+        "description": row["description"],
+        "thumbnail": row["thumbnail"],
+        "thumbnail_variants": row.get("thumbnail_variants") or [],
+        "teacher_id": str(row["teacher"].id),  # Stored as a DBRef
+        "teacher": _teacherSummaryItem(row.get("teacher_summary")),
+        "created_at": row["created_at"]
+    }
+
+
+async def getAllCoursesController(skip: int = 0, limit: int = 10, cursor: str = None, teacher_id: str = None):
+    """
+    Get all courses with pagination
+    - `cursor` (keyset on created_at, _id) takes precedence over `skip`
+    - `teacher_id` narrows to one teacher; its total is an exact indexed count
+    - Unfiltered total comes from the cached estimated count
+    """
     try:
-        print(f"📚 Fetching courses (skip={skip}, limit={limit})")
+        filters = _courseFilters(teacher_id)
         
-        courses = await Course.find().skip(skip).limit(limit).to_list()
-        print(f"✅ Found {len(courses)} courses")
-        print("\n" + "=" * 60 + "\n")
+        # Projected raw documents - no Document hydration or Link objects
+        rows = await _coursePageQuery(listCollection(Course), skip, limit, cursor, teacher_id).to_list(length=limit + 1)
+        rows, cursor_out = next_cursor(rows, limit)
         
-        for index, course in enumerate(courses, 1):
-            print(f"\n📚 Course {index}:")
-            print(f"   ID: {course.id}")
-            print(f"   Title: {course.title}")
-            print(f"   Teacher Link: {course.teacher}")
-            print(f"   Teacher ID: {course.teacher.ref.id}")
-            
-            print(f"   Teacher Collection: {course.teacher.ref.collection}")
+        # Selective filter -> exact count is cheap; whole catalog -> cached estimate
+        total = await Course.find(filters).count() if filters else await course_count.get()
+        if logger.isEnabledFor(logging.DEBUG):
+            # Per-item output is sampled via LOG_DEBUG_SAMPLE_RATE
+            for row in rows:
+                logger.debug("Listed course", extra={"course_id": str(row["_id"]), "title": row["title"]})
         
-        print("\n" + "=" * 60 + "\n")
-        return [
-            CourseResponse(
-                id=str(course.id),
-                title=course.title,
-                description=course.description,
-                thumbnail=course.thumbnail,
-                teacher_id=str(course.teacher.ref.id),
-                created_at=course.created_at
-            )
-            for course in courses
-        ]
+        return {
+            "courses": [_courseListItem(row) for row in rows],
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": cursor_out
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to fetch courses")
         raise HTTPException(status_code=500, detail=f"Failed to fetch courses: {str(e)}")
     
     
@@ -99,6 +237,69 @@ async def getAllCoursesController(skip: int = 0, limit: int = 10):
 
 
 
+async def searchCoursesController(q: str, mode: str = "text", skip: int = 0, limit: int = 10):
+    """
+    Search the catalog
+    - `text`: $text query on title/description, best textScore first
+    - `prefix`: autocomplete, a range scan on the title_normalized index
+    """
+    try:
+        if not q.strip():
+            return {"query": q, "mode": mode, "skip": skip, "limit": limit, "courses": []}
+        
+        rows = await _courseSearchQuery(listCollection(Course), q, mode, skip, limit).to_list(length=limit)
+        
+        return {
+            "query": q,
+            "mode": mode,
+            "skip": skip,
+            "limit": limit,
+            "courses": [{**_courseListItem(row), "score": row.get("score")} for row in rows]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Course search failed", extra={"mode": mode})
+        raise HTTPException(status_code=500, detail="Course search failed")
+
+
+async def getCourseDetailController(course_id: str, lesson_limit: int = 50):
+    """Get one course with its lesson outline in a single aggregation"""
+    try:
+        oid = PydanticObjectId(course_id)
+        rows = await Course.find(Course.id == oid).aggregate(
+            _courseDetailPipeline(oid, lesson_limit)
+        ).to_list()
+        
+        if not rows:
+            raise HTTPException(status_code=404, detail="Course not found")
+        
+        row = rows[0]
+        count = row["lesson_count"]
+        return {
+            **_courseListItem(row),
+            "updated_at": row.get("updated_at", row["created_at"]),
+            "lesson_count": count[0]["n"] if count else 0,
+            "lessons": [
+                {
+                    "id": str(lesson["_id"]),
+                    "video_name": lesson["video_name"],
+                    "video_url": lesson.get("video_url"),
+                    "media_status": lesson.get("media_status", "ready"),
+                    "created_at": lesson["created_at"]
+                }
+                for lesson in row["lessons"]
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to fetch course", extra={"course_id": course_id})
+        raise HTTPException(status_code=500, detail="Failed to fetch course")
+
+
 # ... your existing controllers ...
 
 async def updateCourseController(
@@ -110,16 +311,12 @@ async def updateCourseController(
 ):
     """Update a course - simple version"""
     try:
-        print(f"🔄 Updating course {course_id}")
-        
         # 1️⃣ Find the course
         course = await Course.get(PydanticObjectId(course_id))
         
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        print(f"✅ Course found: {course.title}")
-        
         # 2️⃣ Check if user is the owner
         if str(course.teacher.ref.id) != current_user_id:
             raise HTTPException(
@@ -127,8 +324,6 @@ async def updateCourseController(
                 detail="You can only update your own courses"
             )
         
-        print(f"✅ User authorized to update")
-        
         # 3️⃣ Update title if provided
         if title:
             if len(title.strip()) < 3:
@@ -137,7 +332,6 @@ async def updateCourseController(
                     detail="Title must be at least 3 characters"
                 )
             course.title = title.strip()
-            print(f"📝 Title updated to: {course.title}")
         
         # 4️⃣ Update description if provided
         if description:
@@ -147,12 +341,9 @@ async def updateCourseController(
                     detail="Description must be at least 10 characters"
                 )
             course.description = description.strip()
-            print(f"📝 Description updated")
         
         # 5️⃣ Update thumbnail if provided
         if thumbnail:
-            print(f"🖼️ Uploading new thumbnail...")
-            
             # Validate file
             allowed_types = ["image/jpeg", "image/png", "image/jpg", "image/webp"]
             if thumbnail.content_type not in allowed_types:
@@ -169,17 +360,24 @@ async def updateCourseController(
                     detail="File too large (max 5MB)"
                 )
             
-            # Upload to Cloudinary
+            # Upload to media storage (or reuse an identical stored image)
             try:
                 import io
-                upload_result = cloudinary.uploader.upload(
+                old_thumbnail_hash = course.thumbnail_hash
+                thumbnail_hash = hashlib.blake2b(file_bytes, digest_size=32).hexdigest()
+                content = await upload_deduplicated(
                     io.BytesIO(file_bytes),
+                    thumbnail_hash,
                     folder="courses"
                 )
-                course.thumbnail = upload_result["secure_url"]
-                print(f"✅ Thumbnail updated: {course.thumbnail}")
+                course.thumbnail = content["url"]
+                course.thumbnail_public_id = content["public_id"]
+                course.thumbnail_hash = thumbnail_hash
+                course.thumbnail_variants = course_variants(await ensure_variants(content, file_bytes))
+            except HTTPException:
+                raise
             except Exception as e:
-                print(f"❌ Upload error: {str(e)}")
+                logger.exception("Thumbnail upload failed", extra={"course_id": course_id})
                 raise HTTPException(
                     status_code=500,
                     detail=f"Thumbnail upload failed: {str(e)}"
@@ -190,7 +388,10 @@ async def updateCourseController(
         
         # 7️⃣ Save to database
         await course.save()
-        print(f"✅ Course saved successfully")
+        if thumbnail and old_thumbnail_hash:
+            await release_content("image", old_thumbnail_hash)
+        await course_catalog_cache.invalidate()
+        logger.info("Course updated", extra={"course_id": course_id})
         
         # 8️⃣ Return response
         return CourseUpdateResponse(
@@ -198,7 +399,9 @@ async def updateCourseController(
             title=course.title,
             description=course.description,
             thumbnail=course.thumbnail,
+            thumbnail_variants=[variant.model_dump() for variant in course.thumbnail_variants],
             teacher_id=str(course.teacher.ref.id),
+            teacher=_teacherSummaryItem(course.teacher_summary),
             created_at=course.created_at,
             updated_at=course.updated_at
         )
@@ -206,9 +409,7 @@ async def updateCourseController(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to update course", extra={"course_id": course_id})
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update course: {str(e)}"
@@ -224,8 +425,6 @@ async def updateCourseController(
 async def deleteCourseController(course_id: str, current_user_id: str):
     """Delete a course - simple version"""
     try:
-        print(f"🗑️ Deleting course {course_id}")
-        
         # 1️⃣ Find the course
         course = await Course.get(PydanticObjectId(course_id))
         
@@ -235,8 +434,6 @@ async def deleteCourseController(course_id: str, current_user_id: str):
                 detail="Course not found"
             )
         
-        print(f"✅ Course found: {course.title}")
-        
         # 2️⃣ Check if user is the owner
         if str(course.teacher.ref.id) != current_user_id:
             raise HTTPException(
@@ -244,27 +441,18 @@ async def deleteCourseController(course_id: str, current_user_id: str):
                 detail="You can only delete your own courses"
             )
         
-        print(f"✅ User authorized to delete")
-        
-        # 3️⃣ Delete thumbnail from Cloudinary (optional but recommended)
+        # 3️⃣ Delete thumbnail from media storage (optional but recommended)
         try:
-            if "cloudinary.com" in course.thumbnail:
-                # Extract public_id from URL
-                # URL format: https://res.cloudinary.com/cloud_name/image/upload/v123456/courses/filename.jpg
-                url_parts = course.thumbnail.split("/")
-                
-                # Find 'courses' folder and get filename
-                if "courses" in url_parts:
-                    idx = url_parts.index("courses")
-                    filename = url_parts[-1].split(".")[0]  # Remove extension
-                    public_id = f"courses/{filename}"
-                    
-                    print(f"🗑️ Deleting thumbnail: {public_id}")
-                    cloudinary.uploader.destroy(public_id)
-                    print(f"✅ Thumbnail deleted from Cloudinary")
+            if course.thumbnail_hash:
+                # Shared image - only removed once no other course uses it
+                await release_content("image", course.thumbnail_hash)
+            else:
+                public_id = course.thumbnail_public_id or media_store.public_id_from_url(course.thumbnail)
+                if public_id:
+                    await media_store.delete(public_id)
         except Exception as e:
-            # Don't fail if cloudinary delete fails
-            print(f"⚠️ Warning: Could not delete thumbnail: {str(e)}")
+            # Don't fail if the media delete fails
+            logger.warning("Could not delete thumbnail", extra={"course_id": course_id, "error": str(e)})
         
         # 4️⃣ Store info before deleting
         course_title = course.title
@@ -272,9 +460,36 @@ async def deleteCourseController(course_id: str, current_user_id: str):
         
         # 5️⃣ Delete course from database
         await course.delete()
-        print(f"✅ Course deleted from database")
+        course_count.adjust(-1)
+        await course_catalog_cache.invalidate()
+        
+        # 6️⃣ Cascade to lessons: read from the primary (not the list read preference,
+        # which may lag) and delete exactly the rows read, so every deleted lesson's
+        # media is released; media removed in the background
+        lessons = await Lesson.get_pymongo_collection().find(
+            {"course_id.$id": course.id}, {"video_name": 1, "video_url": 1, "video_public_id": 1, "content_hash": 1}
+        ).to_list(length=None)
+        result = await Lesson.get_pymongo_collection().delete_many(
+            {"_id": {"$in": [lesson["_id"] for lesson in lessons]}}
+        )
+        
+        # Shared videos drop one reference per lesson; the rest are deleted outright
+        for content_hash, refs in Counter(lesson["content_hash"] for lesson in lessons if lesson.get("content_hash")).items():
+            await release_content("video", content_hash, count=refs)
+        unshared = [lesson for lesson in lessons if not lesson.get("content_hash")]
+        public_ids = [
+            lesson.get("video_public_id") or media_store.public_id_from_url(lesson["video_url"])
+            for lesson in unshared if lesson.get("video_url")
+        ]
+        public_ids = [public_id for public_id in public_ids if public_id]
+        schedule_media_cleanup(public_ids, [lesson["video_name"] for lesson in unshared if lesson.get("video_name")])
+        # Lessons still uploading clean up their own asset when they find the lesson gone
+        logger.info(
+            "Course deleted",
+            extra={"course_id": course_id_str, "lessons_deleted": result.deleted_count}
+        )
         
-        # 6️⃣ Return success response
+        # 7️⃣ Return success response
         return DeleteCourseResponse(
             message="Course deleted successfully",
             deleted_course_id=course_id_str,
@@ -284,9 +499,7 @@ async def deleteCourseController(course_id: str, current_user_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to delete course", extra={"course_id": course_id})
         raise HTTPException(
             status_code=500,
             detail=f"Failed to delete course: {str(e)}"
@@ -1,224 +1,449 @@
 import os
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import uuid
+from datetime import datetime, timedelta
 from fastapi import HTTPException, UploadFile
-from models.lessonModel import Lesson
+from models.lessonModel import Lesson, MediaStatus
 from models.courseModel import Course
+from models.uploadSessionModel import UploadSession, UploadSessionStatus
+from models.mediaJobModel import MediaJob
 from beanie import PydanticObjectId
+from config.database import listCollection
 from typing import List
-import traceback
-
-# Configure Cloudinary (make sure you have this in your config)
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
+from utils.logger import get_logger
+from utils.pagination import after_cursor, next_cursor
+from utils.uploads import (
+    save_upload_to_disk, video_extension, video_content_type, MAX_VIDEO_SIZE, VIDEOS_FOLDER, ALLOWED_VIDEO_TYPES
+)
+from utils.media_store import media_store
+from utils.media_queue import enqueue_lesson_upload, enqueue_lesson_uploads, get_latest_job
+from utils.media_content import new_hasher, hash_file, acquire_content, release_content
+from utils.media_cache import media_cache
+from utils.resumable_uploads import (
+    UPLOAD_SESSION_TTL_SECONDS, UPLOAD_CHUNK_LEASE_SECONDS, UPLOAD_CHUNK_RENEW_SECONDS,
+    UPLOAD_SESSION_MAX_OPEN_PER_TEACHER,
+    session_path, preallocate, open_for_writing, pwrite_chunk, open_for_finalize, remove_session_file
 )
+from starlette.concurrency import run_in_threadpool
+from pymongo import ReturnDocument
 
-# Create videos folder if it doesn't exist
-VIDEOS_FOLDER = "videos"
-os.makedirs(VIDEOS_FOLDER, exist_ok=True)
+logger = get_logger("lesson")
 
+# How many videos of one bulk request are written to disk at the same time
+LESSON_BULK_CONCURRENCY = int(os.getenv("LESSON_BULK_CONCURRENCY", "4"))
+LESSON_BULK_MAX_FILES = int(os.getenv("LESSON_BULK_MAX_FILES", "100"))
 
-async def createLessonController(course_id: str, video: UploadFile, teacher_id: str):
-    """Create a new lesson with video upload"""
+
+async def _assertCourseOwner(course_id: str, teacher_id: str, action: str):
+    """Check course ownership with one indexed query instead of loading the course"""
+    owned = await Course.find(
+        {"_id": PydanticObjectId(course_id), "teacher.$id": PydanticObjectId(teacher_id)}
+    ).count()
+    if owned:
+        return
+    # Slow path only on failure: tell a missing course apart from someone else's
+    if not await Course.find({"_id": PydanticObjectId(course_id)}).count():
+        raise HTTPException(status_code=404, detail="Course not found")
+    raise HTTPException(
+        status_code=403,
+        detail=f"You don't have permission to {action} this course"
+    )
+
+
+async def _getOwnedLesson(lesson_id: str, current_user_id: str, action: str) -> Lesson:
+    """Load a lesson and check ownership from its denormalized teacher_id"""
+    lesson = await Lesson.get(PydanticObjectId(lesson_id))
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
     
-    try:
-        # Validate course exists
-        course = await Course.get(PydanticObjectId(course_id))
+    if lesson.teacher_id is None:
+        # Lesson created before teacher_id was stored - resolve once and backfill
+        course = await Course.get(lesson.course_id.ref.id)
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
-       
-        # Check if current user is the course owner
-        if str(course.teacher.ref.id) != teacher_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You don't have permission to add lessons to this course"
-            )
-        
-        # Generate unique filename
-        import uuid
-        file_extension = video.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        local_file_path = os.path.join(VIDEOS_FOLDER, unique_filename)
-        
-       # Save video to local folder first
-        content = await video.read()
-        with open(local_file_path, 'wb') as out_file:
-            out_file.write(content)
-        
-        # Upload to Cloudinary
+        lesson.teacher_id = course.teacher.ref.id
+        await Lesson.find_one(Lesson.id == lesson.id).update(
+            {"$set": {"teacher_id": lesson.teacher_id}}
+        )
+    
+    if str(lesson.teacher_id) != current_user_id:
+        raise HTTPException(
+            status_code=403,
+            detail=f"You don't have permission to {action} this lesson"
+        )
+    return lesson
+
+
+def _removeLocalVideo(video_name: str):
+    media_cache.discard(video_name)
+    local_path = os.path.join(VIDEOS_FOLDER, video_name)
+    if os.path.exists(local_path):
+        os.remove(local_path)
+
+
+async def _spoolVideo(video: UploadFile):
+    """Stream a video to the videos folder, hashing it on the way; returns (video_name, content_hash)"""
+    # Extension from the validated content type, never from the client's filename
+    unique_filename = f"{uuid.uuid4()}.{video_extension(video.content_type)}"
+    hasher = new_hasher()
+    size = await save_upload_to_disk(video, os.path.join(VIDEOS_FOLDER, unique_filename), MAX_VIDEO_SIZE, hasher=hasher)
+    media_cache.add(unique_filename, size)
+    return unique_filename, hasher.hexdigest()
+
+
+async def _createLessonFromSpool(course_id: str, teacher_id: str, unique_filename: str, content_hash: str) -> dict:
+    """Turn a video spooled into the videos folder into a lesson (reused or queued for upload)"""
+    content = await acquire_content("video", content_hash)
+    if content:
+        # Same video already stored - point at it, nothing to upload
+        _removeLocalVideo(unique_filename)
+        lesson = Lesson(
+            course_id=PydanticObjectId(course_id),
+            teacher_id=PydanticObjectId(teacher_id),
+            video_name=content["video_name"],
+            content_type=video_content_type(content["video_name"]),
+            video_url=content["url"],
+            video_public_id=content["public_id"],
+            content_hash=content_hash,
+            media_status=MediaStatus.READY
+        )
         try:
-            upload_result = cloudinary.uploader.upload(
-                local_file_path,
-                resource_type="video",
-                folder="lip_learn_lessons"
-            )
-            cloudinary_url = upload_result["secure_url"]
-        except Exception as e:
-            # If cloudinary upload fails, delete local file
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to upload video to Cloudinary: {str(e)}"
-            )
-       
-        
-        # Create lesson in database
+            await lesson.insert()
+        except Exception:
+            await release_content("video", content_hash)
+            raise
+    else:
+        # Create lesson right away; the upload job publishes the video later
         lesson = Lesson(
-            course_id=course.id,
+            course_id=PydanticObjectId(course_id),
+            teacher_id=PydanticObjectId(teacher_id),
             video_name=unique_filename,
-            video_url=cloudinary_url
+            content_type=video_content_type(unique_filename),
+            media_status=MediaStatus.PENDING,
+            current_job_id=PydanticObjectId()
         )
-       
         await lesson.insert()
-       
-        return {
-            "id": str(lesson.id),
-            "course_id": str(lesson.course_id.ref.id),
-            "video_name": lesson.video_name,
-            "video_url": lesson.video_url,
-            "created_at": lesson.created_at
-        }
+        try:
+            await enqueue_lesson_upload(lesson.id, unique_filename, content_hash=content_hash, job_id=lesson.current_job_id)
+        except BaseException:
+            # Without its job the lesson would stay pending forever - undo the insert
+            await lesson.delete()
+            _removeLocalVideo(unique_filename)
+            raise
+   
+    return {
+        "id": str(lesson.id),
+        "course_id": str(lesson.course_id.ref.id),
+        "video_name": lesson.video_name,
+        "video_url": lesson.video_url,
+        "media_status": lesson.media_status,
+        "created_at": lesson.created_at
+    }
+
+
+async def createLessonController(course_id: str, video: UploadFile, teacher_id: str):
+    """Create a new lesson with video upload"""
+    
+    try:
+        # Validate course exists and current user is the course owner
+        await _assertCourseOwner(course_id, teacher_id, "add lessons to")
+        
+        # Stream video to local folder first (bounded memory, size checked as it arrives)
+        unique_filename, content_hash = await _spoolVideo(video)
+        return await _createLessonFromSpool(course_id, teacher_id, unique_filename, content_hash)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in creatLessonController: {str(e)}")
-        print(traceback.format_exc())  # This prints full error traceback
+        logger.exception("Failed to create lesson", extra={"course_id": course_id})
         raise HTTPException(status_code=500, detail="Failed to create lesson")
 
 
-async def getAllLessonsController(course_id: str, skip: int = 0, limit: int = 10):
-    """Get all lessons for a specific course"""
+def bulkStatusCode(result: dict) -> int:
+    """
+    HTTP status for a bulk create result
+    - 201 when every video became a lesson, 207 (multi-status) for a mix
+    - Nothing created: the items' shared status, else 500 if any failed
+      server-side, else 422
+    """
+    if not result["failed"]:
+        return 201
+    if result["created"]:
+        return 207
+    codes = {item["status_code"] for item in result["results"]}
+    if len(codes) == 1:
+        return codes.pop()
+    return 500 if max(codes) >= 500 else 422
+
+
+async def createLessonsBulkController(course_id: str, videos: List[UploadFile], teacher_id: str):
+    """
+    Create many lessons for one course in a single request
+    - Ownership is checked once for the whole batch
+    - Videos are spooled to disk concurrently (LESSON_BULK_CONCURRENCY)
+    - Lessons and their upload jobs are each written with one insert_many
+    - Cloudinary uploads then run in parallel on the media worker pool
+    - A bad file only fails its own item; each result carries its own status_code
+    """
+    
+    if len(videos) > LESSON_BULK_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many videos. Maximum is {LESSON_BULK_MAX_FILES} per request"
+        )
     
     try:
-        # Validate course exists
-        print(f"Searching for course_id: {course_id}")
-        course = await Course.get(PydanticObjectId(course_id))
-        if not course:
-            raise HTTPException(status_code=404, detail="Course not found")
+        # Validate course exists and current user is the course owner - once
+        await _assertCourseOwner(course_id, teacher_id, "add lessons to")
         
-        print(f"Course found: {course.id}")
+        slots = asyncio.Semaphore(LESSON_BULK_CONCURRENCY)
         
-        # Fetch lessons - Try different query methods
-        # Method 1: Query by reference ID
-        # lessons = await Lesson.find(
-        #     Lesson.course_id.ref.id == PydanticObjectId(course_id)
-        # ).skip(skip).limit(limit).to_list()
+        async def spool(video: UploadFile):
+            """Returns (video_name, content_hash, error, status_code)"""
+            if video.content_type not in ALLOWED_VIDEO_TYPES:
+                return None, None, "Invalid file type. Only MP4, MPEG, MOV, AVI, and WebM videos are allowed", 415
+            async with slots:
+                try:
+                    video_name, content_hash = await _spoolVideo(video)
+                except HTTPException as e:
+                    return None, None, e.detail, e.status_code
+                except OSError as e:
+                    # Disk full, client went away mid-file... - only this item fails
+                    logger.warning("Could not spool bulk lesson video", extra={"course_id": course_id, "error": str(e)})
+                    return None, None, "Could not save video", 500
+            return video_name, content_hash, None, 201
         
-        # If Method 1 doesn't work, try Method 2:
-        lessons = await Lesson.find(
-            {"course_id.$id": PydanticObjectId(course_id)}
-        ).skip(skip).limit(limit).to_list()
+        spooled = await asyncio.gather(*(spool(video) for video in videos), return_exceptions=True)
         
-        print(f"Found {len(lessons)} lesson")
-       
+        # Everything below is undone if the batch fails: spooled files removed,
+        # content references taken for reused videos released
+        spooled_names = [item[0] for item in spooled if not isinstance(item, BaseException) and item[0]]
+        reused = []
+        try:
+            for item in spooled:
+                if isinstance(item, BaseException):
+                    raise item
+            
+            # Ids assigned up front so lessons, jobs and results line up after insert_many
+            lessons = {}
+            uploads = []
+            for index, (video_name, content_hash, error, status_code) in enumerate(spooled):
+                if not video_name:
+                    continue
+                lesson = Lesson(
+                    id=PydanticObjectId(),
+                    course_id=PydanticObjectId(course_id),
+                    teacher_id=PydanticObjectId(teacher_id),
+                    video_name=video_name,
+                    content_type=video_content_type(video_name),
+                    media_status=MediaStatus.PENDING,
+                    current_job_id=PydanticObjectId()
+                )
+                content = await acquire_content("video", content_hash)
+                if content:
+                    # Same video already stored - point at it, nothing to upload
+                    reused.append(content_hash)
+                    _removeLocalVideo(video_name)
+                    lesson.video_name = content["video_name"]
+                    lesson.content_type = video_content_type(content["video_name"])
+                    lesson.video_url = content["url"]
+                    lesson.video_public_id = content["public_id"]
+                    lesson.content_hash = content_hash
+                    lesson.media_status = MediaStatus.READY
+                else:
+                    uploads.append((lesson.current_job_id, lesson.id, video_name, content_hash))
+                lessons[index] = lesson
+            
+            if lessons:
+                await Lesson.insert_many(list(lessons.values()))
+            try:
+                await enqueue_lesson_uploads(uploads)
+            except BaseException:
+                # Without their jobs the lessons would stay pending forever
+                await Lesson.get_pymongo_collection().delete_many({"_id": {"$in": [lesson.id for lesson in lessons.values()]}})
+                await MediaJob.get_pymongo_collection().delete_many({"_id": {"$in": [upload[0] for upload in uploads]}})
+                raise
+        except BaseException:
+            for video_name in spooled_names:
+                _removeLocalVideo(video_name)
+            for content_hash in reused:
+                await release_content("video", content_hash)
+            raise
+        
+        results = []
+        for index, (video, (video_name, content_hash, error, status_code)) in enumerate(zip(videos, spooled)):
+            lesson = lessons.get(index)
+            results.append({
+                "index": index,
+                "filename": video.filename,
+                "status": "created" if lesson else "failed",
+                "status_code": status_code,
+                "error": error,
+                "lesson": {
+                    "id": str(lesson.id),
+                    "course_id": course_id,
+                    "video_name": lesson.video_name,
+                    "video_url": lesson.video_url,
+                    "media_status": lesson.media_status,
+                    "created_at": lesson.created_at
+                } if lesson else None
+            })
+        
+        return {
+            "course_id": course_id,
+            "created": len(lessons),
+            "failed": len(videos) - len(lessons),
+            "results": results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to bulk create lessons", extra={"course_id": course_id})
+        raise HTTPException(status_code=500, detail="Failed to create lessons")
+
+
+# Only the fields LessonResponse needs
+LESSON_LIST_PROJECTION = {
+    "video_name": 1,
+    "video_url": 1,
+    "media_status": 1,
+    "created_at": 1
+}
+LIST_SORT = [("created_at", 1), ("_id", 1)]
+
+
+def _lessonPageQuery(collection, course_id, skip: int = 0, limit: int = 10, cursor: str = None):
+    """One page of a course's projected lessons plus a lookahead row, via the (course_id.$id, created_at, _id) index"""
+    query = {"course_id.$id": PydanticObjectId(course_id)}
+    if cursor:
+        query.update(after_cursor(cursor))
+    rows = collection.find(query, LESSON_LIST_PROJECTION)
+    if not cursor:
+        rows = rows.skip(skip)
+    return rows.sort(LIST_SORT).limit(limit + 1)
+
+
+async def getAllLessonsController(course_id: str, skip: int = 0, limit: int = 10, cursor: str = None):
+    """
+    Get all lessons for a specific course
+    - `cursor` (keyset on created_at, _id) takes precedence over `skip`
+    - Returns (lessons, next_cursor); next_cursor is None on the last page
+    """
+    
+    try:
+        # Validate course exists (_id lookup, no document load)
+        if not await Course.find({"_id": PydanticObjectId(course_id)}).count():
+            raise HTTPException(status_code=404, detail="Course not found")
         
-        # Debug: Print all lessons in database
-        all_lessons = await Lesson.find_all().to_list()
-        print(f"Total lessons in DB: {len(all_lessons)}")
-        for l in all_lessons:
-            print(f"Lesson course_id type: {type(l.course_id)}, value: {l.course_id}")
+        # Fetch one page of projected lessons via the (course_id.$id, created_at, _id) index
+        rows = await _lessonPageQuery(listCollection(Lesson), course_id, skip, limit, cursor).to_list(length=limit + 1)
+        rows, cursor_out = next_cursor(rows, limit)
         
+        # Straight from raw documents to the response shape - no Document hydration
         return [
             {
-                "id": str(lesson.id),
-                "course_id": str(lesson.course_id.ref.id),
-                "video_name": lesson.video_name,
-                "video_url": lesson.video_url,
-                "created_at": lesson.created_at
+                "id": str(row["_id"]),
+                "course_id": course_id,
+                "video_name": row["video_name"],
+                "video_url": row.get("video_url"),
+                "media_status": row.get("media_status", MediaStatus.READY.value),
+                "created_at": row["created_at"]
             }
-            for lesson in lessons
-        ]
+            for row in rows
+        ], cursor_out
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in getAllLessonsController: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to fetch lessons", extra={"course_id": course_id})
         raise HTTPException(status_code=500, detail="Failed to fetch lessons")
 
 async def updateLessonController(lesson_id: str, video: UploadFile, current_user_id: str):
     """Update a lesson's video"""
     
     try:
-        # Get lesson
-        lesson = await Lesson.get(PydanticObjectId(lesson_id))
-        if not lesson:
-            raise HTTPException(status_code=404, detail="Lesson not found")
+        # Get lesson and verify ownership in one round trip
+        lesson = await _getOwnedLesson(lesson_id, current_user_id, "update")
         
-        # Get course to verify ownership
-        course = await Course.get(lesson.course_id.ref.id)
-        if str(course.teacher_id.ref.id) != current_user_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You don't have permission to update this lesson"
-            )
+        # Stream new video to local folder
+        unique_filename, content_hash = await _spoolVideo(video)
         
-        # Store old video info for cleanup
-        old_video_name = lesson.video_name
-        old_video_url = lesson.video_url
+        # A fresh current_job_id retires any upload still queued for this lesson,
+        # so only the newest update can publish its video
+        job_id = PydanticObjectId()
+        content = await acquire_content("video", content_hash)
+        if content:
+            # Same video already stored - swap it in now
+            _removeLocalVideo(unique_filename)
+            fields = {
+                "video_name": content["video_name"],
+                "content_type": video_content_type(content["video_name"]),
+                "video_url": content["url"],
+                "video_public_id": content["public_id"],
+                "content_hash": content_hash,
+                "media_status": MediaStatus.READY.value,
+                "current_job_id": job_id
+            }
+        else:
+            # Old video stays live until the upload job swaps in the new one
+            fields = {"media_status": MediaStatus.PENDING.value, "current_job_id": job_id}
         
-        # Generate unique filename
-        import uuid
-        file_extension = video.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        local_file_path = os.path.join(VIDEOS_FOLDER, unique_filename)
+        # Targeted $set (no full-document save over concurrent writes); the
+        # pre-update document is exactly the video this update replaces
+        previous = await Lesson.get_pymongo_collection().find_one_and_update(
+            {"_id": lesson.id},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            if content:
+                await release_content("video", content_hash)
+            else:
+                _removeLocalVideo(unique_filename)
+            raise HTTPException(status_code=404, detail="Lesson not found")
         
-        # Save new video to local folder
-        content = await video.read()
-        with open(local_file_path, 'wb') as out_file:
-            out_file.write(content)
+        old_video_name = previous["video_name"]
+        old_video_url = previous.get("video_url")
+        old_public_id = previous.get("video_public_id") or media_store.public_id_from_url(old_video_url)
+        old_content_hash = previous.get("content_hash")
         
-        # Upload to Cloudinary
-        try:
-            upload_result = cloudinary.uploader.upload(
-                local_file_path,
-                resource_type="video",
-                folder="lip_learn_lessons"
+        if content:
+            # Let go of the old video
+            if old_content_hash:
+                await release_content("video", old_content_hash)
+            else:
+                _removeLocalVideo(old_video_name)
+                if old_public_id:
+                    try:
+                        await media_store.delete(old_public_id, resource_type="video")
+                    except Exception:
+                        pass
+        else:
+            await enqueue_lesson_upload(
+                lesson.id,
+                unique_filename,
+                replaces_video_name=old_video_name,
+                replaces_video_url=old_video_url,
+                replaces_public_id=old_public_id,
+                content_hash=content_hash,
+                replaces_content_hash=old_content_hash,
+                job_id=job_id
             )
-            cloudinary_url = upload_result["secure_url"]
-        except Exception as e:
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to upload video to Cloudinary: {str(e)}"
-            )
-        
-        # Update lesson
-        lesson.video_name = unique_filename
-        lesson.video_url = cloudinary_url
-        await lesson.save()
-        
-        # Delete old video from local folder
-        old_local_path = os.path.join(VIDEOS_FOLDER, old_video_name)
-        if os.path.exists(old_local_path):
-            os.remove(old_local_path)
-        
-        # Delete old video from Cloudinary
-        try:
-            # Extract public_id from old URL
-            public_id = old_video_url.split("/")[-1].split(".")[0]
-            cloudinary.uploader.destroy(f"lip_learn_lessons/{public_id}", resource_type="video")
-        except:
-            pass  # If deletion fails, just continue
         
         return {
             "id": str(lesson.id),
             "course_id": str(lesson.course_id.ref.id),
-            "video_name": lesson.video_name,
-            "video_url": lesson.video_url,
+            "video_name": fields.get("video_name", old_video_name),
+            "video_url": fields.get("video_url", old_video_url),
+            "media_status": fields["media_status"],
             "created_at": lesson.created_at
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in updateLessonController: {str(e)}")
+        logger.exception("Failed to update lesson", extra={"lesson_id": lesson_id})
         raise HTTPException(status_code=500, detail="Failed to update lesson")
 
 
@@ -226,34 +451,32 @@ async def deleteLessonController(lesson_id: str, current_user_id: str):
     """Delete a lesson"""
     
     try:
-        # Get lesson
-        lesson = await Lesson.get(PydanticObjectId(lesson_id))
-        if not lesson:
-            raise HTTPException(status_code=404, detail="Lesson not found")
-        
-        # Get course to verify ownership
-        course = await Course.get(lesson.course_id.ref.id)
-        if str(course.teacher_id.ref.id) != current_user_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You don't have permission to delete this lesson"
-            )
+        # Get lesson and verify ownership in one round trip
+        lesson = await _getOwnedLesson(lesson_id, current_user_id, "delete")
         
         video_name = lesson.video_name
         video_url = lesson.video_url
+        public_id = lesson.video_public_id or media_store.public_id_from_url(video_url)
         
         # Delete from database
         await lesson.delete()
         
+        if lesson.content_hash:
+            # Shared asset - only removed once no other lesson uses it
+            await release_content("video", lesson.content_hash)
+            return {
+                "message": "Lesson deleted successfully",
+                "deleted_lesson_id": str(lesson_id)
+            }
+        
         # Delete from local folder
-        local_path = os.path.join(VIDEOS_FOLDER, video_name)
-        if os.path.exists(local_path):
-            os.remove(local_path)
+        _removeLocalVideo(video_name)
         
-        # Delete from Cloudinary
+        # Delete from media storage (nothing published yet while the upload is pending)
         try:
-            public_id = video_url.split("/")[-1].split(".")[0]
-            cloudinary.uploader.destroy(f"lip_learn_lessons/{public_id}", resource_type="video")
+            if not public_id:
+                raise ValueError("Video not uploaded yet")
+            await media_store.delete(public_id, resource_type="video")
         except:
             pass
         
@@ -265,5 +488,301 @@ async def deleteLessonController(lesson_id: str, current_user_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in deleteLessonController: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to delete lesson")
\ No newline at end of file
+        logger.exception("Failed to delete lesson", extra={"lesson_id": lesson_id})
+        raise HTTPException(status_code=500, detail="Failed to delete lesson")
+
+
+async def getLessonVideoSourceController(lesson_id: str):
+    """
+    Where a lesson's video can be played from
+    Returns (local_path, stat_result, video_url, content_type); local_path is None
+    when the local copy is gone, video_url is None until the Cloudinary upload finishes.
+    content_type is always an allowed video type or application/octet-stream.
+    A local hit counts as a cache access; a miss starts a background refetch.
+    """
+    
+    try:
+        row = await listCollection(Lesson).find_one(
+            {"_id": PydanticObjectId(lesson_id)}, {"video_name": 1, "video_url": 1, "content_type": 1}
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        
+        local_path = os.path.join(VIDEOS_FOLDER, row["video_name"])
+        try:
+            stat_result = await asyncio.to_thread(os.stat, local_path)
+            media_cache.touch(row["video_name"])
+        except FileNotFoundError:
+            local_path, stat_result = None, None
+            if row.get("video_url"):
+                # Evicted from the local cache - bring it back for the next viewer
+                media_cache.refetch(row["video_url"], row["video_name"])
+        
+        content_type = row.get("content_type")
+        if content_type not in ALLOWED_VIDEO_TYPES:
+            # Lessons stored before content_type existed (or with a foreign type)
+            content_type = video_content_type(row["video_name"])
+        return local_path, stat_result, row.get("video_url"), content_type
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to resolve lesson video", extra={"lesson_id": lesson_id})
+        raise HTTPException(status_code=500, detail="Failed to resolve lesson video")
+
+
+async def getLessonMediaStatusController(lesson_id: str):
+    """Report the upload state of a lesson's video"""
+    
+    try:
+        lesson = await Lesson.get(PydanticObjectId(lesson_id))
+        if not lesson:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        
+        job = await get_latest_job(lesson.id)
+        
+        return {
+            "lesson_id": str(lesson.id),
+            "media_status": lesson.media_status,
+            "video_url": lesson.video_url,
+            "job_id": str(job.id) if job else None,
+            "job_status": job.status if job else None,
+            "progress": job.progress if job else 100,
+            "attempts": job.attempts if job else 0,
+            "error": job.error if job else None
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to fetch lesson media status", extra={"lesson_id": lesson_id})
+        raise HTTPException(status_code=500, detail="Failed to fetch lesson media status")
+
+
+def _uploadSessionItem(session: UploadSession) -> dict:
+    return {
+        "upload_id": str(session.id),
+        "course_id": str(session.course_id),
+        "filename": session.filename,
+        "length": session.length,
+        "offset": session.offset,
+        "expires_at": session.expires_at
+    }
+
+
+async def _getOwnedUploadSession(upload_id: str, current_user_id: str) -> UploadSession:
+    session = await UploadSession.get(PydanticObjectId(upload_id))
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    if str(session.teacher_id) != current_user_id:
+        raise HTTPException(status_code=403, detail="You don't have permission to use this upload session")
+    return session
+
+
+async def createUploadSessionController(course_id: str, filename: str, content_type: str, length: int, teacher_id: str):
+    """Start a resumable upload: session document + preallocated spool file"""
+    
+    if content_type not in ALLOWED_VIDEO_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only MP4, MPEG, MOV, AVI, and WebM videos are allowed"
+        )
+    if length > MAX_VIDEO_SIZE:
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {MAX_VIDEO_SIZE // (1024 * 1024)}MB")
+    
+    try:
+        await _assertCourseOwner(course_id, teacher_id, "add lessons to")
+        
+        # Every session reserves its full length on disk - cap how many one teacher holds
+        open_sessions = await UploadSession.find({
+            "teacher_id": PydanticObjectId(teacher_id),
+            "expires_at": {"$gt": datetime.utcnow()}
+        }).count()
+        if open_sessions >= UPLOAD_SESSION_MAX_OPEN_PER_TEACHER:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many unfinished uploads. Finish or cancel one first (maximum {UPLOAD_SESSION_MAX_OPEN_PER_TEACHER})"
+            )
+        
+        session = UploadSession(
+            course_id=PydanticObjectId(course_id),
+            teacher_id=PydanticObjectId(teacher_id),
+            filename=filename,
+            content_type=content_type,
+            length=length,
+            expires_at=datetime.utcnow() + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS)
+        )
+        session.id = PydanticObjectId()
+        await preallocate(session_path(session.id), length)
+        try:
+            await session.insert()
+        except Exception:
+            remove_session_file(session.id)
+            raise
+        return _uploadSessionItem(session)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to create upload session", extra={"course_id": course_id})
+        raise HTTPException(status_code=500, detail="Failed to create upload session")
+
+
+async def getUploadSessionController(upload_id: str, current_user_id: str):
+    """Current state of a resumable upload (where to resume from)"""
+    session = await _getOwnedUploadSession(upload_id, current_user_id)
+    return _uploadSessionItem(session)
+
+
+async def appendUploadChunkController(upload_id: str, offset: int, stream, current_user_id: str) -> int:
+    """
+    Write request body bytes at `offset` of the session's spool file
+    - `offset` must equal the bytes already received (409 otherwise)
+    - One writer per session at a time, via a lease on the session document
+    - Bytes that arrived before a dropped connection still count
+    Returns the new offset.
+    """
+    session = await _getOwnedUploadSession(upload_id, current_user_id)
+    if session.status != UploadSessionStatus.OPEN:
+        raise HTTPException(status_code=409, detail="Upload is being finalized")
+    if offset != session.offset:
+        raise HTTPException(
+            status_code=409,
+            detail="Offset mismatch",
+            headers={"Upload-Offset": str(session.offset)}
+        )
+    
+    # The lease is ours only while lock_token matches; every write below is conditional on it
+    lock_token = uuid.uuid4().hex
+    sessions = UploadSession.get_pymongo_collection()
+    now = datetime.utcnow()
+    locked = await sessions.update_one(
+        {
+            "_id": session.id,
+            "offset": offset,
+            "status": UploadSessionStatus.OPEN.value,
+            "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]
+        },
+        {"$set": {
+            "locked_until": now + timedelta(seconds=UPLOAD_CHUNK_LEASE_SECONDS),
+            "lock_token": lock_token
+        }}
+    )
+    if not locked.modified_count:
+        raise HTTPException(status_code=409, detail="Another chunk for this upload is in progress")
+    
+    async def record(**fields):
+        """Conditional on still holding the lease; False once another request took it"""
+        now = datetime.utcnow()
+        fields.update({
+            "offset": offset + written,
+            "expires_at": now + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS),
+            "updated_at": now
+        })
+        result = await sessions.update_one({"_id": session.id, "lock_token": lock_token}, {"$set": fields})
+        return result.matched_count > 0
+    
+    path = session_path(session.id)
+    written = 0
+    renewed_at = now
+    try:
+        fd = await run_in_threadpool(open_for_writing, path)
+        try:
+            async for chunk in stream:
+                if not chunk:
+                    continue
+                if offset + written + len(chunk) > session.length:
+                    raise HTTPException(status_code=413, detail="Chunk goes past the declared upload length")
+                if not await run_in_threadpool(pwrite_chunk, fd, path, chunk, offset + written):
+                    raise HTTPException(status_code=409, detail="Upload is being finalized")
+                written += len(chunk)
+                
+                # Keep the lease alive (and progress recorded) while bytes keep arriving
+                if (datetime.utcnow() - renewed_at).total_seconds() >= UPLOAD_CHUNK_RENEW_SECONDS:
+                    renewed_at = datetime.utcnow()
+                    if not await record(locked_until=renewed_at + timedelta(seconds=UPLOAD_CHUNK_LEASE_SECONDS)):
+                        raise HTTPException(status_code=409, detail="Another chunk for this upload is in progress")
+        finally:
+            os.close(fd)
+    finally:
+        # Record progress even when the client went away mid-chunk - unless the
+        # lease was lost, in which case the new holder owns the offset
+        released = await record(locked_until=None, lock_token=None)
+    if not released:
+        raise HTTPException(status_code=409, detail="Another chunk for this upload is in progress")
+    return offset + written
+
+
+async def _reopenUploadSession(session: UploadSession):
+    await UploadSession.get_pymongo_collection().update_one(
+        {"_id": session.id}, {"$set": {"status": UploadSessionStatus.OPEN.value}}
+    )
+
+
+async def finalizeUploadSessionController(upload_id: str, current_user_id: str):
+    """Turn a fully received upload into a lesson, exactly like a one-shot create"""
+    session = await _getOwnedUploadSession(upload_id, current_user_id)
+    if session.offset != session.length:
+        raise HTTPException(
+            status_code=409,
+            detail="Upload is incomplete",
+            headers={"Upload-Offset": str(session.offset)}
+        )
+    
+    now = datetime.utcnow()
+    claimed = await UploadSession.get_pymongo_collection().update_one(
+        {
+            "_id": session.id,
+            "status": UploadSessionStatus.OPEN.value,
+            "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]
+        },
+        {"$set": {
+            "status": UploadSessionStatus.FINALIZING.value,
+            "lock_token": None,
+            "expires_at": now + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS),
+            "updated_at": now
+        }}
+    )
+    if not claimed.modified_count:
+        raise HTTPException(status_code=409, detail="Upload is already being finalized")
+    
+    spool = session_path(session.id)
+    unique_filename = f"{uuid.uuid4()}.{video_extension(session.content_type)}"
+    local_file_path = os.path.join(VIDEOS_FOLDER, unique_filename)
+    try:
+        await _assertCourseOwner(str(session.course_id), current_user_id, "add lessons to")
+        # Exclusive flock: a writer that outlived its lease can't write into the
+        # file while it is hashed or once it has moved into the videos folder
+        spooled = await run_in_threadpool(open_for_finalize, spool)
+        try:
+            content_hash = await hash_file(spooled)
+            await run_in_threadpool(os.replace, spool, local_file_path)
+        finally:
+            spooled.close()
+        media_cache.add(unique_filename, session.length)
+        try:
+            lesson = await _createLessonFromSpool(str(session.course_id), current_user_id, unique_filename, content_hash)
+        except Exception:
+            # Put the bytes back so the client can retry the finalize
+            media_cache.discard(unique_filename)
+            await run_in_threadpool(os.replace, local_file_path, spool)
+            raise
+    except HTTPException:
+        await _reopenUploadSession(session)
+        raise
+    except Exception as e:
+        await _reopenUploadSession(session)
+        logger.exception("Failed to finalize upload", extra={"upload_id": upload_id})
+        raise HTTPException(status_code=500, detail="Failed to finalize upload")
+    
+    await UploadSession.find_one(UploadSession.id == session.id).delete()
+    return lesson
+
+
+async def deleteUploadSessionController(upload_id: str, current_user_id: str):
+    """Abandon a resumable upload"""
+    session = await _getOwnedUploadSession(upload_id, current_user_id)
+    if session.status != UploadSessionStatus.OPEN:
+        raise HTTPException(status_code=409, detail="Upload is being finalized")
+    await session.delete()
+    await run_in_threadpool(remove_session_file, session.id)
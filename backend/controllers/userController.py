@@ -1,9 +1,13 @@
 from models.userModel import User
 from schemas.userSchema import UserCreate,UserResponse,UserLogin
 from fastapi import status,HTTPException
-from passlib.hash import bcrypt
+from utils.passwords import hash_password, verify_password
 from utils.security import create_access_token,verify_access_token
 from fastapi import Response
+from pymongo.errors import DuplicateKeyError
+from utils.logger import get_logger
+
+logger = get_logger("user")
 
 # password_context=CryptContext(
 #     schemes=["bcrypt"],deprecated="auto"
@@ -15,16 +19,17 @@ async def createUserController(body:UserCreate)->UserResponse:
     existingUser=await User.find_one(User.email==body.email)
     
     if existingUser:
-        raise ValueError("User with this email already exist")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User with this email already exist")
     
-    # password hashing
-    hashedPassword=bcrypt.hash(body.password)
-    print(body.password)
-    print(hashedPassword)
+    # password hashing (process pool - keeps the event loop free)
+    hashedPassword=await hash_password(body.password)
     user=User(email=body.email,password=hashedPassword,first_name=body.first_name,last_name=body.last_name,role=body.role)
-    print("Before saving in databse : ",user)
-    await user.insert()
-    print("after saving in database : ",user)
+    try:
+        await user.insert()
+    except DuplicateKeyError:
+        # Another signup with the same email won the race (unique email index)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User with this email already exist")
+    logger.info("User created", extra={"user_id": str(user.id), "role": user.role.value})
 
     return UserResponse(
         id=str(user.id),
@@ -45,10 +50,15 @@ async def loginController(body: UserLogin,response:Response):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
-    # 2. Verify password
-    if not bcrypt.verify(body.password, user.password):
+    # 2. Verify password (process pool - keeps the event loop free)
+    matches, new_hash = await verify_password(body.password, user.password)
+    if not matches:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
+    # BCRYPT_ROUNDS changed since this hash was made - store the upgraded one
+    if new_hash:
+        await User.find_one(User.id == user.id).update({"$set": {"password": new_hash}})
+
     # 3. Create JWT token
     token = create_access_token({"id": str(user.id), "role": user.role})
 
@@ -0,0 +1,35 @@
+# Standalone media upload worker.
+# Run next to the API (sharing its videos folder) with MEDIA_WORKERS_INPROCESS=false:
+#   python media_worker.py
+# Files it removes from the videos folder drop out of the API processes' media
+# cache index on their next rescan (MEDIA_CACHE_RESCAN_SECONDS).
+import asyncio
+import signal
+from config.database import connectDB, closeDB
+from utils.media_store import media_store
+from utils.media_queue import MEDIA_WORKER_CONCURRENCY, start_workers, stop_workers
+from utils.logger import setup_logging, shutdown_logging, get_logger
+
+logger = get_logger("media_worker")
+
+
+async def main():
+    setup_logging()
+    media_store.configure()
+    await connectDB()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    start_workers(stop_event, MEDIA_WORKER_CONCURRENCY)
+    logger.info("Media worker started", extra={"concurrency": MEDIA_WORKER_CONCURRENCY})
+    await stop_event.wait()
+    await stop_workers(stop_event)
+    await closeDB()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,15 +1,59 @@
-from beanie import Document, Link
-from pydantic import Field
+from beanie import Document, Link, PydanticObjectId, before_event, Insert, Replace, Save, SaveChanges
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from pymongo import IndexModel, ASCENDING, TEXT
 from datetime import datetime
 from models.userModel import User
+from utils.text import normalize_text
+
+class TeacherSummary(BaseModel):
+    """Snapshot of the teacher kept on each course so lists need no User lookup"""
+    id: PydanticObjectId
+    first_name: str
+    last_name: str
+
+
+class ThumbnailVariant(BaseModel):
+    """A resized, re-encoded copy of the course thumbnail"""
+    width: int
+    height: int
+    format: str  # webp | avif
+    url: str
+
 
 class Course(Document):
     title: str = Field(min_length=3, max_length=100)
     description: str = Field(min_length=10, max_length=500)
     thumbnail: str  # ✅ Required now
+    thumbnail_public_id: Optional[str] = None  # Media store id, for deletes
+    thumbnail_hash: Optional[str] = None  # media_contents entry shared with identical uploads
+    thumbnail_variants: List[ThumbnailVariant] = []  # Smallest first; empty when none could be made
     teacher: Link[User]  # 🔐 Always set from token, not client
+    teacher_summary: Optional[TeacherSummary] = None  # Kept in sync by User event hooks
+    title_normalized: Optional[str] = None  # Autocomplete key, derived from title on every write
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "courses"
+        indexes = [
+            # Catalog listing order for skip/limit and keyset cursors
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+            # Teacher-filtered listing and exact per-teacher totals
+            IndexModel(
+                [("teacher.$id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="teacher_created_at_id"
+            ),
+            # Full-text search, title matches ranked above description matches
+            IndexModel(
+                [("title", TEXT), ("description", TEXT)],
+                weights={"title": 10, "description": 1},
+                name="title_description_text"
+            ),
+            # Prefix autocomplete as a range scan
+            IndexModel([("title_normalized", ASCENDING)], name="title_normalized"),
+        ]
+
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def normalize_title(self):
+        self.title_normalized = normalize_text(self.title)
@@ -1,11 +1,40 @@
-from beanie import Document, Link
+from beanie import Document, Link, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime
+from enum import Enum
+from typing import Optional
 from models.courseModel import Course
+
+
+class MediaStatus(str, Enum):
+    PENDING = "pending"        # Saved locally, waiting for upload
+    PROCESSING = "processing"  # Upload in progress
+    READY = "ready"
+    FAILED = "failed"
+
+
 class Lesson(Document):
     course_id: Link[Course]
+    teacher_id: Optional[PydanticObjectId] = None  # Copied from the course for single-query ownership checks
     video_name: str  # Filename in videos folder
-    video_url: str   # Cloudinary URL
-    created_at: datetime = datetime.utcnow()
+    content_type: Optional[str] = None  # Served as-is; one of ALLOWED_VIDEO_TYPES
+    video_url: Optional[str] = None   # Cloudinary URL, set once the upload job finishes
+    video_public_id: Optional[str] = None  # Media store id, for deletes
+    media_status: MediaStatus = MediaStatus.READY
+    content_hash: Optional[str] = None  # media_contents entry shared with identical uploads
+    current_job_id: Optional[PydanticObjectId] = None  # Only this upload job may publish a video
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
-        name = "lessons"
\ No newline at end of file
+        name = "lessons"
+        indexes = [
+            # Serves the per-course lesson listing: equality on course, then
+            # (created_at, _id) order for both skip/limit and keyset cursors
+            IndexModel(
+                [("course_id.$id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="course_created_at_id"
+            ),
+            # Media cache eviction checks which local files are published
+            IndexModel([("video_name", ASCENDING)], name="video_name"),
+        ]
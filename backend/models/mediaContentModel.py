@@ -0,0 +1,28 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from typing import Optional, List
+
+
+class MediaContent(Document):
+    """One stored media asset, shared by every upload with the same bytes"""
+    hash: str  # BLAKE2b of the file contents
+    resource_type: str  # "image" (thumbnails) or "video" (lessons)
+    url: str
+    public_id: str
+    video_name: Optional[str] = None  # Local copy in the videos folder
+    refcount: int = 1  # Courses / lessons pointing at this asset
+    variants: Optional[List[dict]] = None  # Resized thumbnails: width, height, format, url, public_id
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "media_contents"
+        indexes = [
+            IndexModel(
+                [("resource_type", ASCENDING), ("hash", ASCENDING)],
+                name="resource_type_hash_unique",
+                unique=True
+            ),
+        ]
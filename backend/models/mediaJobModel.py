@@ -0,0 +1,41 @@
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+
+class MediaJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class MediaJob(Document):
+    lesson_id: PydanticObjectId
+    video_name: str  # Spooled file in videos folder waiting for upload
+    folder: str = "lip_learn_lessons"
+    resource_type: str = "video"
+    replaces_video_name: Optional[str] = None  # Previous video, removed once this one is live
+    replaces_video_url: Optional[str] = None
+    replaces_public_id: Optional[str] = None
+    content_hash: Optional[str] = None  # Registered in media_contents once uploaded
+    replaces_content_hash: Optional[str] = None  # Released once this one is live
+    status: MediaJobStatus = MediaJobStatus.PENDING
+    progress: int = 0  # Percent
+    attempts: int = 0
+    max_attempts: int = 3
+    error: Optional[str] = None
+    run_after: datetime = Field(default_factory=datetime.utcnow)  # Retry backoff
+    locked_until: Optional[datetime] = None  # Lease held by the worker running it
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "media_jobs"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("run_after", ASCENDING)]),
+            IndexModel([("lesson_id", ASCENDING), ("created_at", ASCENDING)]),
+        ]
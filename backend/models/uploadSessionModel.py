@@ -0,0 +1,35 @@
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+
+class UploadSessionStatus(str, Enum):
+    OPEN = "open"              # Accepting chunks
+    FINALIZING = "finalizing"  # Being turned into a lesson
+
+
+class UploadSession(Document):
+    """A resumable lesson video upload; bytes land in videos/uploads/<id>.part"""
+    course_id: PydanticObjectId
+    teacher_id: PydanticObjectId
+    filename: str
+    content_type: str
+    length: int  # Total bytes the client declared
+    offset: int = 0  # Bytes received so far
+    status: UploadSessionStatus = UploadSessionStatus.OPEN
+    locked_until: Optional[datetime] = None  # Held while a chunk is being written
+    lock_token: Optional[str] = None  # Identifies the request holding the lease
+    expires_at: datetime  # Pushed forward on every chunk; swept afterwards
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "upload_sessions"
+        indexes = [
+            IndexModel([("expires_at", ASCENDING)], name="expires_at"),
+            # Per-teacher open session cap
+            IndexModel([("teacher_id", ASCENDING), ("expires_at", ASCENDING)], name="teacher_expires_at"),
+        ]
@@ -2,7 +2,8 @@ from typing import Optional
 from datetime import datetime
 from enum import Enum
 from pydantic import EmailStr,Field
-from beanie import Document
+from beanie import Document, after_event, Replace, Save, SaveChanges, Update
+from pymongo import IndexModel, ASCENDING
 
 
 
@@ -22,3 +23,38 @@ class User(Document):
 
     class Settings:
         name = "users"  # MongoDB collection name
+        indexes = [
+            # Login/signup lookup; unique also closes the concurrent-signup race
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        ]
+
+    @after_event(Replace, Save, SaveChanges, Update)
+    async def propagate_teacher_summary(self):
+        """Refresh the teacher snapshot embedded in this teacher's courses"""
+        if self.role != UserRole.TEACHER:
+            return
+        # Imported here - courseModel imports this module
+        from models.courseModel import Course
+        from utils.response_cache import course_catalog_cache
+        # Only courses whose snapshot differs - saves that leave the name alone
+        # (password rehash, role change) write nothing and keep the cache
+        result = await Course.get_pymongo_collection().update_many(
+            {
+                "teacher.$id": self.id,
+                "$or": [
+                    {"teacher_summary.first_name": {"$ne": self.first_name}},
+                    {"teacher_summary.last_name": {"$ne": self.last_name}}
+                ]
+            },
+            {
+                "$set": {
+                    "teacher_summary": {
+                        "id": self.id,
+                        "first_name": self.first_name,
+                        "last_name": self.last_name
+                    }
+                }
+            }
+        )
+        if result.modified_count:
+            await course_catalog_cache.invalidate()
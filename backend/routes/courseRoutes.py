@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException,Query,Path
-from schemas.courseSchema import CourseResponse,CourseUpdateResponse,DeleteCourseResponse
-from controllers.courseController import createCourseController,getAllCoursesController,updateCourseController,deleteCourseController
+from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException,Query,Path,Request,Response
+from schemas.courseSchema import CourseResponse,CourseListResponse,CourseSearchResponse,CourseDetailResponse,CourseUpdateResponse,DeleteCourseResponse
+from controllers.courseController import createCourseController,getAllCoursesController,searchCoursesController,getCourseDetailController,updateCourseController,deleteCourseController
 from dependencies.auth import require_teacher
-from typing import List,Optional
+from utils.response_cache import course_catalog_cache, etag_matches, make_etag
+from utils.logger import get_logger
+from typing import Optional,Literal
 router = APIRouter(prefix="/api/v1/course", tags=["Course"])
+logger = get_logger("routes.course")
 
 @router.post("/create", response_model=CourseResponse, status_code=201)
 async def create_course(
@@ -75,8 +78,7 @@ async def create_course(
         raise he
     
     except Exception as e:
-        # Log the error (use proper logging in production)
-        print(f"Error creating course: {str(e)}")
+        logger.exception("Error creating course")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while creating the course"
@@ -84,23 +86,88 @@ async def create_course(
         
         
 # routes/courseRoute.py
-@router.get("/all", response_model=List[CourseResponse])
+@router.get("/all", response_model=CourseListResponse)
 async def get_all_courses(
+    request: Request,
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; replaces skip"),
+    teacher_id: Optional[str] = Query(None, description="Only courses by this teacher")
 ):
-    """Get all courses with pagination"""
+    """
+    Get all courses with pagination
+    - skip/limit for compatibility, or `cursor` for constant-cost deep pages
+    - Returns courses with total and next_cursor
+    - Pages are cached and carry an ETag; If-None-Match gets 304 when unchanged
+    """
     try:
-        courses = await getAllCoursesController(skip=skip, limit=limit)
-        return courses
+        async def build_page() -> bytes:
+            page = await getAllCoursesController(skip=skip, limit=limit, cursor=cursor, teacher_id=teacher_id)
+            return CourseListResponse.model_validate(page).model_dump_json().encode()
+        
+        cache_key = f"skip={skip}&limit={limit}&cursor={cursor or ''}&teacher={teacher_id or ''}"
+        etag, body = await course_catalog_cache.get_or_build(cache_key, build_page)
+        
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching courses: {str(e)}")
+        logger.exception("Error fetching courses")
         raise HTTPException(status_code=500, detail="Failed to fetch courses")
     
     
     
 
 
+# Must stay above GET /{course_id}, which would otherwise capture "search"
+@router.get("/search", response_model=CourseSearchResponse)
+async def search_courses(
+    q: str = Query(..., min_length=1, max_length=100, description="Search text or title prefix"),
+    mode: Literal["text", "prefix"] = Query("text", description="text = ranked full-text, prefix = autocomplete"),
+    skip: int = Query(0, ge=0, le=1000, description="Number of results to skip"),
+    limit: int = Query(10, ge=1, le=50, description="Max results to return")
+):
+    """
+    Search courses
+    - mode=text: words in title/description, ranked by relevance (title weighted higher)
+    - mode=prefix: titles starting with q, case and accent insensitive
+    """
+    return await searchCoursesController(q=q, mode=mode, skip=skip, limit=limit)
+
+
+@router.get("/{course_id}", response_model=CourseDetailResponse)
+async def get_course(
+    request: Request,
+    course_id: str = Path(..., description="Course ID"),
+    lesson_limit: int = Query(50, ge=1, le=500, description="Max lessons in the outline")
+):
+    """
+    Get one course with its lesson outline
+    - One MongoDB aggregation for course + lessons + lesson count
+    - ETag derived from updated_at and the outline; If-None-Match gets 304
+    """
+    try:
+        detail = await getCourseDetailController(course_id=course_id, lesson_limit=lesson_limit)
+        body = CourseDetailResponse.model_validate(detail).model_dump_json().encode()
+        
+        # updated_at covers course edits; lesson_count/outline cover lesson changes
+        version = f"{detail['updated_at'].isoformat()}:{detail['lesson_count']}:{lesson_limit}".encode()
+        etag = make_etag(version + b"\n" + body)
+        
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error fetching course", extra={"course_id": course_id})
+        raise HTTPException(status_code=500, detail="Failed to fetch course")
+
+
 @router.put("/{course_id}", response_model=CourseUpdateResponse)
 async def update_course(
     course_id: str = Path(..., description="Course ID"),
@@ -135,7 +202,7 @@ async def update_course(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception("Error updating course", extra={"course_id": course_id})
         raise HTTPException(
             status_code=500,
             detail="Failed to update course"
@@ -163,7 +230,7 @@ async def delete_course(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception("Error deleting course", extra={"course_id": course_id})
         raise HTTPException(
             status_code=500,
             detail="Failed to delete course"
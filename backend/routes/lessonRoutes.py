@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException, Query, Path
-from schemas.lessonSchema import LessonResponse, LessonUpdateResponse, DeleteLessonResponse
-from controllers.lessonController import createLessonController, getAllLessonsController, updateLessonController, deleteLessonController
+from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException, Query, Path, Header, Request, Response
+from fastapi.responses import RedirectResponse
+from schemas.lessonSchema import LessonResponse, LessonUpdateResponse, DeleteLessonResponse, LessonMediaStatusResponse, BulkLessonCreateResponse, UploadSessionCreate, UploadSessionResponse
+from controllers.lessonController import createLessonController, createLessonsBulkController, bulkStatusCode, getAllLessonsController, updateLessonController, deleteLessonController, getLessonMediaStatusController, getLessonVideoSourceController
+from controllers.lessonController import createUploadSessionController, getUploadSessionController, appendUploadChunkController, finalizeUploadSessionController, deleteUploadSessionController
 from dependencies.auth import require_teacher
+from utils.uploads import MAX_VIDEO_SIZE
+from utils.local_media import local_video_response
+from utils.logger import get_logger
 from typing import List,Optional
 
 router = APIRouter(prefix="/api/v1/lesson", tags=["Lesson"])
+logger = get_logger("routes.lesson")
 
 @router.post("/create", response_model=LessonResponse, status_code=201)
 async def create_lesson(
@@ -15,8 +21,9 @@ async def create_lesson(
     """
     Create a new lesson with video upload
     - Requires teacher authentication
-    - Uploads video to local folder then Cloudinary
-    - Saves lesson to MongoDB
+    - Saves video to local folder and the lesson to MongoDB as `pending`
+    - Cloudinary upload runs in the background media queue
+    - Poll /api/v1/lesson/{lesson_id}/media for progress
     """
     
     # Validate file type
@@ -27,17 +34,14 @@ async def create_lesson(
             detail="Invalid file type. Only MP4, MPEG, MOV, AVI, and WebM videos are allowed"
         )
    
-    # Validate file size (max 50MB)
-    contents = await video.read()
-    if len(contents) > 50 * 1024 * 1024:
+    # Reject early when the client-declared size is over the limit (max 50MB);
+    # the controller enforces it again while streaming the file to disk
+    if video.size is not None and video.size > MAX_VIDEO_SIZE:
         raise HTTPException(
-            status_code=400, 
+            status_code=413, 
             detail="File too large. Maximum size is 50MB"
         )
     
-    # Reset file pointer
-    await video.seek(0)
-    
     try:
         # Call controller
         lesson = await createLessonController(
@@ -51,28 +55,192 @@ async def create_lesson(
         raise he
     
     except Exception as e:
-        print(f"Error creating lesson: {str(e)}")
+        logger.exception("Error creating lesson", extra={"course_id": course_id})
         raise HTTPException(
             status_code=500,
             detail="An error occurred while creating the lesson"
         )
 
 
+@router.post("/bulk-create", response_model=BulkLessonCreateResponse, status_code=201)
+async def bulk_create_lessons(
+    response: Response,
+    course_id: str = Form(...),
+    videos: List[UploadFile] = File(...),
+    current_user = Depends(require_teacher)
+):
+    """
+    Create many lessons for one course
+    - Requires teacher authentication, checked once for the whole batch
+    - Each video becomes a `pending` lesson uploaded by the media queue
+    - Returns a result per video; invalid or oversized files fail individually
+    - 201 when all were created, 207 when some failed, an error status when none were
+    """
+    
+    try:
+        result = await createLessonsBulkController(
+            course_id=course_id,
+            videos=videos,
+            teacher_id=str(current_user['id'])
+        )
+        response.status_code = bulkStatusCode(result)
+        return result
+    
+    except HTTPException:
+        raise
+    
+    except Exception as e:
+        logger.exception("Error bulk creating lessons", extra={"course_id": course_id})
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while creating the lessons"
+        )
+
+
+def _uploadHeaders(session: dict) -> dict:
+    return {
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["length"]),
+        "Cache-Control": "no-store"
+    }
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(
+    body: UploadSessionCreate,
+    response: Response,
+    current_user = Depends(require_teacher)
+):
+    """
+    Start a resumable video upload
+    - Requires teacher authentication (course owner)
+    - Then PATCH /uploads/{upload_id} with chunks, HEAD it to find the offset
+      after a dropped connection, and POST /uploads/{upload_id}/finalize
+    """
+    session = await createUploadSessionController(
+        course_id=body.course_id,
+        filename=body.filename,
+        content_type=body.content_type,
+        length=body.length,
+        teacher_id=str(current_user['id'])
+    )
+    response.headers.update(_uploadHeaders(session))
+    response.headers["Location"] = f"{router.prefix}/uploads/{session['upload_id']}"
+    return session
+
+
+@router.api_route("/uploads/{upload_id}", methods=["GET", "HEAD"], response_model=UploadSessionResponse)
+async def get_upload_session(
+    response: Response,
+    upload_id: str = Path(..., description="Upload session ID"),
+    current_user = Depends(require_teacher)
+):
+    """Current offset of a resumable upload (also in the Upload-Offset header)"""
+    session = await getUploadSessionController(upload_id=upload_id, current_user_id=str(current_user['id']))
+    response.headers.update(_uploadHeaders(session))
+    return session
+
+
+@router.patch("/uploads/{upload_id}", status_code=204, response_class=Response)
+async def append_upload_chunk(
+    request: Request,
+    upload_id: str = Path(..., description="Upload session ID"),
+    upload_offset: int = Header(..., ge=0, description="Byte offset this chunk starts at"),
+    content_type: str = Header(...),
+    current_user = Depends(require_teacher)
+):
+    """
+    Send the next chunk of a resumable upload
+    - Raw bytes, Content-Type: application/offset+octet-stream
+    - Upload-Offset must match the server's offset (409 with the right one otherwise)
+    - Responds 204 with the new Upload-Offset
+    """
+    if content_type.split(";")[0].strip() not in ("application/offset+octet-stream", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Send chunks as application/offset+octet-stream")
+    
+    new_offset = await appendUploadChunkController(
+        upload_id=upload_id,
+        offset=upload_offset,
+        stream=request.stream(),
+        current_user_id=str(current_user['id'])
+    )
+    return Response(status_code=204, headers={"Upload-Offset": str(new_offset)})
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=LessonResponse, status_code=201)
+async def finalize_upload_session(
+    upload_id: str = Path(..., description="Upload session ID"),
+    current_user = Depends(require_teacher)
+):
+    """Create the lesson from a completed resumable upload"""
+    return await finalizeUploadSessionController(upload_id=upload_id, current_user_id=str(current_user['id']))
+
+
+@router.delete("/uploads/{upload_id}", status_code=204, response_class=Response)
+async def delete_upload_session(
+    upload_id: str = Path(..., description="Upload session ID"),
+    current_user = Depends(require_teacher)
+):
+    """Abandon a resumable upload and free its space"""
+    await deleteUploadSessionController(upload_id=upload_id, current_user_id=str(current_user['id']))
+    return Response(status_code=204)
+
+
 @router.get("/course/{course_id}", response_model=List[LessonResponse])
 async def get_all_lessons(
+    response: Response,
     course_id: str = Path(..., description="Course ID"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces skip")
 ):
-    """Get all lessons for a specific course with pagination"""
+    """
+    Get all lessons for a specific course with pagination
+    - skip/limit for compatibility, or `cursor` for constant-cost deep pages
+    - X-Next-Cursor response header holds the cursor for the next page
+    """
     try:
-        lessons = await getAllLessonsController(course_id=course_id, skip=skip, limit=limit)
+        lessons, next_cursor = await getAllLessonsController(
+            course_id=course_id, skip=skip, limit=limit, cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return lessons
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching lessons: {str(e)}")
+        logger.exception("Error fetching lessons", extra={"course_id": course_id})
         raise HTTPException(status_code=500, detail="Failed to fetch lessons")
 
 
+@router.get("/{lesson_id}/media", response_model=LessonMediaStatusResponse)
+async def get_lesson_media_status(
+    lesson_id: str = Path(..., description="Lesson ID")
+):
+    """Get the background upload status of a lesson's video"""
+    return await getLessonMediaStatusController(lesson_id=lesson_id)
+
+
+@router.api_route("/{lesson_id}/video", methods=["GET", "HEAD"], response_class=Response)
+async def stream_lesson_video(
+    request: Request,
+    lesson_id: str = Path(..., description="Lesson ID")
+):
+    """
+    Play a lesson's video
+    - Served from the local videos folder when the copy is there
+    - Range requests get 206 partial content (seeking)
+    - ETag / Last-Modified with If-None-Match / If-Modified-Since -> 304
+    - Redirects to the Cloudinary URL when there is no local copy
+    """
+    local_path, stat_result, video_url, content_type = await getLessonVideoSourceController(lesson_id=lesson_id)
+    if local_path:
+        return local_video_response(request, local_path, stat_result, content_type)
+    if video_url:
+        return RedirectResponse(video_url, status_code=307)
+    raise HTTPException(status_code=404, detail="Video not available yet")
+
+
 @router.put("/{lesson_id}", response_model=LessonUpdateResponse)
 async def update_lesson(
     lesson_id: str = Path(..., description="Lesson ID"),
@@ -111,7 +279,7 @@ async def update_lesson(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception("Error updating lesson", extra={"lesson_id": lesson_id})
         raise HTTPException(
             status_code=500,
             detail="Failed to update lesson"
@@ -139,7 +307,7 @@ async def delete_lesson(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.exception("Error deleting lesson", extra={"lesson_id": lesson_id})
         raise HTTPException(
             status_code=500,
             detail="Failed to delete lesson"
@@ -1,31 +1,93 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from config.database import connectDB  # your DB connection function
+from config.database import connectDB, closeDB, poolStats  # your DB connection function
 # Optional: import routers when you have them
 
 from routes.userRoutes import router as user_router
 from routes.courseRoutes import router as course_router
 from routes.lessonRoutes import router as lesson_router
 
-from utils.cloudinary import configure_cloudinary
+from utils.media_store import media_store, LocalStore
+from utils.uploads import UploadSizeLimitMiddleware, MAX_VIDEO_SIZE, MAX_BULK_UPLOAD_SIZE
+from utils.media_queue import MEDIA_WORKERS_INPROCESS, start_workers, stop_workers
+from utils.media_cleanup import drain_media_cleanup
+from utils.media_cache import media_cache
+from utils.local_media import LocalMediaFiles
+from utils.resumable_uploads import start_session_sweeper, stop_session_sweeper
+from utils.logger import setup_logging, shutdown_logging
+from utils.passwords import shutdown_password_pool
+from utils.thumbnails import shutdown_thumbnail_pool
+
+# Queue-based JSON logging; handlers never block on stdout
+setup_logging()
+
+# Configure the media storage backend (MEDIA_BACKEND) when app starts
+media_store.configure()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MongoDB connects here, not at import time
+    await connectDB()
+    # Index the local videos folder (and trim it to its byte budget), then keep
+    # the index in step with the other processes sharing the folder
+    await media_cache.rebuild()
+    media_cache_stop = asyncio.Event()
+    media_cache.start(media_cache_stop)
+    # Run background media uploads in this process unless a separate
+    # media_worker.py process handles them
+    media_workers_stop = asyncio.Event()
+    if MEDIA_WORKERS_INPROCESS:
+        start_workers(media_workers_stop)
+    # Expire abandoned resumable uploads
+    upload_sweeper_stop = asyncio.Event()
+    start_session_sweeper(upload_sweeper_stop)
+
+    yield
+
+    await stop_workers(media_workers_stop)
+    await stop_session_sweeper(upload_sweeper_stop)
+    await media_cache.stop(media_cache_stop)
+    await drain_media_cleanup()
+    shutdown_password_pool()
+    shutdown_thumbnail_pool()
+    await closeDB()
+    shutdown_logging()
+
 
-# Configure Cloudinary when app starts
-configure_cloudinary()
 # Create FastAPI app (like express())
 app = FastAPI(
     title="LipLearn API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# MongoDB startup hook
-@app.on_event("startup")
-async def start_db():
-    await connectDB()
+# Abort oversized video uploads while the body is still streaming in
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits=[
+        ("POST", "/api/v1/lesson/create", MAX_VIDEO_SIZE),
+        ("POST", "/api/v1/lesson/bulk-create", MAX_BULK_UPLOAD_SIZE),
+        ("PUT", "/api/v1/lesson/", MAX_VIDEO_SIZE),
+        ("PATCH", "/api/v1/lesson/uploads/", MAX_VIDEO_SIZE),
+    ]
+)
 
 # Health check route
 @app.get("/")
 async def root():
     return {"status": "API is running"}
 
+# MongoDB connection pool utilization (aggregate numbers only; no auth required)
+@app.get("/health/db")
+async def db_health():
+    return poolStats()
+
+# Local media backend: serve stored files at their URLs
+if isinstance(media_store, LocalStore):
+    app.mount(media_store.base_url, LocalMediaFiles(directory=media_store.root), name="media")
+
 # Include routers (like Express routes) when ready
 app.include_router(user_router)
 app.include_router(course_router)
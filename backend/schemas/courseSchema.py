@@ -6,12 +6,27 @@ class CourseCreate(BaseModel):
     title: str = Field(..., min_length=3)
     description: str
 
+class TeacherSummaryResponse(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+
+
+class ThumbnailVariantResponse(BaseModel):
+    width: int
+    height: int
+    format: str
+    url: str
+
+
 class CourseResponse(BaseModel):
     id: str
     title: str
     description: str
     thumbnail: str
+    thumbnail_variants: List[ThumbnailVariantResponse] = Field(default=[], description="Resized WebP/AVIF copies, smallest first")
     teacher_id: str
+    teacher: Optional[TeacherSummaryResponse] = None
     created_at: datetime
 
 
@@ -23,18 +38,34 @@ class CourseListResponse(BaseModel):
     total: int = Field(description="Total number of courses")
     skip: int = Field(description="Number of courses skipped")
     limit: int = Field(description="Maximum courses returned")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
     
     class Config:
         from_attributes = True
     
     
+class CourseSearchItem(CourseResponse):
+    score: Optional[float] = Field(None, description="Text relevance, only set in text mode")
+
+
+class CourseSearchResponse(BaseModel):
+    """Search / autocomplete results"""
+    query: str
+    mode: str
+    skip: int
+    limit: int
+    courses: List[CourseSearchItem]
+
+
 class CourseUpdateResponse(BaseModel):
     """Response after updating a course"""
     id: str
     title: str
     description: str
     thumbnail: str
+    thumbnail_variants: List[ThumbnailVariantResponse] = []
     teacher_id: str
+    teacher: Optional[TeacherSummaryResponse] = None
     created_at: datetime
    
     
@@ -47,4 +78,28 @@ class DeleteCourseResponse(BaseModel):
     """Response after deleting a course"""
     message: str
     deleted_course_id: str
-    deleted_course_title: str
\ No newline at end of file
+    deleted_course_title: str
+
+
+class LessonOutlineItem(BaseModel):
+    """Lesson entry in a course detail outline"""
+    id: str
+    video_name: str
+    video_url: Optional[str] = None
+    media_status: str = "ready"
+    created_at: datetime
+
+
+class CourseDetailResponse(BaseModel):
+    """Course with its lesson outline"""
+    id: str
+    title: str
+    description: str
+    thumbnail: str
+    thumbnail_variants: List[ThumbnailVariantResponse] = []
+    teacher_id: str
+    teacher: Optional[TeacherSummaryResponse] = None
+    created_at: datetime
+    updated_at: datetime
+    lesson_count: int = Field(description="Total lessons in the course")
+    lessons: List[LessonOutlineItem] = Field(description="First lessons, oldest first, up to lesson_limit")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 class LessonCreate(BaseModel):
@@ -10,7 +10,8 @@ class LessonResponse(BaseModel):
     id: str
     course_id: str
     video_name: str  # Filename stored in videos folder
-    video_url: str   # Cloudinary URL
+    video_url: Optional[str] = None   # Cloudinary URL, null until upload finishes
+    media_status: str = "ready"  # pending | processing | ready | failed
     created_at: datetime
     
     class Config:
@@ -21,7 +22,8 @@ class LessonUpdateResponse(BaseModel):
     id: str
     course_id: str
     video_name: str
-    video_url: str
+    video_url: Optional[str] = None
+    media_status: str = "ready"
     created_at: datetime
     
     class Config:
@@ -30,4 +32,52 @@ class LessonUpdateResponse(BaseModel):
 class DeleteLessonResponse(BaseModel):
     """Response after deleting a lesson"""
     message: str
-    deleted_lesson_id: str
\ No newline at end of file
+    deleted_lesson_id: str
+
+
+class LessonMediaStatusResponse(BaseModel):
+    """Upload progress of a lesson's video"""
+    lesson_id: str
+    media_status: str
+    video_url: Optional[str] = None
+    job_id: Optional[str] = None
+    job_status: Optional[str] = None
+    progress: int = Field(description="Upload progress in percent")
+    attempts: int
+    error: Optional[str] = None
+
+
+class BulkLessonItemResult(BaseModel):
+    """Outcome for one video of a bulk create"""
+    index: int
+    filename: Optional[str] = None
+    status: str  # created | failed
+    status_code: int  # 201, or why this item failed (413, 415, 500...)
+    error: Optional[str] = None
+    lesson: Optional[LessonResponse] = None
+
+
+class BulkLessonCreateResponse(BaseModel):
+    """Response after creating lessons in bulk"""
+    course_id: str
+    created: int
+    failed: int
+    results: List[BulkLessonItemResult]
+
+
+class UploadSessionCreate(BaseModel):
+    """Start a resumable upload"""
+    course_id: str
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    length: int = Field(..., gt=0, description="Total video size in bytes")
+
+
+class UploadSessionResponse(BaseModel):
+    """State of a resumable upload"""
+    upload_id: str
+    course_id: str
+    filename: str
+    length: int
+    offset: int = Field(description="Bytes received so far - resume from here")
+    expires_at: datetime
@@ -0,0 +1,187 @@
+# tests/conftest.py
+# Tests import the app modules the same way run.py does (from the backend folder).
+# Index tests run against a real MongoDB and are skipped unless MONGO_URI is set.
+import asyncio
+import io
+import os
+import sys
+import uuid
+import pytest
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Never reach a real media service from tests: the in-memory Cloudinary double, without latency
+os.environ["MEDIA_BACKEND"] = "fake"
+os.environ["FAKE_MEDIA_LATENCY"] = "0"
+os.environ["FAKE_MEDIA_JITTER"] = "0"
+
+
+@pytest.fixture
+def mongo_db():
+    """Throwaway database on MONGO_URI; tests that need one are skipped without it"""
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        pytest.skip("MONGO_URI is not set")
+    from pymongo import MongoClient
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    name = f"liplearn_test_{uuid.uuid4().hex[:12]}"
+    try:
+        yield client[name]
+    finally:
+        client.drop_database(name)
+        client.close()
+
+
+@pytest.fixture
+def declared_indexes(mongo_db):
+    """Create a model's Settings.indexes exactly as reconcileIndexes does; returns its collection"""
+    def create(model):
+        collection = mongo_db[model.Settings.name]
+        collection.create_indexes(list(model.Settings.indexes))
+        return collection
+    return create
+
+
+def _walk(node, stages):
+    if isinstance(node, dict):
+        if "stage" in node:
+            stages.append(node)
+        for value in node.values():
+            _walk(value, stages)
+    elif isinstance(node, list):
+        for value in node:
+            _walk(value, stages)
+
+
+# Added by the driver to every command; explain takes the bare command
+_SESSION_FIELDS = {"$db", "lsid", "$clusterTime", "$readPreference", "txnNumber", "readConcern"}
+
+
+class Plan:
+    """The parts of explain() output the index tests assert on"""
+
+    def __init__(self, explained: dict):
+        stages = []
+        _walk(explained["queryPlanner"]["winningPlan"], stages)
+        self.stages = [stage["stage"] for stage in stages]
+        self.indexes = {stage["indexName"] for stage in stages if "indexName" in stage}
+        self.docs_examined = explained["executionStats"]["totalDocsExamined"]
+        self.keys_examined = explained["executionStats"]["totalKeysExamined"]
+
+    def uses_index(self, name: str) -> bool:
+        return any("IXSCAN" in stage for stage in self.stages) and name in self.indexes
+
+
+@pytest.fixture
+def explain():
+    """explain(cursor) -> Plan, with executionStats"""
+    return lambda cursor: Plan(cursor.explain())
+
+
+@pytest.fixture
+def app_db(monkeypatch, tmp_path):
+    """
+    run(scenario) -> awaits scenario() with Beanie initialised on a throwaway
+    database and the videos folder inside tmp_path; background media cleanups
+    are drained before the database is dropped. run.commands lists the name of
+    every command sent to MongoDB, for round-trip counts; inside a scenario,
+    `await run.explain_sent("find")` explains the last such command the app sent
+    """
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        pytest.skip("MONGO_URI is not set")
+    # VIDEOS_FOLDER (and the upload spool folder under it) are relative paths
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join("videos", "uploads"))
+
+    commands = []
+    sent = []
+    databases = []
+
+    class CommandCounter(monitoring.CommandListener):
+        def started(self, event):
+            commands.append(event.command_name)
+            sent.append(dict(event.command))
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    def run(scenario):
+        async def main():
+            from beanie import init_beanie
+            from pymongo import AsyncMongoClient
+            from config.database import DOCUMENT_MODELS
+            from utils.media_cleanup import drain_media_cleanup
+            client = AsyncMongoClient(uri, serverSelectionTimeoutMS=5000, event_listeners=[CommandCounter()])
+            name = f"liplearn_test_{uuid.uuid4().hex[:12]}"
+            databases.append(client[name])
+            try:
+                await init_beanie(database=client[name], document_models=DOCUMENT_MODELS)
+                result = await scenario()
+                await drain_media_cleanup(timeout=5)
+                return result
+            finally:
+                await client.drop_database(name)
+                await client.close()
+        return asyncio.run(main())
+
+    async def explain_sent(command_name: str) -> Plan:
+        command = next(command for command in reversed(sent) if next(iter(command)) == command_name)
+        command = {key: value for key, value in command.items() if key not in _SESSION_FIELDS}
+        return Plan(await databases[-1].command("explain", command, verbosity="executionStats"))
+
+    run.commands = commands
+    run.explain_sent = explain_sent
+    return run
+
+
+async def create_teacher_course(email: str = "teacher@example.com"):
+    """A teacher and one of their courses; returns (teacher_id, course_id) as strings"""
+    from models.courseModel import Course
+    from models.userModel import User, UserRole
+    teacher = User(email=email, password="hashed-password", role=UserRole.TEACHER, first_name="Teacher", last_name="Person")
+    await teacher.insert()
+    course = Course(
+        title="Lip reading basics",
+        description="Reading lips from the very start",
+        thumbnail="https://example.test/thumbnail.png",
+        teacher=teacher
+    )
+    await course.insert()
+    return str(teacher.id), str(course.id)
+
+
+def video_file(data: bytes, filename: str = "lesson.mp4", content_type: str = "video/mp4"):
+    """UploadFile as the lesson routes receive it"""
+    from fastapi import UploadFile
+    from starlette.datastructures import Headers
+    return UploadFile(io.BytesIO(data), size=len(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+@pytest.fixture
+def course_factory():
+    return create_teacher_course
+
+
+@pytest.fixture
+def make_video():
+    return video_file
+
+
+async def run_media_jobs() -> int:
+    """Process every runnable upload job inline, like a media worker; returns how many ran"""
+    from utils.media_queue import claim_next_job, process_job
+    ran = 0
+    while (job := await claim_next_job()) is not None:
+        await process_job(job)
+        ran += 1
+    return ran
+
+
+@pytest.fixture
+def media_jobs():
+    return run_media_jobs
@@ -0,0 +1,111 @@
+# tests/test_auth_cache.py
+# Verified JWT claims are reused per token until the token's exp, the cache
+# stays bounded, and bad tokens are never cached.
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from starlette.requests import Request
+from utils import security
+from utils.security import ALGORITHM, SECRET_KEY, create_access_token, verify_access_token
+from dependencies.auth import get_current_user, require_teacher
+
+
+@pytest.fixture(autouse=True)
+def decodes(monkeypatch):
+    """Empty cache per test; counts real signature checks"""
+    monkeypatch.setattr(security, "_claims_cache", type(security._claims_cache)())
+    calls = []
+    decode = security._decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(security, "_decode_token", counting_decode)
+    return calls
+
+
+def _token(exp, **claims) -> str:
+    return jwt.encode({"sub": "user-1", "role": "teacher", **claims, "exp": exp}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def test_repeat_requests_skip_decoding(decodes):
+    token = create_access_token({"sub": "user-1", "role": "teacher"})
+
+    first = verify_access_token(token)
+    second = verify_access_token(token)
+
+    assert first == second and first["sub"] == "user-1"
+    assert len(decodes) == 1
+
+
+def test_cached_claims_are_copies(decodes):
+    token = create_access_token({"sub": "user-1", "role": "student"})
+
+    verify_access_token(token)["role"] = "teacher"
+
+    assert verify_access_token(token)["role"] == "student"
+
+
+def test_cached_token_expires_with_its_exp(decodes):
+    # Whole seconds, like the tokens create_access_token issues
+    token = _token(int(time.time()) + 1)
+    assert verify_access_token(token)
+
+    time.sleep(2.1)
+
+    assert verify_access_token(token) is None
+    assert len(decodes) == 2
+    assert not security._claims_cache
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-jwt",
+    jwt.encode({"sub": "user-1", "exp": time.time() + 60}, "someone-elses-key", algorithm=ALGORITHM),
+])
+def test_invalid_tokens_are_not_cached(decodes, token):
+    assert verify_access_token(token) is None
+    assert verify_access_token(token) is None
+    assert len(decodes) == 2
+    assert not security._claims_cache
+
+
+def test_cache_is_bounded_lru(decodes, monkeypatch):
+    monkeypatch.setattr(security, "JWT_CACHE_SIZE", 2)
+    tokens = [_token(time.time() + 60, n=n) for n in range(3)]
+
+    verify_access_token(tokens[0])
+    verify_access_token(tokens[1])
+    verify_access_token(tokens[0])  # most recently used again
+    verify_access_token(tokens[2])  # evicts tokens[1]
+    decodes.clear()
+
+    verify_access_token(tokens[0])
+    verify_access_token(tokens[1])
+    assert decodes == [tokens[1]]
+    assert len(security._claims_cache) == 2
+
+
+def _request(token: str = None) -> Request:
+    headers = [(b"cookie", f"access_token={token}".encode())] if token else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def test_dependencies_use_the_cache(decodes):
+    teacher = create_access_token({"sub": "user-1", "role": "teacher"})
+    student = create_access_token({"sub": "user-2", "role": "student"})
+
+    for _ in range(3):
+        assert require_teacher(asyncio.run(get_current_user(_request(teacher))))["sub"] == "user-1"
+    assert len(decodes) == 1
+
+    with pytest.raises(HTTPException) as raised:
+        require_teacher(asyncio.run(get_current_user(_request(student))))
+    assert raised.value.status_code == 403
+
+    for token in (None, "garbage"):
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(get_current_user(_request(token)))
+        assert raised.value.status_code == 401
@@ -0,0 +1,94 @@
+# tests/test_bulk_lessons.py
+# Bulk lesson creation reports a status per video and an overall 201 / 207 /
+# error status, and a batch that fails part-way leaves nothing behind.
+# The Mongo tests need MONGO_URI.
+import os
+import pytest
+from fastapi import HTTPException, Response
+from models.lessonModel import Lesson
+from models.mediaContentModel import MediaContent
+from models.mediaJobModel import MediaJob
+from controllers import lessonController
+from controllers.lessonController import bulkStatusCode, createLessonController
+from routes.lessonRoutes import bulk_create_lessons
+from utils.uploads import VIDEOS_FOLDER
+
+
+def _result(*codes):
+    return {
+        "created": codes.count(201),
+        "failed": len(codes) - codes.count(201),
+        "results": [{"status_code": code} for code in codes]
+    }
+
+
+@pytest.mark.parametrize("codes, expected", [
+    ((201, 201), 201),
+    ((201, 415), 207),
+    ((201, 500), 207),
+    ((415, 415), 415),
+    ((413, 415), 422),
+    ((415, 500), 500),
+])
+def test_bulk_status_code(codes, expected):
+    assert bulkStatusCode(_result(*codes)) == expected
+
+
+def test_route_status_follows_the_items(app_db, course_factory, make_video):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        teacher = {"id": teacher_id, "role": "teacher"}
+
+        response = Response()
+        mixed = await bulk_create_lessons(response, course_id, [
+            make_video(b"good video"),
+            make_video(b"not a video", filename="notes.txt", content_type="text/plain")
+        ], teacher)
+        assert response.status_code == 207
+        assert [item["status_code"] for item in mixed["results"]] == [201, 415]
+        assert [item["status"] for item in mixed["results"]] == ["created", "failed"]
+        assert mixed["results"][1]["lesson"] is None
+
+        response = Response()
+        await bulk_create_lessons(response, course_id, [make_video(b"another video")], teacher)
+        assert response.status_code == 201
+
+        response = Response()
+        rejected = await bulk_create_lessons(response, course_id, [
+            make_video(b"nope", filename="notes.txt", content_type="text/plain")
+        ], teacher)
+        assert response.status_code == 415
+        assert rejected["created"] == 0
+        assert await Lesson.find_all().count() == 2
+
+    app_db(scenario)
+
+
+@pytest.mark.parametrize("failing", ["insert", "enqueue"])
+def test_failed_batch_is_undone(app_db, course_factory, make_video, media_jobs, monkeypatch, failing):
+    async def broken(*args, **kwargs):
+        raise RuntimeError(f"{failing} failed")
+
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        stored = await createLessonController(course_id, make_video(b"stored video"), teacher_id)
+        assert await media_jobs() == 1
+
+        with monkeypatch.context() as patch:
+            if failing == "insert":
+                patch.setattr(Lesson, "insert_many", classmethod(broken))
+            else:
+                patch.setattr(lessonController, "enqueue_lesson_uploads", broken)
+            with pytest.raises(HTTPException) as raised:
+                await lessonController.createLessonsBulkController(course_id, [
+                    make_video(b"stored video"),  # reuses the stored asset
+                    make_video(b"fresh video")    # would be uploaded
+                ], teacher_id)
+
+        assert raised.value.status_code == 500
+        assert [str(lesson.id) for lesson in await Lesson.find_all().to_list()] == [stored["id"]]
+        assert await MediaJob.find_all().count() == 1
+        assert (await MediaContent.find_one({})).refcount == 1
+        assert sorted(os.listdir(VIDEOS_FOLDER)) == sorted([stored["video_name"], "uploads"])
+
+    app_db(scenario)
@@ -0,0 +1,67 @@
+# tests/test_counts.py
+# CachedCount reads estimated_document_count at most once per refresh
+# interval, concurrent callers share that read, and local writes adjust it.
+import asyncio
+from utils.counts import CachedCount
+
+
+class FakeCollection:
+    def __init__(self, size: int):
+        self.size = size
+        self.calls = 0
+
+    async def estimated_document_count(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.size
+
+
+class FakeModel:
+    collection = FakeCollection(0)
+
+    @classmethod
+    def get_pymongo_collection(cls):
+        return cls.collection
+
+
+def _count(size: int, refresh_seconds: float = 30) -> CachedCount:
+    FakeModel.collection = FakeCollection(size)
+    return CachedCount(FakeModel, refresh_seconds)
+
+
+def test_concurrent_callers_share_one_read():
+    count = _count(42)
+
+    async def run():
+        return await asyncio.gather(*(count.get() for _ in range(20)))
+
+    assert asyncio.run(run()) == [42] * 20
+    assert FakeModel.collection.calls == 1
+
+
+def test_refreshes_after_the_interval():
+    count = _count(5, refresh_seconds=30)
+
+    assert asyncio.run(count.get()) == 5
+    FakeModel.collection.size = 7
+    assert asyncio.run(count.get()) == 5
+    count._fetched_at -= 31  # as if the interval had passed
+    assert asyncio.run(count.get()) == 7
+    assert FakeModel.collection.calls == 2
+
+
+def test_adjust_and_invalidate():
+    count = _count(3)
+
+    count.adjust(+1)  # nothing cached yet: no guess
+    assert asyncio.run(count.get()) == 3
+
+    count.adjust(+2)
+    assert asyncio.run(count.get()) == 5
+    count.adjust(-10)
+    assert asyncio.run(count.get()) == 0
+    assert FakeModel.collection.calls == 1
+
+    count.invalidate()
+    assert asyncio.run(count.get()) == 3
+    assert FakeModel.collection.calls == 2
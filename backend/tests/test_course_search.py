@@ -0,0 +1,84 @@
+# tests/test_course_search.py
+# Prefix autocomplete must be a bounded range scan on title_normalized that
+# already returns index order - no in-memory SORT, no per-catalog cost.
+# Plans come from the query searchCoursesController runs (_courseSearchQuery).
+from datetime import datetime
+from bson import DBRef, ObjectId
+import pytest
+from controllers.courseController import _courseSearchQuery, searchCoursesController
+from models.courseModel import Course
+from utils.text import normalize_text
+
+WORDS = ["lip", "reading", "basics", "advanced", "vowels", "sounds", "practice", "daily", "speech", "Lípreading"]
+PAGE = 10
+
+
+@pytest.fixture
+def courses(declared_indexes):
+    collection = declared_indexes(Course)
+    teacher = DBRef("users", ObjectId())
+    titles = [f"{WORDS[i % 10]} {WORDS[(i // 10) % 10]} {i}" for i in range(5000)]
+    collection.insert_many([
+        {
+            "title": title,
+            "title_normalized": normalize_text(title),
+            "description": "Course description",
+            "thumbnail": "",
+            "teacher": teacher,
+            "created_at": datetime(2024, 1, 1)
+        }
+        for title in titles
+    ])
+    return collection
+
+
+def _prefix_page(collection, q: str):
+    return _courseSearchQuery(collection, q, mode="prefix", limit=PAGE)
+
+
+@pytest.mark.parametrize("q", ["lip", "LIP READ", "lipreading", "vowels s"])
+def test_prefix_mode_is_bounded_ixscan_without_sort(courses, explain, q):
+    plan = explain(_prefix_page(courses, q))
+
+    assert plan.uses_index("title_normalized")
+    assert "COLLSCAN" not in plan.stages
+    assert "SORT" not in plan.stages
+    assert plan.keys_examined <= PAGE + 1
+    assert plan.docs_examined <= PAGE
+
+
+def test_prefix_mode_matches_normalized_titles(courses):
+    titles = [row["title"] for row in _prefix_page(courses, "LÍPREADING")]
+
+    assert titles and all(normalize_text(title).startswith("lipreading") for title in titles)
+
+
+def test_text_mode_uses_text_index(courses, explain):
+    plan = explain(_courseSearchQuery(courses, "vowels", mode="text", limit=PAGE))
+
+    assert plan.uses_index("title_description_text")
+    assert "COLLSCAN" not in plan.stages
+
+
+def test_search_controller_ranks_title_matches_first(app_db, course_factory):
+    async def scenario():
+        teacher_id, _ = await course_factory()
+        await Course.get_pymongo_collection().insert_many([
+            {"title": "Daily practice", "title_normalized": "daily practice",
+             "description": "Vowels and more vowels", "thumbnail": "", "teacher": DBRef("users", ObjectId(teacher_id)),
+             "created_at": datetime(2024, 1, 1)},
+            {"title": "Vowels first", "title_normalized": "vowels first",
+             "description": "Reading lips from the very start", "thumbnail": "", "teacher": DBRef("users", ObjectId(teacher_id)),
+             "created_at": datetime(2024, 1, 1)},
+        ])
+
+        ranked = await searchCoursesController("vowels", mode="text")
+        prefix = await searchCoursesController("VOW", mode="prefix")
+        empty = await searchCoursesController("  ", mode="text")
+
+        assert [course["title"] for course in ranked["courses"]] == ["Vowels first", "Daily practice"]
+        assert ranked["courses"][0]["score"] > ranked["courses"][1]["score"]
+        assert [course["title"] for course in prefix["courses"]] == ["Vowels first"]
+        assert empty["courses"] == []
+
+    app_db(scenario)
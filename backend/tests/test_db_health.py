@@ -0,0 +1,44 @@
+# tests/test_db_health.py
+# /health/db is public: it reports pool totals and utilisation, never the
+# addresses of the Mongo servers behind them.
+from types import SimpleNamespace
+from config import database
+from config.database import PoolMetrics
+
+
+def _event(host: str):
+    return SimpleNamespace(address=(host, 27017))
+
+
+def test_pool_stats_are_aggregate_numbers(monkeypatch):
+    metrics = PoolMetrics()
+    monkeypatch.setattr(database, "pool_metrics", metrics)
+    monkeypatch.setattr(database, "MONGO_MAX_POOL_SIZE", 10)
+    for host, busy in (("db-0.internal", 3), ("db-1.internal", 1)):
+        for _ in range(busy + 1):
+            metrics.connection_created(_event(host))
+        for _ in range(busy):
+            metrics.connection_checked_out(_event(host))
+    metrics.connection_check_out_failed(_event("db-1.internal"))
+
+    stats = database.poolStats()
+
+    assert stats == {
+        "max_pool_size": 10,
+        "min_pool_size": database.MONGO_MIN_POOL_SIZE,
+        "servers": 2,
+        "open": 6,
+        "checked_out": 4,
+        "checkout_failures": 1,
+        "created_total": 6,
+        "utilization": 0.3
+    }
+    assert "internal" not in repr(stats)
+
+
+def test_pool_stats_before_any_connection(monkeypatch):
+    monkeypatch.setattr(database, "pool_metrics", PoolMetrics())
+
+    stats = database.poolStats()
+
+    assert stats["servers"] == 0 and stats["utilization"] == 0
@@ -0,0 +1,136 @@
+# tests/test_index_usage.py
+# Every hot query is served by an index declared in Settings.indexes.
+# Queries come from the controllers: the list query builders directly, and
+# Beanie lookups as the app sent them (app_db's explain_sent).
+from datetime import datetime, timedelta
+from bson import DBRef, ObjectId
+import pytest
+from fastapi import HTTPException, Response
+from controllers.courseController import _courseFilters, _coursePageQuery
+from controllers.lessonController import _lessonPageQuery
+from controllers.userController import createUserController, loginController
+from models.courseModel import Course
+from models.lessonModel import Lesson
+from models.userModel import User, UserRole
+from schemas.userSchema import UserCreate, UserLogin
+from utils import passwords
+
+USERS = 300
+COURSES_PER_TEACHER = 50
+
+
+@pytest.fixture
+def courses(declared_indexes):
+    collection = declared_indexes(Course)
+    teacher_ids = [ObjectId() for _ in range(4)]
+    start = datetime(2024, 1, 1)
+    collection.insert_many([
+        {
+            "title": f"Course {i}",
+            "title_normalized": f"course {i}",
+            "description": "About lip reading",
+            "thumbnail": "",
+            "teacher": DBRef("users", teacher_id),
+            "created_at": start + timedelta(minutes=i)
+        }
+        for teacher_id in teacher_ids
+        for i in range(COURSES_PER_TEACHER)
+    ])
+    return collection, teacher_ids[0]
+
+
+async def _seed_users():
+    await User.get_pymongo_collection().insert_many([
+        {"email": f"user{i}@example.com", "password": "hashed-password", "role": "teacher",
+         "first_name": "Name", "last_name": "Surname"}
+        for i in range(USERS)
+    ])
+
+
+def _signup(email: str = "user1@example.com") -> UserCreate:
+    return UserCreate(email=email, password="secret-password", first_name="New", last_name="Person", role=UserRole.STUDENT)
+
+
+def test_login_email_lookup_uses_unique_index(app_db):
+    async def scenario():
+        await _seed_users()
+
+        with pytest.raises(HTTPException):
+            await loginController(UserLogin(email="user42@example.org", password="whatever"), Response())
+        plan = await app_db.explain_sent("find")
+
+        assert plan.uses_index("email_unique")
+        assert "COLLSCAN" not in plan.stages
+        assert plan.docs_examined == 0
+
+    app_db(scenario)
+
+
+def test_duplicate_signup_is_409(app_db, monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+
+    async def scenario():
+        await _seed_users()
+
+        with pytest.raises(HTTPException) as raised:
+            await createUserController(_signup())
+        assert raised.value.status_code == 409
+        assert (await app_db.explain_sent("find")).uses_index("email_unique")
+
+    app_db(scenario)
+    passwords.shutdown_password_pool()
+
+
+def test_concurrent_duplicate_signup_is_409(app_db, monkeypatch):
+    """The email check passed but another signup inserted first: the unique index decides"""
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+
+    async def nobody():
+        return None
+
+    async def scenario():
+        await _seed_users()
+        with monkeypatch.context() as patch:
+            patch.setattr(User, "find_one", classmethod(lambda cls, *args, **kwargs: nobody()))
+            with pytest.raises(HTTPException) as raised:
+                await createUserController(_signup())
+        assert raised.value.status_code == 409
+        assert await User.find(User.email == "user1@example.com").count() == 1
+
+    app_db(scenario)
+    passwords.shutdown_password_pool()
+
+
+def test_lesson_course_query_uses_index(declared_indexes, explain):
+    collection = declared_indexes(Lesson)
+    course_id = ObjectId()
+    collection.insert_many([
+        {"course_id": DBRef("courses", ObjectId() if i % 2 else course_id), "video_name": f"{i}.mp4",
+         "created_at": datetime(2024, 1, 1)}
+        for i in range(200)
+    ])
+
+    plan = explain(_lessonPageQuery(collection, course_id, limit=10))
+
+    assert plan.uses_index("course_created_at_id")
+    assert plan.docs_examined <= 11
+
+
+def test_teacher_course_listing_uses_index(courses, explain):
+    collection, teacher_id = courses
+
+    plan = explain(_coursePageQuery(collection, limit=10, teacher_id=str(teacher_id)))
+
+    assert plan.uses_index("teacher_created_at_id")
+    assert "SORT" not in plan.stages
+    assert plan.docs_examined <= 11
+
+
+def test_teacher_course_lookup_uses_index(courses, explain):
+    """Exact per-teacher totals and the teacher_summary fan-out filter on teacher.$id alone"""
+    collection, teacher_id = courses
+
+    plan = explain(collection.find(_courseFilters(str(teacher_id))))
+
+    assert plan.uses_index("teacher_created_at_id")
+    assert plan.docs_examined == COURSES_PER_TEACHER
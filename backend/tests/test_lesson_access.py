@@ -0,0 +1,90 @@
+# tests/test_lesson_access.py
+# Lesson ownership is checked from the lesson's own teacher_id, without a
+# second Course lookup; run.commands counts the MongoDB round trips.
+# Needs MongoDB (MONGO_URI).
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from models.lessonModel import Lesson
+from controllers.lessonController import _assertCourseOwner, _getOwnedLesson, deleteLessonController
+
+
+async def _lesson(course_id: str, teacher_id=None) -> Lesson:
+    lesson = Lesson(
+        course_id=PydanticObjectId(course_id),
+        teacher_id=PydanticObjectId(teacher_id) if teacher_id else None,
+        video_name="lesson.mp4"
+    )
+    await lesson.insert()
+    return lesson
+
+
+def test_owned_lesson_is_one_query(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        other_id, _ = await course_factory(email="other@example.com")
+        lesson = await _lesson(course_id, teacher_id)
+
+        app_db.commands.clear()
+        owned = await _getOwnedLesson(str(lesson.id), teacher_id, "update")
+        assert owned.id == lesson.id
+        assert app_db.commands == ["find"]
+
+        with pytest.raises(HTTPException) as raised:
+            await _getOwnedLesson(str(lesson.id), other_id, "update")
+        assert raised.value.status_code == 403
+
+        with pytest.raises(HTTPException) as raised:
+            await _getOwnedLesson(str(PydanticObjectId()), teacher_id, "update")
+        assert raised.value.status_code == 404
+
+    app_db(scenario)
+
+
+def test_legacy_lesson_is_backfilled_once(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        lesson = await _lesson(course_id)
+
+        app_db.commands.clear()
+        await _getOwnedLesson(str(lesson.id), teacher_id, "update")
+        assert app_db.commands == ["find", "find", "update"]
+        assert (await Lesson.get(lesson.id)).teacher_id == PydanticObjectId(teacher_id)
+
+        app_db.commands.clear()
+        await _getOwnedLesson(str(lesson.id), teacher_id, "update")
+        assert app_db.commands == ["find"]
+
+    app_db(scenario)
+
+
+def test_delete_does_not_load_the_course(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        lesson = await _lesson(course_id, teacher_id)
+
+        app_db.commands.clear()
+        await deleteLessonController(str(lesson.id), teacher_id)
+        assert app_db.commands == ["find", "delete"]
+
+    app_db(scenario)
+
+
+def test_course_owner_check_is_one_count(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        other_id, _ = await course_factory(email="other@example.com")
+
+        app_db.commands.clear()
+        await _assertCourseOwner(course_id, teacher_id, "add lessons to")
+        assert len(app_db.commands) == 1
+
+        with pytest.raises(HTTPException) as raised:
+            await _assertCourseOwner(course_id, other_id, "add lessons to")
+        assert raised.value.status_code == 403
+
+        with pytest.raises(HTTPException) as raised:
+            await _assertCourseOwner(str(PydanticObjectId()), teacher_id, "add lessons to")
+        assert raised.value.status_code == 404
+
+    app_db(scenario)
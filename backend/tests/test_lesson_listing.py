@@ -0,0 +1,75 @@
+# tests/test_lesson_listing.py
+# The lesson page must cost documents proportional to the page, not to the
+# number of lessons in the database (course_created_at_id index). Plans come
+# from the query getAllLessonsController runs (_lessonPageQuery).
+from datetime import datetime, timedelta
+from bson import DBRef, ObjectId
+import pytest
+from beanie import PydanticObjectId
+from controllers.lessonController import _lessonPageQuery, getAllLessonsController
+from models.lessonModel import Lesson
+from utils.pagination import next_cursor
+
+LESSONS_PER_COURSE = 200
+PAGE = 10
+
+
+@pytest.fixture
+def lessons(declared_indexes):
+    collection = declared_indexes(Lesson)
+    course_ids = [ObjectId(), ObjectId()]
+    start = datetime(2024, 1, 1)
+    collection.insert_many([
+        {
+            "course_id": DBRef("courses", course_id),
+            "video_name": f"{course_id}-{i}.mp4",
+            "media_status": "ready",
+            "created_at": start + timedelta(seconds=i // 2)  # ties exercise the _id tiebreak
+        }
+        for course_id in course_ids
+        for i in range(LESSONS_PER_COURSE)
+    ])
+    return collection, course_ids[0]
+
+
+def test_first_page_examines_only_the_page(lessons, explain):
+    collection, course_id = lessons
+
+    plan = explain(_lessonPageQuery(collection, course_id, limit=PAGE))
+
+    assert plan.uses_index("course_created_at_id")
+    assert "COLLSCAN" not in plan.stages
+    assert "SORT" not in plan.stages
+    assert plan.docs_examined <= PAGE + 1
+
+
+def test_cursor_page_examines_only_the_page(lessons, explain):
+    collection, course_id = lessons
+    _, cursor = next_cursor(list(_lessonPageQuery(collection, course_id, skip=PAGE * 5, limit=PAGE)), PAGE)
+    assert cursor
+
+    plan = explain(_lessonPageQuery(collection, course_id, limit=PAGE, cursor=cursor))
+
+    assert plan.uses_index("course_created_at_id")
+    assert "COLLSCAN" not in plan.stages
+    assert "SORT" not in plan.stages
+    # Both $or branches seek into the index; neither walks the skipped lessons
+    assert plan.docs_examined <= 2 * (PAGE + 1)
+
+
+def test_controller_reads_only_the_page(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        await Lesson.insert_many([
+            Lesson(course_id=PydanticObjectId(course_id), teacher_id=PydanticObjectId(teacher_id), video_name=f"{i}.mp4")
+            for i in range(3 * PAGE)
+        ])
+
+        app_db.commands.clear()
+        page, cursor = await getAllLessonsController(course_id, limit=PAGE)
+
+        assert len(page) == PAGE and cursor
+        # Course existence count, then the page itself - no full-collection read
+        assert app_db.commands == ["aggregate", "find"]
+
+    app_db(scenario)
@@ -0,0 +1,106 @@
+# tests/test_lesson_media_flow.py
+# Lesson create / update / delete end to end against MEDIA_BACKEND=fake:
+# spool -> upload job -> published URL -> replacement -> cleanup.
+# Needs MongoDB (MONGO_URI); media jobs are run inline instead of by workers.
+import os
+from beanie import PydanticObjectId
+from models.lessonModel import Lesson, MediaStatus
+from models.mediaJobModel import MediaJob, MediaJobStatus
+from controllers.lessonController import createLessonController, updateLessonController, deleteLessonController
+from utils import fake_cloudinary
+from utils.media_cleanup import drain_media_cleanup
+from utils.media_queue import process_job
+from utils.media_store import media_store
+from utils.uploads import VIDEOS_FOLDER
+
+
+def _stored(lesson: Lesson) -> bool:
+    return lesson.video_public_id in fake_cloudinary.uploader.assets
+
+
+def _local(lesson: Lesson) -> bool:
+    return os.path.exists(os.path.join(VIDEOS_FOLDER, lesson.video_name))
+
+
+def test_create_update_delete_with_fake_backend(app_db, course_factory, make_video, media_jobs):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+
+        # Create: lesson is pending until the job publishes it
+        created = await createLessonController(course_id, make_video(b"first video"), teacher_id)
+        assert created["media_status"] == MediaStatus.PENDING
+        assert os.path.exists(os.path.join(VIDEOS_FOLDER, created["video_name"]))
+        assert await media_jobs() == 1
+        first = await Lesson.get(PydanticObjectId(created["id"]))
+        assert first.media_status == MediaStatus.READY
+        assert first.content_type == "video/mp4"
+        assert _stored(first)
+
+        # Update: the old video stays live until the replacement is published
+        updated = await updateLessonController(created["id"], make_video(b"second video"), teacher_id)
+        assert updated["media_status"] == MediaStatus.PENDING.value
+        assert updated["video_url"] == first.video_url
+        assert await media_jobs() == 1
+        second = await Lesson.get(PydanticObjectId(created["id"]))
+        assert second.media_status == MediaStatus.READY
+        assert second.video_public_id != first.video_public_id
+        await drain_media_cleanup(timeout=5)
+        assert _stored(second) and _local(second)
+        assert not _stored(first) and not _local(first)
+
+        # Delete: the lesson and its only video go away
+        result = await deleteLessonController(created["id"], teacher_id)
+        assert result["deleted_lesson_id"] == created["id"]
+        assert await Lesson.get(PydanticObjectId(created["id"])) is None
+        await drain_media_cleanup(timeout=5)
+        assert not _stored(second) and not _local(second)
+
+    app_db(scenario)
+
+
+def test_older_upload_finishing_last_keeps_the_newer_video(app_db, course_factory, make_video, media_jobs, monkeypatch):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        created = await createLessonController(course_id, make_video(b"original video"), teacher_id)
+        await media_jobs()
+        lesson_id = PydanticObjectId(created["id"])
+
+        original = await Lesson.get(lesson_id)
+        await updateLessonController(created["id"], make_video(b"older update"), teacher_id)
+        older_job = await MediaJob.get((await Lesson.get(lesson_id)).current_job_id)
+
+        upload = media_store.upload
+        newer = {}
+
+        async def slow_upload(path, **options):
+            # While the older upload is in flight, a newer update lands and is
+            # published first
+            if not newer:
+                await updateLessonController(created["id"], make_video(b"newer update"), teacher_id)
+                newer["job"] = await MediaJob.get((await Lesson.get(lesson_id)).current_job_id)
+                await process_job(newer["job"])
+                newer["lesson"] = await Lesson.get(lesson_id)
+                result = await upload(path, **options)
+                newer["older_public_id"] = result["public_id"]
+                return result
+            return await upload(path, **options)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(media_store, "upload", slow_upload)
+            await process_job(older_job)
+
+        lesson = await Lesson.get(lesson_id)
+        assert lesson.current_job_id == newer["job"].id
+        assert lesson.media_status == MediaStatus.READY
+        assert lesson.video_public_id == newer["lesson"].video_public_id
+        assert lesson.video_name == newer["lesson"].video_name
+        assert (await MediaJob.get(older_job.id)).status == MediaJobStatus.DONE
+
+        # The older upload's asset is let go instead of orphaned; the newer one stays
+        await drain_media_cleanup(timeout=5)
+        assert _stored(lesson) and _local(lesson)
+        assert not os.path.exists(os.path.join(VIDEOS_FOLDER, older_job.video_name))
+        assert newer["older_public_id"] not in fake_cloudinary.uploader.assets
+        assert not _stored(original) and not _local(original)
+
+    app_db(scenario)
@@ -0,0 +1,115 @@
+# tests/test_list_projection.py
+# List endpoints map projected raw documents straight to the response shape;
+# the result must be what the full Document would have produced.
+from datetime import datetime
+from bson import DBRef, ObjectId
+from beanie import PydanticObjectId
+from models.courseModel import Course
+from models.lessonModel import Lesson
+from schemas.courseSchema import CourseResponse
+from controllers.courseController import COURSE_LIST_PROJECTION, _courseListItem, getAllCoursesController
+from controllers.lessonController import getAllLessonsController
+
+
+def _project(row: dict, projection: dict) -> dict:
+    return {key: value for key, value in row.items() if key == "_id" or key in projection}
+
+
+def test_course_item_from_projected_row():
+    teacher_id = ObjectId()
+    stored = {
+        "_id": ObjectId(),
+        "title": "Lip reading basics",
+        "title_normalized": "lip reading basics",
+        "description": "Reading lips from the very start",
+        "thumbnail": "https://example.test/t.png",
+        "thumbnail_public_id": "thumbs/t",
+        "thumbnail_hash": "abc",
+        "thumbnail_variants": [{"width": 320, "height": 180, "format": "webp", "url": "https://example.test/t.webp", "public_id": "thumbs/t-320"}],
+        "teacher": DBRef("users", teacher_id),
+        "teacher_summary": {"id": teacher_id, "first_name": "Ada", "last_name": "Lovelace"},
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 2, 1)
+    }
+
+    item = CourseResponse.model_validate(_courseListItem(_project(stored, COURSE_LIST_PROJECTION)))
+
+    assert item.id == str(stored["_id"])
+    assert item.teacher_id == str(teacher_id)
+    assert item.teacher.first_name == "Ada"
+    assert item.thumbnail_variants[0].url == "https://example.test/t.webp"
+    assert item.created_at == stored["created_at"]
+
+
+def test_course_item_from_legacy_row():
+    stored = {
+        "_id": ObjectId(),
+        "title": "Old course",
+        "description": "Written before summaries existed",
+        "thumbnail": "https://example.test/t.png",
+        "teacher": DBRef("users", ObjectId()),
+        "created_at": datetime(2023, 1, 1)
+    }
+
+    item = CourseResponse.model_validate(_courseListItem(stored))
+
+    assert item.teacher is None
+    assert item.thumbnail_variants == []
+
+
+def test_course_listing_matches_hydrated_documents(app_db, course_factory):
+    async def scenario():
+        for i in range(3):
+            await course_factory(email=f"teacher{i}@example.com")
+
+        page = await getAllCoursesController(limit=10)
+        courses = await Course.find_all().sort([("created_at", 1), ("_id", 1)]).to_list()
+
+        assert [CourseResponse.model_validate(item) for item in page["courses"]] == [
+            CourseResponse(
+                id=str(course.id),
+                title=course.title,
+                description=course.description,
+                thumbnail=course.thumbnail,
+                thumbnail_variants=[variant.model_dump() for variant in course.thumbnail_variants],
+                teacher_id=str(course.teacher.ref.id),
+                teacher=None if course.teacher_summary is None else {
+                    "id": str(course.teacher_summary.id),
+                    "first_name": course.teacher_summary.first_name,
+                    "last_name": course.teacher_summary.last_name
+                },
+                created_at=course.created_at
+            )
+            for course in courses
+        ]
+
+    app_db(scenario)
+
+
+def test_lesson_listing_matches_hydrated_documents(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        await Lesson.insert_many([
+            Lesson(course_id=PydanticObjectId(course_id), teacher_id=PydanticObjectId(teacher_id),
+                   video_name=f"{i}.mp4", video_url=f"https://example.test/{i}.mp4")
+            for i in range(3)
+        ])
+
+        page, _ = await getAllLessonsController(course_id, limit=10)
+        lessons = await Lesson.find({"course_id.$id": PydanticObjectId(course_id)}).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).to_list()
+
+        assert page == [
+            {
+                "id": str(lesson.id),
+                "course_id": course_id,
+                "video_name": lesson.video_name,
+                "video_url": lesson.video_url,
+                "media_status": lesson.media_status.value,
+                "created_at": lesson.created_at
+            }
+            for lesson in lessons
+        ]
+
+    app_db(scenario)
@@ -0,0 +1,79 @@
+# tests/test_local_media.py
+# Uploaded files must never come back as active content on the API origin:
+# stored extensions come from the validated video type, responses carry the
+# stored type (or octet-stream) and nosniff.
+import asyncio
+import io
+import os
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from controllers import lessonController
+from routes import lessonRoutes
+from utils.media_cache import LocalMediaCache
+from utils.uploads import video_content_type, video_extension
+
+
+def _request(method: str = "GET", headers: dict = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/api/v1/lesson/x/video",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "query_string": b""
+    })
+
+
+def _serve(monkeypatch, path: str, content_type: str, method: str = "GET", headers: dict = None):
+    async def source(lesson_id: str):
+        return path, os.stat(path), None, content_type
+    monkeypatch.setattr(lessonRoutes, "getLessonVideoSourceController", source)
+    return asyncio.run(lessonRoutes.stream_lesson_video(_request(method, headers), lesson_id="x"))
+
+
+def test_spooled_video_extension_ignores_client_filename(monkeypatch, tmp_path):
+    monkeypatch.setattr(lessonController, "VIDEOS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(lessonController, "media_cache", LocalMediaCache(str(tmp_path), 1 << 30))
+    upload = UploadFile(
+        io.BytesIO(b"<script>alert(1)</script>"),
+        filename="x.html",
+        headers=Headers({"content-type": "video/mp4"})
+    )
+
+    video_name, _ = asyncio.run(lessonController._spoolVideo(upload))
+
+    assert video_name.endswith(".mp4")
+    assert os.listdir(tmp_path) == [video_name]
+
+
+def test_only_allowed_video_types_get_an_extension():
+    assert video_extension("video/webm") == "webm"
+    with pytest.raises(HTTPException) as error:
+        video_extension("text/html")
+    assert error.value.status_code == 400
+
+
+def test_legacy_html_file_is_not_served_as_html(monkeypatch, tmp_path):
+    # A file stored before extensions were normalised, under the client's ".html"
+    path = tmp_path / "legacy.html"
+    path.write_bytes(b"<script>alert(1)</script>")
+    content_type = video_content_type(path.name)
+
+    for method in ("GET", "HEAD"):
+        response = _serve(monkeypatch, str(path), content_type, method)
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_video_served_with_stored_type_and_nosniff(monkeypatch, tmp_path):
+    path = tmp_path / "lesson.mp4"
+    path.write_bytes(b"\x00" * 64)
+
+    response = _serve(monkeypatch, str(path), "video/mp4")
+    assert response.headers["content-type"] == "video/mp4"
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+    cached = _serve(monkeypatch, str(path), "video/mp4", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["x-content-type-options"] == "nosniff"
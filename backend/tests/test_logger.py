@@ -0,0 +1,75 @@
+# tests/test_logger.py
+# Request paths log through the queue handler as JSON lines: extra fields
+# kept, tracebacks rendered up front, DEBUG sampled, and no stray prints.
+import io
+import json
+import logging
+import pathlib
+import re
+import sys
+from utils import logger as app_logging
+from utils.logger import DebugSampler, JsonFormatter, ROOT_LOGGER, get_logger, setup_logging, shutdown_logging
+
+BACKEND = pathlib.Path(__file__).resolve().parents[1]
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), exc_info=None, **extra):
+    record = logging.LogRecord("liplearn.test", level, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_lines_keep_extra_fields():
+    line = json.loads(JsonFormatter().format(_record(course_id="abc", count=3)))
+
+    assert line["msg"] == "hello world"
+    assert line["level"] == "INFO"
+    assert line["logger"] == "liplearn.test"
+    assert line["course_id"] == "abc" and line["count"] == 3
+    assert "args" not in line and "exc" not in line
+
+
+def test_debug_sampling():
+    assert DebugSampler(1.0).filter(_record(logging.DEBUG))
+    assert not DebugSampler(0.0).filter(_record(logging.DEBUG))
+    assert DebugSampler(0.0).filter(_record(logging.INFO))
+
+
+def test_queue_listener_writes_json_with_tracebacks(monkeypatch):
+    out = io.StringIO()
+    root = logging.getLogger(ROOT_LOGGER)
+    monkeypatch.setattr(sys, "stdout", out)
+    monkeypatch.setattr(root, "handlers", list(root.handlers))
+    monkeypatch.setattr(root, "propagate", root.propagate)
+    level = root.level
+    monkeypatch.setattr(app_logging, "_listener", None)
+
+    setup_logging(level="INFO", debug_sample_rate=1.0)
+    log = get_logger("test")
+    try:
+        log.debug("not at INFO")
+        log.info("Listed %d courses", 2, extra={"skip": 0})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("Failed", extra={"course_id": "abc"})
+    finally:
+        shutdown_logging()
+        root.setLevel(level)
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["msg"] for line in lines] == ["Listed 2 courses", "Failed"]
+    assert lines[0]["skip"] == 0
+    assert lines[1]["course_id"] == "abc"
+    assert "ValueError: boom" in lines[1]["exc"]
+
+
+def test_no_print_calls_in_request_code():
+    offenders = [
+        f"{path.relative_to(BACKEND)}:{number}"
+        for folder in ("controllers", "routes", "dependencies", "models", "utils")
+        for path in sorted((BACKEND / folder).glob("*.py"))
+        for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1)
+        if re.match(r"\s*print\(", line)
+    ]
+    assert offenders == []
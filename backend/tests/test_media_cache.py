@@ -0,0 +1,71 @@
+# tests/test_media_cache.py
+# Processes sharing one videos folder: one evictor, accounting from disk.
+import asyncio
+from utils.media_cache import LocalMediaCache, LOCK_FILE
+
+
+def test_only_one_cache_per_folder_evicts(tmp_path):
+    first = LocalMediaCache(str(tmp_path), max_bytes=1 << 30)
+    second = LocalMediaCache(str(tmp_path), max_bytes=1 << 30)
+
+    async def run():
+        await first.rebuild()
+        await second.rebuild()
+        assert first.is_evictor and not second.is_evictor
+
+        # Evictor goes away - the next rescan elsewhere takes over
+        await first.stop(asyncio.Event())
+        await second.rebuild()
+        assert second.is_evictor
+        await second.stop(asyncio.Event())
+
+    asyncio.run(run())
+
+
+def test_rescan_sees_other_processes_files(tmp_path):
+    cache = LocalMediaCache(str(tmp_path), max_bytes=1 << 30)
+    (tmp_path / "a.mp4").write_bytes(b"x" * 10)
+
+    async def run():
+        await cache.rebuild()
+        assert cache.total_bytes == 10
+
+        # Written and removed by other processes, never seen through add()/discard()
+        (tmp_path / "b.mp4").write_bytes(b"x" * 5)
+        (tmp_path / "a.mp4").unlink()
+        await cache.rebuild()
+        await cache.stop(asyncio.Event())
+
+    asyncio.run(run())
+
+    assert cache.total_bytes == 5
+    assert (tmp_path / LOCK_FILE).exists()
+
+
+def test_changes_during_rescan_survive_the_swap(tmp_path):
+    cache = LocalMediaCache(str(tmp_path), max_bytes=1 << 30)
+    (tmp_path / "old.mp4").write_bytes(b"x" * 10)
+    (tmp_path / "gone.mp4").write_bytes(b"x" * 3)
+    build_index = cache._build_index
+
+    def slow_build():
+        # The event loop keeps serving while the thread scans
+        result = build_index()
+        (tmp_path / "new.mp4").write_bytes(b"x" * 7)
+        return result
+
+    async def run():
+        await cache.rebuild()
+        cache._build_index = slow_build
+        rescan = asyncio.create_task(cache.rebuild())
+        await asyncio.sleep(0)
+        cache.add("new.mp4", 7)
+        cache.discard("gone.mp4")
+        cache.touch("old.mp4")
+        await rescan
+        await cache.stop(asyncio.Event())
+
+    asyncio.run(run())
+
+    assert list(cache._entries) == ["new.mp4", "old.mp4"]
+    assert cache.total_bytes == 17
@@ -0,0 +1,109 @@
+# tests/test_media_cleanup.py
+# Batching, retries and give-up of the background media cleanup, against the
+# in-memory Cloudinary double with its latency switched off.
+import asyncio
+import pytest
+from utils import fake_cloudinary, media_cleanup
+from utils.media_store import FakeStore
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(fake_cloudinary, "FAKE_MEDIA_LATENCY", 0)
+    monkeypatch.setattr(fake_cloudinary, "FAKE_MEDIA_JITTER", 0)
+    monkeypatch.setattr(media_cleanup, "MEDIA_DELETE_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(media_cleanup, "VIDEOS_FOLDER", str(tmp_path))
+    fake_cloudinary.uploader.assets.clear()
+    store = FakeStore()
+    monkeypatch.setattr(media_cleanup, "media_store", store)
+    return store
+
+
+@pytest.fixture
+def errors(monkeypatch):
+    logged = []
+    monkeypatch.setattr(media_cleanup.logger, "error", lambda msg, extra=None: logged.append(extra))
+    return logged
+
+
+def _seed(count: int) -> list:
+    public_ids = [f"lessons/video-{i}" for i in range(count)]
+    for public_id in public_ids:
+        fake_cloudinary.uploader.assets[public_id] = f"https://example.test/{public_id}.mp4"
+    return public_ids
+
+
+def _record_calls(monkeypatch, store, fail_first: int = 0):
+    """Spy on delete_resources; the first `fail_first` calls raise"""
+    calls = []
+    delete_resources = store.api.delete_resources
+
+    def spy(public_ids, resource_type="image", **options):
+        calls.append(list(public_ids))
+        if len(calls) <= fail_first:
+            raise ConnectionError("media service unavailable")
+        return delete_resources(public_ids, resource_type=resource_type, **options)
+
+    monkeypatch.setattr(store.api, "delete_resources", spy)
+    return calls
+
+
+def test_deletes_in_batches_of_at_most_100(monkeypatch, store, errors):
+    public_ids = _seed(250)
+    calls = _record_calls(monkeypatch, store)
+
+    asyncio.run(media_cleanup.delete_media(public_ids))
+
+    assert sorted(len(batch) for batch in calls) == [50, 100, 100]
+    assert sorted(sum(calls, [])) == sorted(public_ids)
+    assert fake_cloudinary.uploader.assets == {}
+    assert errors == []
+
+
+def test_removes_local_files(store, tmp_path):
+    (tmp_path / "a.mp4").write_bytes(b"video")
+
+    asyncio.run(media_cleanup.delete_media([], video_names=["a.mp4", "missing.mp4"]))
+
+    assert not (tmp_path / "a.mp4").exists()
+
+
+def test_retries_then_succeeds(monkeypatch, store, errors):
+    public_ids = _seed(3)
+    calls = _record_calls(monkeypatch, store, fail_first=1)
+
+    asyncio.run(media_cleanup.delete_media(public_ids))
+
+    assert len(calls) == 2
+    assert fake_cloudinary.uploader.assets == {}
+    assert errors == []
+
+
+def test_gives_up_after_max_attempts(monkeypatch, store, errors):
+    public_ids = _seed(3)
+    calls = _record_calls(monkeypatch, store, fail_first=media_cleanup.MEDIA_DELETE_MAX_ATTEMPTS)
+
+    # Never raises - the rows are already gone, so the failure is only logged
+    asyncio.run(media_cleanup.delete_media(public_ids))
+
+    assert len(calls) == media_cleanup.MEDIA_DELETE_MAX_ATTEMPTS
+    assert set(fake_cloudinary.uploader.assets) == set(public_ids)
+    assert len(errors) == 1
+    assert errors[0]["public_ids"] == public_ids
+
+
+def test_schedule_runs_in_background(monkeypatch, store):
+    public_ids = _seed(120)
+    calls = _record_calls(monkeypatch, store)
+
+    async def run():
+        task = media_cleanup.schedule_media_cleanup(public_ids)
+        assert task in media_cleanup._tasks
+        await media_cleanup.drain_media_cleanup(timeout=5)
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.done() and task not in media_cleanup._tasks
+    assert len(calls) == 2
+    assert fake_cloudinary.uploader.assets == {}
@@ -0,0 +1,70 @@
+# tests/test_media_executor.py
+# Blocking media calls run on the bounded media pool: the event loop keeps
+# serving meanwhile, a full queue sheds load with 503 and a slow call gets 504.
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from utils import media_executor
+from utils.media_executor import pool_stats, run_media_call
+
+
+def test_blocking_call_runs_off_the_event_loop():
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await run_media_call(time.sleep, 0.3, timeout=5)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    assert result is None
+    assert ticks >= 10  # The loop kept running while the call blocked its thread
+
+
+def test_full_queue_is_refused_with_retry_after(monkeypatch):
+    monkeypatch.setattr(media_executor, "MEDIA_QUEUE_LIMIT", 2)
+    release = threading.Event()
+
+    async def run():
+        running = [asyncio.create_task(run_media_call(release.wait, timeout=5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            await run_media_call(lambda: None, timeout=5)
+        release.set()
+        await asyncio.gather(*running)
+        await asyncio.sleep(0.01)  # let the done callbacks hop back to the loop
+        return raised.value
+
+    refused = asyncio.run(run())
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"]
+    assert pool_stats()["pending"] == 0
+
+
+def test_timed_out_call_keeps_its_slot_until_it_returns():
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(HTTPException) as raised:
+            await run_media_call(release.wait, timeout=0.05)
+        pending_after_timeout = pool_stats()["pending"]
+        release.set()
+        for _ in range(100):
+            if pool_stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        return raised.value, pending_after_timeout
+
+    timed_out, pending_after_timeout = asyncio.run(run())
+    assert timed_out.status_code == 504
+    assert pending_after_timeout == 1
+    assert pool_stats()["pending"] == 0
@@ -0,0 +1,98 @@
+# tests/test_media_queue.py
+# Upload jobs and shared video assets: identical uploads share one asset that
+# is refcounted and removed with its last lesson, a failed enqueue leaves no
+# pending lesson behind, and jobs out of attempts are failed, not re-claimed.
+# Needs MongoDB (MONGO_URI); media jobs are run inline instead of by workers.
+import os
+from datetime import datetime, timedelta
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from models.lessonModel import Lesson, MediaStatus
+from models.mediaContentModel import MediaContent
+from models.mediaJobModel import MediaJob, MediaJobStatus
+from controllers import lessonController
+from controllers.lessonController import createLessonController, deleteLessonController
+from utils import fake_cloudinary
+from utils.media_cleanup import drain_media_cleanup
+from utils.media_queue import claim_next_job, fail_abandoned_jobs
+from utils.uploads import VIDEOS_FOLDER
+
+
+async def _content(lesson: Lesson) -> MediaContent:
+    return await MediaContent.find_one(MediaContent.hash == lesson.content_hash)
+
+
+def test_identical_videos_share_one_refcounted_asset(app_db, course_factory, make_video, media_jobs):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+
+        first = await createLessonController(course_id, make_video(b"same bytes"), teacher_id)
+        assert await media_jobs() == 1
+        first = await Lesson.get(PydanticObjectId(first["id"]))
+        assert (await _content(first)).refcount == 1
+
+        # Same bytes again: reused straight away, no second upload job
+        second = await createLessonController(course_id, make_video(b"same bytes"), teacher_id)
+        assert second["media_status"] == MediaStatus.READY
+        assert second["video_url"] == first.video_url
+        assert await media_jobs() == 0
+        assert len(os.listdir(VIDEOS_FOLDER)) == 2  # the shared video and the uploads folder
+        assert (await _content(first)).refcount == 2
+
+        # One reference left: the asset stays
+        await deleteLessonController(str(first.id), teacher_id)
+        await drain_media_cleanup(timeout=5)
+        assert (await _content(first)).refcount == 1
+        assert first.video_public_id in fake_cloudinary.uploader.assets
+        assert os.path.exists(os.path.join(VIDEOS_FOLDER, first.video_name))
+
+        # Last reference: the content record goes and the asset is cleaned up
+        await deleteLessonController(second["id"], teacher_id)
+        assert await _content(first) is None
+        await drain_media_cleanup(timeout=5)
+        assert first.video_public_id not in fake_cloudinary.uploader.assets
+        assert not os.path.exists(os.path.join(VIDEOS_FOLDER, first.video_name))
+
+    app_db(scenario)
+
+
+def test_failed_enqueue_undoes_the_lesson(app_db, course_factory, make_video, monkeypatch):
+    async def broken_enqueue(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        with monkeypatch.context() as patch:
+            patch.setattr(lessonController, "enqueue_lesson_upload", broken_enqueue)
+            with pytest.raises(HTTPException) as raised:
+                await createLessonController(course_id, make_video(b"never queued"), teacher_id)
+        assert raised.value.status_code == 500
+        assert await Lesson.find_all().count() == 0
+        assert os.listdir(VIDEOS_FOLDER) == ["uploads"]
+
+    app_db(scenario)
+
+
+def test_expired_lease_is_reclaimed_only_with_attempts_left(app_db, course_factory, make_video):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        created = await createLessonController(course_id, make_video(b"crashy video"), teacher_id)
+        job = await MediaJob.find_one(MediaJob.lesson_id == PydanticObjectId(created["id"]))
+        expired = datetime.utcnow() - timedelta(seconds=1)
+
+        # Worker died mid-upload with attempts left: someone else picks it up
+        await job.set({"status": MediaJobStatus.RUNNING, "attempts": 1, "locked_until": expired})
+        reclaimed = await claim_next_job()
+        assert reclaimed.id == job.id and reclaimed.attempts == 2
+
+        # Worker died on the last attempt: not claimed again, failed instead
+        await job.set({"status": MediaJobStatus.RUNNING, "attempts": job.max_attempts, "locked_until": expired})
+        assert await claim_next_job() is None
+        assert await fail_abandoned_jobs() == 1
+        assert (await MediaJob.get(job.id)).status == MediaJobStatus.FAILED
+        lesson = await Lesson.get(PydanticObjectId(created["id"]))
+        assert lesson.media_status == MediaStatus.FAILED
+        assert not os.path.exists(os.path.join(VIDEOS_FOLDER, created["video_name"]))
+
+    app_db(scenario)
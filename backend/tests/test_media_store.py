@@ -0,0 +1,76 @@
+# tests/test_media_store.py
+# Storage backends: the interface is enforced at construction, and the local
+# backend only writes and serves allowlisted, non-active types.
+import asyncio
+import io
+import pytest
+from starlette.datastructures import Headers
+from utils.local_media import LocalMediaFiles
+from utils.media_store import FakeStore, LocalStore, MediaStore, media_store
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def test_incomplete_backend_fails_at_construction():
+    class HalfStore(MediaStore):
+        async def upload(self, file, resource_type: str = "image", folder: str = None) -> dict:
+            return {}
+
+    with pytest.raises(TypeError):
+        HalfStore()
+
+
+def test_tests_run_against_fake_backend():
+    assert isinstance(media_store, FakeStore)
+
+
+@pytest.mark.parametrize("file, extension", [
+    (lambda: _named(b"<html><script>alert(1)</script>", "x.html"), ".bin"),
+    (lambda: _named(b"<svg onload=alert(1)></svg>", "x.svg"), ".bin"),
+    (lambda: _named(PNG, "cover.html"), ".png"),
+])
+def test_local_store_normalises_extensions(tmp_path, file, extension):
+    store = LocalStore(root=str(tmp_path), base_url="/media")
+
+    result = asyncio.run(store.upload(file(), folder="courses"))
+
+    assert result["public_id"].endswith(extension)
+    assert (tmp_path / result["public_id"]).exists()
+
+
+def test_local_store_keeps_only_allowlisted_video_extensions(tmp_path):
+    store = LocalStore(root=str(tmp_path), base_url="/media")
+    for name, extension in (("a.mp4", ".mp4"), ("a.html", ".bin")):
+        path = tmp_path / name
+        path.write_bytes(b"\x00" * 16)
+        result = asyncio.run(store.upload(str(path), resource_type="video"))
+        assert result["public_id"].endswith(extension)
+
+
+def _named(data: bytes, name: str):
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+
+def _serve(files: LocalMediaFiles, path, headers: dict = None):
+    scope = {"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]}
+    return files.file_response(str(path), path.stat(), scope)
+
+
+@pytest.mark.parametrize("name, media_type", [
+    ("legacy.html", "application/octet-stream"),
+    ("legacy.svg", "application/octet-stream"),
+    ("cover.png", "image/png"),
+    ("lesson.mp4", "video/mp4"),
+])
+def test_local_media_files_force_safe_types(tmp_path, name, media_type):
+    path = tmp_path / name
+    path.write_bytes(b"<script>alert(1)</script>")
+    files = LocalMediaFiles(directory=str(tmp_path))
+
+    response = _serve(files, path)
+
+    assert response.headers["content-type"] == media_type
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert _serve(files, path, {"If-None-Match": response.headers["etag"]}).status_code == 304
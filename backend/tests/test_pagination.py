@@ -0,0 +1,110 @@
+# tests/test_pagination.py
+# Keyset cursors: opaque, tamper-checked, and walking them visits every
+# document exactly once in (created_at, _id) order, ties included.
+from datetime import datetime, timedelta
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from models.lessonModel import Lesson
+from controllers.courseController import getAllCoursesController
+from controllers.lessonController import getAllLessonsController
+from utils.pagination import after_cursor, decode_cursor, encode_cursor, next_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    doc_id = PydanticObjectId()
+
+    cursor = encode_cursor(created_at, doc_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, doc_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), "x" * 24)])
+def test_tampered_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_after_cursor_breaks_ties_on_id():
+    created_at = datetime(2024, 1, 1)
+    doc_id = PydanticObjectId()
+
+    assert after_cursor(encode_cursor(created_at, doc_id)) == {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": doc_id}},
+        ]
+    }
+
+
+def test_next_cursor_trims_the_lookahead_row():
+    rows = [{"_id": PydanticObjectId(), "created_at": datetime(2024, 1, 1, 0, i)} for i in range(4)]
+
+    page, cursor = next_cursor(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == (rows[2]["created_at"], rows[2]["_id"])
+
+    page, cursor = next_cursor(rows[:3], 3)
+    assert page == rows[:3]
+    assert cursor is None
+
+
+def test_cursor_walk_visits_every_lesson_once(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        _, other_course_id = await course_factory(email="other@example.com")
+        start = datetime(2024, 1, 1)
+        lessons = [
+            Lesson(
+                course_id=PydanticObjectId(cid),
+                teacher_id=PydanticObjectId(teacher_id),
+                video_name=f"{i}.mp4",
+                created_at=start + timedelta(seconds=i // 3)  # ties on created_at
+            )
+            for cid in (course_id, other_course_id)
+            for i in range(25)
+        ]
+        await Lesson.insert_many(lessons)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await getAllLessonsController(course_id, limit=7, cursor=cursor)
+            seen.extend(item["id"] for item in page)
+            if cursor is None:
+                break
+        expected = sorted(
+            (lesson for lesson in await Lesson.find({"course_id.$id": PydanticObjectId(course_id)}).to_list()),
+            key=lambda lesson: (lesson.created_at, lesson.id)
+        )
+        assert seen == [str(lesson.id) for lesson in expected]
+
+        # skip/limit still works and agrees with the cursor order
+        page, _ = await getAllLessonsController(course_id, skip=7, limit=7)
+        assert [item["id"] for item in page] == seen[7:14]
+
+    app_db(scenario)
+
+
+def test_course_cursor_walk_matches_skip_pages(app_db, course_factory):
+    async def scenario():
+        for i in range(9):
+            await course_factory(email=f"teacher{i}@example.com")
+
+        seen, cursor = [], None
+        while True:
+            page = await getAllCoursesController(limit=4, cursor=cursor)
+            seen.extend(course["id"] for course in page["courses"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == len(set(seen)) == 9
+
+        skipped = []
+        for skip in range(0, 9, 4):
+            skipped.extend(course["id"] for course in (await getAllCoursesController(skip=skip, limit=4))["courses"])
+        assert skipped == seen
+
+    app_db(scenario)
@@ -0,0 +1,88 @@
+# tests/test_passwords.py
+# bcrypt runs on the password process pool: the event loop stays free, a
+# cost change rehashes on login, and saturation or a dead worker is a 503.
+import asyncio
+import os
+import time
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from utils import passwords
+from utils.passwords import hash_password, shutdown_password_pool, verify_password
+
+
+@pytest.fixture(autouse=True)
+def cheap_rounds(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    yield
+    shutdown_password_pool()
+
+
+def test_hash_and_verify_round_trip():
+    async def run():
+        hashed = await hash_password("correct horse")
+        return hashed, await verify_password("correct horse", hashed), await verify_password("wrong", hashed)
+
+    hashed, (matches, new_hash), (wrong, wrong_hash) = asyncio.run(run())
+    assert bcrypt.verify("correct horse", hashed)
+    assert matches and new_hash is None
+    assert not wrong and wrong_hash is None
+
+
+def test_cost_change_rehashes_on_login(monkeypatch):
+    old_hash = bcrypt.using(rounds=5).hash("correct horse")
+
+    matches, new_hash = asyncio.run(verify_password("correct horse", old_hash))
+
+    assert matches
+    assert bcrypt.from_string(new_hash).rounds == 4
+    assert bcrypt.verify("correct horse", new_hash)
+
+
+def test_hashing_does_not_block_the_event_loop(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 12)
+
+    async def run():
+        await hash_password("warm up the pool")
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await hash_password("correct horse")
+        elapsed = time.perf_counter() - started
+        done.set()
+        await task
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(run())
+    # The loop ticked through most of the hash instead of freezing for it
+    assert ticks >= elapsed / 0.01 * 0.5
+
+
+def test_saturated_pool_is_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_QUEUE_LIMIT", 0)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(hash_password("correct horse"))
+
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == passwords.PASSWORD_RETRY_AFTER
+
+
+def test_dead_worker_is_503_then_pool_is_rebuilt():
+    async def run():
+        with pytest.raises(HTTPException) as raised:
+            await passwords._submit(os._exit, 1)
+        return raised.value, await hash_password("correct horse")
+
+    crashed, hashed = asyncio.run(run())
+    assert crashed.status_code == 503
+    assert bcrypt.verify("correct horse", hashed)
+    assert passwords._pending == 0
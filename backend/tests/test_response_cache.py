@@ -0,0 +1,159 @@
+# tests/test_response_cache.py
+# Catalog page cache on both backends: hits, generation bumps, ETag/304, and
+# refusing the per-process backend when several workers share the catalog.
+import asyncio
+import pytest
+from starlette.requests import Request
+from routes import courseRoutes
+from utils.response_cache import (
+    FakeRedis, LRUTTLBackend, RedisBackend, ResponseCache, _make_backend, etag_matches, make_etag
+)
+
+BACKENDS = {
+    "memory": lambda: LRUTTLBackend(max_entries=8),
+    "fakeredis": lambda: RedisBackend(FakeRedis()),
+}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def cache(request):
+    return ResponseCache("test", BACKENDS[request.param](), ttl=60)
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        return f"page {self.calls}".encode()
+
+
+def test_hit_returns_the_stored_page(cache):
+    build = Builder()
+
+    async def run():
+        first = await cache.get_or_build("k", build)
+        second = await cache.get_or_build("k", build)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == (make_etag(b"page 1"), b"page 1")
+    assert build.calls == 1
+
+
+def test_generation_bump_invalidates_every_key(cache):
+    build = Builder()
+
+    async def run():
+        await cache.get_or_build("a", build)
+        await cache.get_or_build("b", build)
+        await cache.invalidate()
+        return await cache.get_or_build("a", build)
+
+    etag, body = asyncio.run(run())
+    assert body == b"page 3"
+    assert etag == make_etag(b"page 3")
+    assert build.calls == 3
+
+
+def test_page_built_across_an_invalidation_is_not_served(cache):
+    build = Builder()
+
+    async def racing_build() -> bytes:
+        # A write lands while this page is being rendered from the old data
+        await cache.invalidate()
+        return await build()
+
+    async def run():
+        await cache.get_or_build("k", racing_build)
+        return await cache.get_or_build("k", build)
+
+    _, body = asyncio.run(run())
+    assert body == b"page 2"
+
+
+def test_expired_entries_are_rebuilt(cache):
+    cache.ttl = 1
+    build = Builder()
+
+    async def run():
+        await cache.get_or_build("k", build)
+        await asyncio.sleep(1.1)
+        return await cache.get_or_build("k", build)
+
+    _, body = asyncio.run(run())
+    assert body == b"page 2"
+
+
+def test_lru_evicts_oldest_but_keeps_generation():
+    backend = LRUTTLBackend(max_entries=2)
+
+    async def run():
+        await backend.incr("ns:gen")
+        for key in ("a", "b", "c"):
+            await backend.set(key, key.encode(), 60)
+        return [await backend.get(key) for key in ("ns:gen", "a", "b", "c")]
+
+    assert asyncio.run(run()) == [b"1", None, b"b", b"c"]
+
+
+def test_etag_matching():
+    etag = make_etag(b"body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_backend_selection_follows_worker_count():
+    assert isinstance(_make_backend("auto", workers=1), LRUTTLBackend)
+    assert _make_backend("off", workers=4) is None
+    with pytest.raises(RuntimeError):
+        _make_backend("memory", workers=4)
+    with pytest.raises(ValueError):
+        _make_backend("memcached", workers=1)
+
+
+def _request(headers: dict = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/course/all",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "query_string": b""
+    })
+
+
+def test_catalog_route_etag_and_304(monkeypatch):
+    calls = []
+
+    async def catalog(skip, limit, cursor, teacher_id):
+        calls.append(skip)
+        return {"courses": [], "total": len(calls), "skip": skip, "limit": limit, "next_cursor": None}
+
+    monkeypatch.setattr(courseRoutes, "getAllCoursesController", catalog)
+    monkeypatch.setattr(courseRoutes, "course_catalog_cache", ResponseCache("courses", RedisBackend(FakeRedis())))
+
+    def get(headers: dict = None):
+        return asyncio.run(courseRoutes.get_all_courses(
+            _request(headers), skip=0, limit=10, cursor=None, teacher_id=None
+        ))
+
+    first = get()
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = get({"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert len(calls) == 1
+
+    # A write elsewhere bumps the generation: same request now gets a fresh page
+    asyncio.run(courseRoutes.course_catalog_cache.invalidate())
+    fresh = get({"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(calls) == 2
+
@@ -0,0 +1,143 @@
+# tests/test_resumable_uploads.py
+# Resumable lesson uploads: offset checks, the per-request chunk lease,
+# finalize, and the expiry sweeper. Needs MongoDB (MONGO_URI).
+import os
+from datetime import datetime, timedelta
+import pytest
+from beanie import PydanticObjectId
+from bson import ObjectId
+from fastapi import HTTPException
+from controllers import lessonController
+from controllers.lessonController import (
+    createUploadSessionController, appendUploadChunkController, finalizeUploadSessionController
+)
+from models.lessonModel import Lesson, MediaStatus
+from models.uploadSessionModel import UploadSession
+from utils import resumable_uploads
+from utils.resumable_uploads import session_path, sweep_expired_sessions
+
+VIDEO = b"0123456789" * 100
+
+
+async def _chunks(*parts, between=None):
+    """Request body stream; `between` runs before every part after the first"""
+    for index, part in enumerate(parts):
+        if index and between:
+            await between()
+        yield part
+
+
+async def _start(course_factory, length: int = len(VIDEO)):
+    teacher_id, course_id = await course_factory()
+    session = await createUploadSessionController(course_id, "lesson.mp4", "video/mp4", length, teacher_id)
+    return teacher_id, session["upload_id"]
+
+
+async def _set(upload_id: str, **fields):
+    await UploadSession.get_pymongo_collection().update_one({"_id": ObjectId(upload_id)}, {"$set": fields})
+
+
+def test_offset_mismatch_is_409_with_server_offset(app_db, course_factory):
+    async def scenario():
+        teacher_id, upload_id = await _start(course_factory)
+        assert await appendUploadChunkController(upload_id, 0, _chunks(VIDEO[:100]), teacher_id) == 100
+
+        with pytest.raises(HTTPException) as error:
+            await appendUploadChunkController(upload_id, 0, _chunks(VIDEO[:100]), teacher_id)
+        assert error.value.status_code == 409
+        assert error.value.headers["Upload-Offset"] == "100"
+
+    app_db(scenario)
+
+
+def test_held_lease_rejects_second_writer(app_db, course_factory):
+    async def scenario():
+        teacher_id, upload_id = await _start(course_factory)
+        await _set(upload_id, lock_token="other", locked_until=datetime.utcnow() + timedelta(minutes=5))
+
+        with pytest.raises(HTTPException) as error:
+            await appendUploadChunkController(upload_id, 0, _chunks(VIDEO[:100]), teacher_id)
+        assert error.value.status_code == 409
+
+        # An expired lease can be taken over
+        await _set(upload_id, locked_until=datetime.utcnow() - timedelta(seconds=1))
+        assert await appendUploadChunkController(upload_id, 0, _chunks(VIDEO[:100]), teacher_id) == 100
+
+    app_db(scenario)
+
+
+def test_writer_that_lost_its_lease_cannot_publish_its_offset(app_db, course_factory, monkeypatch):
+    # Renew (and so re-check the lease) after every chunk
+    monkeypatch.setattr(lessonController, "UPLOAD_CHUNK_RENEW_SECONDS", 0)
+
+    async def scenario():
+        teacher_id, upload_id = await _start(course_factory)
+
+        async def steal():
+            await _set(upload_id, lock_token="other", locked_until=datetime.utcnow() + timedelta(minutes=5))
+
+        with pytest.raises(HTTPException) as error:
+            await appendUploadChunkController(
+                upload_id, 0, _chunks(VIDEO[:100], VIDEO[100:200], between=steal), teacher_id
+            )
+        assert error.value.status_code == 409
+        session = await UploadSession.get(PydanticObjectId(upload_id))
+        assert session.offset == 100  # Recorded while the lease was still ours
+        assert session.lock_token == "other"
+
+    app_db(scenario)
+
+
+def test_finalize_turns_complete_upload_into_lesson(app_db, course_factory):
+    async def scenario():
+        teacher_id, upload_id = await _start(course_factory)
+        await appendUploadChunkController(upload_id, 0, _chunks(VIDEO[:500]), teacher_id)
+
+        with pytest.raises(HTTPException) as error:
+            await finalizeUploadSessionController(upload_id, teacher_id)
+        assert error.value.status_code == 409
+        assert error.value.headers["Upload-Offset"] == "500"
+
+        await appendUploadChunkController(upload_id, 500, _chunks(VIDEO[500:]), teacher_id)
+        lesson = await finalizeUploadSessionController(upload_id, teacher_id)
+
+        assert lesson["media_status"] == MediaStatus.PENDING
+        assert lesson["video_name"].endswith(".mp4")
+        with open(os.path.join("videos", lesson["video_name"]), "rb") as stored:
+            assert stored.read() == VIDEO
+        assert not os.path.exists(session_path(upload_id))
+        assert await UploadSession.get(PydanticObjectId(upload_id)) is None
+        assert await Lesson.get(PydanticObjectId(lesson["id"])) is not None
+
+    app_db(scenario)
+
+
+def test_sweeper_keeps_session_extended_after_it_was_listed(app_db, course_factory, monkeypatch):
+    async def scenario():
+        teacher_id, upload_id = await _start(course_factory)
+        await _set(upload_id, expires_at=datetime.utcnow() - timedelta(seconds=1))
+        stale = await UploadSession.find({}).to_list()
+
+        # A chunk lands between the sweeper's find and its delete
+        await _set(upload_id, expires_at=datetime.utcnow() + timedelta(hours=1))
+
+        class StaleFind:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            async def to_list(self):
+                return stale
+
+        with monkeypatch.context() as patched:
+            patched.setattr(resumable_uploads.UploadSession, "find", StaleFind)
+            assert await sweep_expired_sessions() == 0
+        assert await UploadSession.get(PydanticObjectId(upload_id)) is not None
+        assert os.path.exists(session_path(upload_id))
+
+        # Really expired: document and file both go
+        await _set(upload_id, expires_at=datetime.utcnow() - timedelta(seconds=1))
+        assert await sweep_expired_sessions() == 1
+        assert await UploadSession.get(PydanticObjectId(upload_id)) is None
+        assert not os.path.exists(session_path(upload_id))
+
+    app_db(scenario)
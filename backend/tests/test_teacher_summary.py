@@ -0,0 +1,55 @@
+# tests/test_teacher_summary.py
+# Course lists carry the teacher's name from the embedded teacher_summary:
+# one query, no User lookups, kept in sync when the teacher is renamed.
+# Needs MongoDB (MONGO_URI).
+from beanie import PydanticObjectId
+from config.database import backfillTeacherSummary
+from controllers.courseController import getAllCoursesController
+from models.courseModel import Course
+from models.userModel import User
+from utils.response_cache import course_catalog_cache
+
+
+async def _generation() -> int:
+    return int(await course_catalog_cache.backend.get("courses:gen") or 0)
+
+
+def test_backfilled_summary_lists_in_one_query(app_db, course_factory):
+    async def scenario():
+        for i in range(3):
+            await course_factory(email=f"teacher{i}@example.com")
+        await backfillTeacherSummary()
+
+        await getAllCoursesController(limit=10)  # warm the cached total
+        app_db.commands.clear()
+        page = await getAllCoursesController(limit=10)
+
+        assert [course["teacher"]["first_name"] for course in page["courses"]] == ["Teacher"] * 3
+        assert app_db.commands == ["find"]
+
+    app_db(scenario)
+
+
+def test_rename_propagates_to_courses(app_db, course_factory):
+    async def scenario():
+        teacher_id, course_id = await course_factory()
+        other_id, other_course_id = await course_factory(email="other@example.com")
+        await backfillTeacherSummary()
+        teacher = await User.get(PydanticObjectId(teacher_id))
+
+        before = await _generation()
+        teacher.first_name = "Renamed"
+        await teacher.save()
+
+        course = await Course.get(PydanticObjectId(course_id))
+        assert course.teacher_summary.first_name == "Renamed"
+        assert (await Course.get(PydanticObjectId(other_course_id))).teacher_summary.first_name == "Teacher"
+        assert await _generation() == before + 1
+
+        # A save that leaves the name alone writes nothing and keeps the cache
+        teacher.password = "rehashed-password"
+        await teacher.save()
+        assert await _generation() == before + 1
+        assert (await Course.get(PydanticObjectId(course_id))).teacher_summary.first_name == "Renamed"
+
+    app_db(scenario)
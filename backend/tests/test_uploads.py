@@ -0,0 +1,118 @@
+# tests/test_uploads.py
+# Uploads are streamed to disk one chunk at a time and cut off as soon as
+# they go over the limit, whether or not the client declared a size.
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from fastapi import HTTPException, UploadFile
+from utils.uploads import PARTIAL_SUFFIX, UploadSizeLimitMiddleware, save_upload_to_disk
+
+CHUNK = 64 * 1024
+
+
+class TrackedFile(io.BytesIO):
+    """Source file that records how much each read asked for and returned"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+def _upload(data: bytes, size=None):
+    source = TrackedFile(data)
+    return UploadFile(source, size=size, filename="lesson.mp4"), source
+
+
+def test_streams_in_bounded_chunks_and_hashes(tmp_path):
+    data = os.urandom(5 * CHUNK + 123)
+    upload, source = _upload(data)
+    destination = str(tmp_path / "video.mp4")
+    hasher = hashlib.sha256()
+
+    written = asyncio.run(save_upload_to_disk(upload, destination, max_bytes=len(data), chunk_size=CHUNK, hasher=hasher))
+
+    assert written == len(data)
+    assert max(source.reads) <= CHUNK
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+    assert open(destination, "rb").read() == data
+    assert not os.path.exists(destination + PARTIAL_SUFFIX)
+
+
+def test_undeclared_oversize_upload_stops_early(tmp_path):
+    upload, source = _upload(b"x" * (20 * CHUNK))
+    destination = str(tmp_path / "video.mp4")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(save_upload_to_disk(upload, destination, max_bytes=2 * CHUNK, chunk_size=CHUNK))
+
+    assert raised.value.status_code == 413
+    # Stopped on the first chunk past the limit, not after reading everything
+    assert sum(source.reads) == 3 * CHUNK
+    assert os.listdir(tmp_path) == []
+
+
+def test_declared_oversize_upload_is_not_read(tmp_path):
+    upload, source = _upload(b"x" * (3 * CHUNK), size=3 * CHUNK)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(save_upload_to_disk(upload, str(tmp_path / "video.mp4"), max_bytes=2 * CHUNK, chunk_size=CHUNK))
+
+    assert raised.value.status_code == 413
+    assert source.reads == []
+    assert os.listdir(tmp_path) == []
+
+
+def _call_middleware(body_chunks, headers=()):
+    """Run a request through the size limit; returns (status, body bytes the app read)"""
+    consumed = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            consumed.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(body_chunks) - 1}
+        for index, chunk in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/lesson/create", "headers": list(headers)}
+    middleware = UploadSizeLimitMiddleware(app, [("POST", "/api/v1/lesson/create", CHUNK)])
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], b"".join(consumed)
+
+
+def test_middleware_rejects_large_content_length_without_reading():
+    status, consumed = _call_middleware([b"x"], headers=[(b"content-length", str(10 * CHUNK).encode())])
+    assert status == 413
+    assert consumed == b""
+
+
+def test_middleware_cuts_off_streamed_body():
+    status, consumed = _call_middleware([b"x" * CHUNK] * 10)
+    assert status == 413
+    assert len(consumed) <= 2 * CHUNK
+
+
+def test_middleware_passes_bodies_within_limit():
+    status, consumed = _call_middleware([b"x" * 1000, b"y" * 1000])
+    assert status == 201
+    assert len(consumed) == 2000
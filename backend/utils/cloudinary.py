@@ -1,22 +1,26 @@
-# config/cloudinary_config.py
+# utils/cloudinary.py
 import cloudinary
 import os
 from dotenv import load_dotenv
+from utils.logger import get_logger
 
 load_dotenv()
+logger = get_logger("cloudinary")
 
 def configure_cloudinary():
-    """Configure Cloudinary with environment variables"""
+    """
+    Configure Cloudinary with environment variables
+    The only cloudinary.config call in the app; CLOUDINARY_* names are
+    accepted as fallbacks for older .env files.
+    """
     cloudinary.config(
-        cloud_name=os.getenv("CLOUD_NAME"),
-        api_key=os.getenv("CLOUD_API_KEY"),
-        api_secret=os.getenv("CLOUD_SECRET"),
+        cloud_name=os.getenv("CLOUD_NAME") or os.getenv("CLOUDINARY_CLOUD_NAME"),
+        api_key=os.getenv("CLOUD_API_KEY") or os.getenv("CLOUDINARY_API_KEY"),
+        api_secret=os.getenv("CLOUD_SECRET") or os.getenv("CLOUDINARY_API_SECRET"),
         secure=True  # Use HTTPS
     )
     
     # Verify configuration
     config = cloudinary.config()
-    print("✅ Cloudinary configured successfully")
-    print(f"   Cloud Name: {config.cloud_name}")
-    print(f"   API Key: {config.api_key}")
+    logger.info("Cloudinary configured", extra={"cloud_name": config.cloud_name})
     return config
\ No newline at end of file
@@ -0,0 +1,44 @@
+# utils/counts.py
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+COURSE_COUNT_REFRESH_SECONDS = float(os.getenv("COURSE_COUNT_REFRESH_SECONDS", "30"))
+
+
+class CachedCount:
+    """
+    Collection size from estimated_document_count, refreshed at most every
+    `refresh_seconds`. Reads metadata instead of scanning, and concurrent
+    callers share one refresh. Local writes nudge the value in between.
+    """
+
+    def __init__(self, document_model, refresh_seconds: float):
+        self.document_model = document_model
+        self.refresh_seconds = refresh_seconds
+        self._value = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._value is not None and time.monotonic() - self._fetched_at < self.refresh_seconds
+
+    async def get(self) -> int:
+        if self._fresh():
+            return self._value
+        async with self._lock:
+            if not self._fresh():
+                collection = self.document_model.get_pymongo_collection()
+                self._value = await collection.estimated_document_count()
+                self._fetched_at = time.monotonic()
+        return self._value
+
+    def adjust(self, delta: int):
+        if self._value is not None:
+            self._value = max(self._value + delta, 0)
+
+    def invalidate(self):
+        self._value = None
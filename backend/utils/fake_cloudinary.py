@@ -0,0 +1,63 @@
+# utils/fake_cloudinary.py
+# Local stand-in for cloudinary.uploader / cloudinary.api, enabled with MEDIA_BACKEND=fake.
+# Sleeps to mimic network latency so load tests can run without the real service.
+import os
+import random
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FAKE_MEDIA_LATENCY = float(os.getenv("FAKE_MEDIA_LATENCY", "0.5"))  # seconds
+FAKE_MEDIA_JITTER = float(os.getenv("FAKE_MEDIA_JITTER", "0.1"))  # +/- seconds
+FAKE_CLOUD_NAME = "fake-cloud"
+
+
+def _sleep():
+    delay = FAKE_MEDIA_LATENCY + random.uniform(-FAKE_MEDIA_JITTER, FAKE_MEDIA_JITTER)
+    time.sleep(max(delay, 0))
+
+
+class FakeUploader:
+    """Mimics the subset of cloudinary.uploader this app uses"""
+
+    def __init__(self):
+        self.assets = {}
+
+    def upload(self, file, resource_type="image", folder=None, **options):
+        _sleep()
+        if isinstance(file, str):
+            extension = file.rsplit(".", 1)[-1] if "." in file else "bin"
+        else:
+            extension = "bin"
+            file.read()
+        name = uuid.uuid4().hex
+        public_id = f"{folder}/{name}" if folder else name
+        url = f"https://res.cloudinary.com/{FAKE_CLOUD_NAME}/{resource_type}/upload/v1/{public_id}.{extension}"
+        self.assets[public_id] = url
+        return {"public_id": public_id, "secure_url": url, "resource_type": resource_type}
+
+    def destroy(self, public_id, resource_type="image", **options):
+        _sleep()
+        found = self.assets.pop(public_id, None)
+        return {"result": "ok" if found else "not found"}
+
+
+class FakeAdminApi:
+    """Mimics the subset of cloudinary.api this app uses"""
+
+    def __init__(self, uploader: FakeUploader):
+        self.uploader = uploader
+
+    def delete_resources(self, public_ids, resource_type="image", **options):
+        _sleep()
+        deleted = {}
+        for public_id in public_ids:
+            found = self.uploader.assets.pop(public_id, None)
+            deleted[public_id] = "deleted" if found else "not_found"
+        return {"deleted": deleted}
+
+
+uploader = FakeUploader()
+api = FakeAdminApi(uploader)
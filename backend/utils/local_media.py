@@ -0,0 +1,100 @@
+# utils/local_media.py
+# Serving lesson videos straight from the videos folder.
+# Starlette's FileResponse already answers Range / If-Range with 206 and hands
+# the whole file to the server via the pathsend extension when available;
+# this adds the conditional (304) checks it leaves out, and an optional
+# X-Accel-Redirect mode so nginx does the sendfile() instead of Python.
+# The Content-Type is the lesson's stored video type, never guessed from the
+# file name, and browsers are told not to sniff - nothing uploaded is ever
+# rendered as a page on the API origin.
+import os
+from email.utils import parsedate_to_datetime
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from dotenv import load_dotenv
+from utils.response_cache import etag_matches
+from utils.uploads import CHUNK_SIZE
+from utils.media_store import local_media_type
+
+load_dotenv()
+
+# e.g. "/protected-videos/" - an nginx `internal` location aliased to the videos folder
+LOCAL_MEDIA_ACCEL_REDIRECT = os.getenv("LOCAL_MEDIA_ACCEL_REDIRECT", "")
+LOCAL_MEDIA_CACHE_CONTROL = os.getenv("LOCAL_MEDIA_CACHE_CONTROL", "no-cache")
+SAFE_MEDIA_TYPE = "application/octet-stream"
+
+
+class VideoFileResponse(FileResponse):
+    # Fewer, larger reads when the server has no pathsend support
+    chunk_size = CHUNK_SIZE
+
+
+def _not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    """RFC 9110 precedence: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def local_video_response(request: Request, path: str, stat_result: os.stat_result, media_type: str = None) -> Response:
+    """
+    200/206 file response for a local video, or 304 when the client copy is current
+    `media_type` is the lesson's stored content type; octet-stream without one.
+    """
+    media_type = media_type or SAFE_MEDIA_TYPE
+    response = VideoFileResponse(
+        path,
+        media_type=media_type,
+        stat_result=stat_result,
+        headers={"Cache-Control": LOCAL_MEDIA_CACHE_CONTROL, "X-Content-Type-Options": "nosniff"}
+    )
+    validators = {
+        "ETag": response.headers["etag"],
+        "Last-Modified": response.headers["last-modified"],
+        "Cache-Control": LOCAL_MEDIA_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff"
+    }
+
+    if request.method in ("GET", "HEAD") and _not_modified(request, validators["ETag"], validators["Last-Modified"]):
+        return Response(status_code=304, headers=validators)
+
+    if LOCAL_MEDIA_ACCEL_REDIRECT:
+        # nginx serves the bytes (ranges included) with sendfile
+        return Response(
+            media_type=media_type,
+            headers={
+                **validators,
+                "X-Accel-Redirect": LOCAL_MEDIA_ACCEL_REDIRECT + os.path.basename(path)
+            }
+        )
+    return response
+
+
+class LocalMediaFiles(StaticFiles):
+    """
+    StaticFiles for the local media backend
+    The type comes from LocalStore's extension allowlist instead of mimetypes,
+    and nosniff keeps browsers from upgrading anything to HTML/script.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=local_media_type(str(full_path)),
+            headers={"X-Content-Type-Options": "nosniff"}
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,281 @@
+# utils/media_cache.py
+# The videos folder as a size-bounded cache.
+# Every local video is tracked in an in-memory LRU index (name -> size) that is
+# rebuilt from the directory at startup. When the folder goes over its byte
+# budget the least recently played videos are removed - but only ones whose
+# lesson already has a Cloudinary URL, so spooled uploads are never lost.
+# An evicted video is downloaded again in the background the next time it is
+# played (that request is redirected to Cloudinary meanwhile).
+#
+# Several uvicorn workers (and media_worker.py) share the folder but each has
+# its own index, so no single process sees every write or delete. The index is
+# therefore rescanned from disk every MEDIA_CACHE_RESCAN_SECONDS (playback order
+# is shared through file atimes), and only the process holding an exclusive
+# flock on the folder's lock file evicts - one budget per folder, not per
+# process. When that process exits, another one takes the lock on its next rescan.
+import asyncio
+import fcntl
+import os
+import shutil
+import time
+import urllib.request
+from collections import OrderedDict
+from dotenv import load_dotenv
+from models.lessonModel import Lesson
+from utils.uploads import VIDEOS_FOLDER, PARTIAL_SUFFIX, CHUNK_SIZE
+from utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger("media_cache")
+
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+# Evict down to this fraction of the budget so eviction doesn't run on every write
+MEDIA_CACHE_LOW_WATERMARK = float(os.getenv("MEDIA_CACHE_LOW_WATERMARK", "0.9"))
+# Files no lesson points at (crashed uploads, replaced videos) become evictable after this
+MEDIA_CACHE_ORPHAN_SECONDS = int(os.getenv("MEDIA_CACHE_ORPHAN_SECONDS", str(24 * 3600)))
+# Minimum gap between atime updates of one file (keeps LRU order across restarts)
+MEDIA_CACHE_TOUCH_SECONDS = int(os.getenv("MEDIA_CACHE_TOUCH_SECONDS", "60"))
+MEDIA_CACHE_FETCH_TIMEOUT = float(os.getenv("MEDIA_CACHE_FETCH_TIMEOUT", "120"))
+# How often the index is reloaded from disk to pick up other processes' writes and deletes
+MEDIA_CACHE_RESCAN_SECONDS = int(os.getenv("MEDIA_CACHE_RESCAN_SECONDS", "60"))
+EVICTION_BATCH = 200
+LOCK_FILE = ".media-cache.lock"
+
+
+class LocalMediaCache:
+    """LRU index over one folder with a byte budget"""
+
+    def __init__(self, folder: str, max_bytes: int):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # name -> (size, mtime), least recently used first; mtime ages orphans
+        self._touched = {}  # name -> monotonic time of the last atime update
+        self._total = 0
+        self._evicting = None
+        self._fetching = {}
+        self._lock_fd = None
+        self._rescanner = None
+        self._journal = None  # changes made while a rescan runs, replayed onto its result
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    @property
+    def is_evictor(self) -> bool:
+        """True in the one process that enforces the folder's budget"""
+        return self._lock_fd is not None
+
+    def _try_lock(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(os.path.join(self.folder, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info("Media cache eviction enabled in this process", extra={"pid": os.getpid()})
+        return True
+
+    def _scan(self):
+        """(name, size, mtime, atime) for every finished file; stale partial writes are removed"""
+        found = []
+        now = time.time()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False) or entry.name.startswith("."):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if entry.name.endswith(PARTIAL_SUFFIX):
+                    if now - st.st_mtime > 3600:
+                        os.remove(entry.path)
+                    continue
+                found.append((entry.name, st.st_size, st.st_mtime, st.st_atime))
+        return found
+
+    def _build_index(self):
+        """Thread: scan the folder into (entries, total), oldest access first"""
+        found = self._scan()
+        found.sort(key=lambda item: item[3])
+        entries = OrderedDict((name, (size, mtime)) for name, size, mtime, _ in found)
+        return entries, sum(size for size, _ in entries.values())
+
+    async def rebuild(self):
+        """Reload the index from the directory, oldest access first"""
+        self._try_lock()
+        # Scan, sort and sum off the event loop; adds, discards and plays that land
+        # meanwhile are journalled and replayed so the swap doesn't lose them
+        self._journal = []
+        try:
+            entries, total = await asyncio.to_thread(self._build_index)
+            journal = self._journal
+        finally:
+            self._journal = None
+        for op, name, entry in journal:
+            previous = entries.pop(name, None) if op != "touch" else None
+            if previous:
+                total -= previous[0]
+            if op == "add":
+                entries[name] = entry
+                total += entry[0]
+            elif op == "touch" and name in entries:
+                entries.move_to_end(name)
+        self._entries = entries
+        self._total = total
+        self._touched = {name: at for name, at in self._touched.items() if name in entries}
+        logger.info(
+            "Media cache index rebuilt",
+            extra={"files": len(self._entries), "bytes": self._total, "evictor": self.is_evictor}
+        )
+        self._maybe_evict()
+
+    async def _rescan_loop(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=MEDIA_CACHE_RESCAN_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if stop_event.is_set() or (self._evicting and not self._evicting.done()):
+                continue
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Media cache rescan failed")
+
+    def start(self, stop_event: asyncio.Event):
+        """Rescan the folder periodically (after the initial rebuild())"""
+        self._rescanner = asyncio.create_task(self._rescan_loop(stop_event))
+        return self._rescanner
+
+    async def stop(self, stop_event: asyncio.Event):
+        stop_event.set()
+        if self._rescanner is not None:
+            await asyncio.gather(self._rescanner, return_exceptions=True)
+            self._rescanner = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # Releases the flock for another process
+            self._lock_fd = None
+
+    def add(self, name: str, size: int):
+        """Track a newly written file as most recently used"""
+        previous = self._entries.pop(name, None)
+        if previous:
+            self._total -= previous[0]
+        self._entries[name] = (size, time.time())
+        self._total += size
+        if self._journal is not None:
+            self._journal.append(("add", name, self._entries[name]))
+        self._maybe_evict()
+
+    def touch(self, name: str):
+        """Record a playback; persisted as the file's atime (mtime and so the ETag stay put)"""
+        if name not in self._entries:
+            return
+        self._entries.move_to_end(name)
+        if self._journal is not None:
+            self._journal.append(("touch", name, None))
+        now = time.monotonic()
+        if now - self._touched.get(name, 0) < MEDIA_CACHE_TOUCH_SECONDS:
+            return
+        self._touched[name] = now
+        path = os.path.join(self.folder, name)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+
+    def discard(self, name: str):
+        entry = self._entries.pop(name, None)
+        if entry:
+            self._total -= entry[0]
+        self._touched.pop(name, None)
+        if self._journal is not None:
+            self._journal.append(("discard", name, None))
+
+    def _maybe_evict(self):
+        if not self.is_evictor:
+            return
+        if self._total <= self.max_bytes or (self._evicting and not self._evicting.done()):
+            return
+        try:
+            self._evicting = asyncio.get_running_loop().create_task(self._evict())
+        except RuntimeError:
+            pass  # No loop yet (import time) - rebuild() evicts once it runs
+
+    async def _evictable(self, names):
+        """Names that are safe to delete: published videos and old orphans"""
+        rows = await Lesson.get_pymongo_collection().find(
+            {"video_name": {"$in": names}}, {"video_name": 1, "video_url": 1}
+        ).to_list(length=None)
+        published = {row["video_name"] for row in rows if row.get("video_url")}
+        referenced = {row["video_name"] for row in rows}
+        cutoff = time.time() - MEDIA_CACHE_ORPHAN_SECONDS
+        return [
+            name for name in names
+            if name in published
+            or (name not in referenced and self._entries.get(name, (0, cutoff))[1] < cutoff)
+        ]
+
+    async def _evict(self):
+        target = int(self.max_bytes * MEDIA_CACHE_LOW_WATERMARK)
+        evicted = 0
+        freed = 0
+        skipped = set()
+        try:
+            while self._total > target:
+                candidates = [name for name in self._entries if name not in skipped][:EVICTION_BATCH]
+                if not candidates:
+                    logger.warning("Media cache over budget with nothing evictable", extra={"bytes": self._total})
+                    break
+                evictable = set(await self._evictable(candidates))
+                for name in candidates:
+                    if self._total <= target:
+                        break
+                    if name not in evictable:
+                        skipped.add(name)
+                        continue
+                    size = self._entries.get(name, (0, 0))[0]
+                    self.discard(name)
+                    try:
+                        await asyncio.to_thread(os.remove, os.path.join(self.folder, name))
+                    except FileNotFoundError:
+                        pass
+                    evicted += 1
+                    freed += size
+        except Exception:
+            logger.exception("Media cache eviction failed")
+        if evicted:
+            logger.info("Media cache evicted", extra={"files": evicted, "bytes": freed, "total": self._total})
+
+    def _download(self, url: str, name: str) -> int:
+        destination = os.path.join(self.folder, name)
+        partial = destination + PARTIAL_SUFFIX
+        try:
+            with urllib.request.urlopen(url, timeout=MEDIA_CACHE_FETCH_TIMEOUT) as source, open(partial, "wb") as out:
+                shutil.copyfileobj(source, out, CHUNK_SIZE)
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return os.path.getsize(destination)
+
+    async def _fetch(self, url: str, name: str):
+        try:
+            size = await asyncio.to_thread(self._download, url, name)
+            self.add(name, size)
+            logger.info("Media cache refetched", extra={"video_name": name, "bytes": size})
+        except Exception as e:
+            logger.warning("Media cache refetch failed", extra={"video_name": name, "error": str(e)})
+        finally:
+            self._fetching.pop(name, None)
+
+    def refetch(self, url: str, name: str):
+        """Download an evicted video back into the folder in the background (once per name)"""
+        if name not in self._fetching:
+            self._fetching[name] = asyncio.create_task(self._fetch(url, name))
+
+
+media_cache = LocalMediaCache(VIDEOS_FOLDER, MEDIA_CACHE_MAX_BYTES)
@@ -0,0 +1,80 @@
+# utils/media_cleanup.py
+# Background removal of media left behind by cascading deletes.
+# Callers delete the database rows first and hand the asset ids over here;
+# the request returns immediately while batches are deleted in parallel
+# with retries. Failures are logged - nothing references those assets anymore.
+import asyncio
+import os
+from dotenv import load_dotenv
+from utils.media_store import media_store
+from utils.uploads import VIDEOS_FOLDER
+from utils.media_cache import media_cache
+from utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger("media_cleanup")
+
+# Cloudinary's delete_resources accepts at most 100 public ids per call
+MEDIA_DELETE_BATCH_SIZE = min(int(os.getenv("MEDIA_DELETE_BATCH_SIZE", "100")), 100)
+MEDIA_DELETE_CONCURRENCY = int(os.getenv("MEDIA_DELETE_CONCURRENCY", "4"))
+MEDIA_DELETE_MAX_ATTEMPTS = int(os.getenv("MEDIA_DELETE_MAX_ATTEMPTS", "3"))
+MEDIA_DELETE_RETRY_BASE_SECONDS = float(os.getenv("MEDIA_DELETE_RETRY_BASE_SECONDS", "2"))
+
+_tasks = set()
+
+
+async def _delete_batch(public_ids: list, resource_type: str, limit: asyncio.Semaphore):
+    async with limit:
+        for attempt in range(1, MEDIA_DELETE_MAX_ATTEMPTS + 1):
+            try:
+                await media_store.delete_many(public_ids, resource_type=resource_type)
+                return
+            except Exception as e:
+                if attempt == MEDIA_DELETE_MAX_ATTEMPTS:
+                    logger.error(
+                        "Giving up on media batch delete",
+                        extra={"public_ids": public_ids, "attempts": attempt, "error": str(e)}
+                    )
+                    return
+                await asyncio.sleep(MEDIA_DELETE_RETRY_BASE_SECONDS * (2 ** (attempt - 1)))
+
+
+def _remove_local_files(video_names):
+    for video_name in video_names:
+        path = os.path.join(VIDEOS_FOLDER, video_name)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove local video", extra={"path": path, "error": str(e)})
+
+
+async def delete_media(public_ids, video_names=(), resource_type: str = "video"):
+    """Delete remote assets in parallel batches and the matching local files"""
+    video_names = list(video_names)
+    for video_name in video_names:
+        media_cache.discard(video_name)
+    await asyncio.to_thread(_remove_local_files, video_names)
+
+    public_ids = list(public_ids)
+    limit = asyncio.Semaphore(MEDIA_DELETE_CONCURRENCY)
+    await asyncio.gather(*(
+        _delete_batch(public_ids[i:i + MEDIA_DELETE_BATCH_SIZE], resource_type, limit)
+        for i in range(0, len(public_ids), MEDIA_DELETE_BATCH_SIZE)
+    ))
+    logger.info("Media cleanup finished", extra={"assets": len(public_ids)})
+
+
+def schedule_media_cleanup(public_ids, video_names=(), resource_type: str = "video") -> asyncio.Task:
+    """Run delete_media in the background; the task is kept until it finishes"""
+    task = asyncio.create_task(delete_media(public_ids, video_names, resource_type))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def drain_media_cleanup(timeout: float = 30):
+    """Give running cleanups a chance to finish on shutdown"""
+    if _tasks:
+        await asyncio.wait(list(_tasks), timeout=timeout)
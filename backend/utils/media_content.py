@@ -0,0 +1,116 @@
+# utils/media_content.py
+# Content-addressed media: uploads are hashed as they stream in, and an asset
+# already stored under the same hash is reused instead of uploaded again.
+# media_contents keeps a refcount per asset; the asset is only deleted once
+# the last course/lesson using it lets go.
+import hashlib
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from models.mediaContentModel import MediaContent
+from utils.media_store import media_store
+from utils.media_cleanup import schedule_media_cleanup
+from utils.uploads import CHUNK_SIZE
+from utils.logger import get_logger
+
+logger = get_logger("media_content")
+
+CONTENT_HASH_DIGEST_SIZE = 32
+
+
+def new_hasher():
+    return hashlib.blake2b(digest_size=CONTENT_HASH_DIGEST_SIZE)
+
+
+def _hash_file(file, chunk_size: int) -> str:
+    hasher = new_hasher()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+async def hash_file(file, chunk_size: int = CHUNK_SIZE) -> str:
+    """Hash a seekable file object off the event loop and rewind it"""
+    return await run_in_threadpool(_hash_file, file, chunk_size)
+
+
+def _collection():
+    return MediaContent.get_pymongo_collection()
+
+
+async def acquire_content(resource_type: str, content_hash: str):
+    """Take a reference on an already stored asset; None when there is none"""
+    return await _collection().find_one_and_update(
+        {"resource_type": resource_type, "hash": content_hash, "refcount": {"$gt": 0}},
+        {"$inc": {"refcount": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def register_content(resource_type: str, content_hash: str, url: str, public_id: str, video_name: str = None):
+    """
+    Record a freshly uploaded asset and take a reference on it
+    If the same bytes were registered first by someone else, their asset is
+    returned instead - compare public_id to know whether yours is redundant.
+    """
+    now = datetime.utcnow()
+    for attempt in range(2):
+        try:
+            return await _collection().find_one_and_update(
+                {"resource_type": resource_type, "hash": content_hash},
+                {
+                    "$inc": {"refcount": 1},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"url": url, "public_id": public_id, "video_name": video_name, "created_at": now}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Two upserts raced on the unique index; the retry finds the winner
+            if attempt:
+                raise
+
+
+async def release_content(resource_type: str, content_hash: str, count: int = 1) -> bool:
+    """Drop references; removes the asset (in the background) at zero. Returns True if removed"""
+    collection = _collection()
+    content = await collection.find_one_and_update(
+        {"resource_type": resource_type, "hash": content_hash},
+        {"$inc": {"refcount": -count}, "$set": {"updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
+    )
+    if content is None or content["refcount"] > 0:
+        return False
+
+    # Only the caller whose delete matches owns the cleanup; a concurrent
+    # register that bumped the refcount back up keeps the asset alive
+    deleted = await collection.delete_one({"_id": content["_id"], "refcount": {"$lte": 0}})
+    if not deleted.deleted_count:
+        return False
+    video_names = [content["video_name"]] if content.get("video_name") else []
+    public_ids = [content["public_id"]] + [variant["public_id"] for variant in content.get("variants") or []]
+    schedule_media_cleanup(public_ids, video_names, resource_type)
+    return True
+
+
+async def upload_deduplicated(file, content_hash: str, resource_type: str = "image", **options) -> dict:
+    """Reuse the stored asset for content_hash, or upload file and register it"""
+    content = await acquire_content(resource_type, content_hash)
+    if content:
+        return content
+
+    upload_result = await media_store.upload(file, resource_type=resource_type, **options)
+    content = await register_content(
+        resource_type, content_hash, upload_result["secure_url"], upload_result["public_id"]
+    )
+    if content["public_id"] != upload_result["public_id"]:
+        # Same bytes finished uploading elsewhere first - keep theirs
+        try:
+            await media_store.delete(upload_result["public_id"], resource_type=resource_type)
+        except Exception as e:
+            logger.warning("Could not remove duplicate upload", extra={"public_id": upload_result["public_id"], "error": str(e)})
+    return content
@@ -0,0 +1,57 @@
+# utils/media_executor.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Blocking media storage calls (see utils/media_store.py) run here instead of on the event loop
+MEDIA_POOL_SIZE = int(os.getenv("MEDIA_POOL_SIZE", "8"))
+# Max calls running + waiting for a thread before new ones are refused
+MEDIA_QUEUE_LIMIT = int(os.getenv("MEDIA_QUEUE_LIMIT", "32"))
+MEDIA_UPLOAD_TIMEOUT = float(os.getenv("MEDIA_UPLOAD_TIMEOUT", "120"))
+MEDIA_DESTROY_TIMEOUT = float(os.getenv("MEDIA_DESTROY_TIMEOUT", "30"))
+
+_executor = ThreadPoolExecutor(max_workers=MEDIA_POOL_SIZE, thread_name_prefix="media")
+_pending = 0
+
+
+def _release():
+    global _pending
+    _pending -= 1
+
+
+async def run_media_call(fn, *args, timeout: float, **kwargs):
+    """
+    Run a blocking media storage call on the bounded media thread pool
+    - 503 with Retry-After when the pool queue is full (backpressure)
+    - 504 when the call does not finish within `timeout` seconds
+    A timed-out call keeps its slot until the thread actually returns.
+    """
+    global _pending
+    if _pending >= MEDIA_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=503,
+            detail="Media service is busy, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+    loop = asyncio.get_running_loop()
+    _pending += 1
+    future = _executor.submit(fn, *args, **kwargs)
+    # Done callbacks run on the worker thread; hop back to the loop to update the counter
+    future.add_done_callback(lambda _f: loop.call_soon_threadsafe(_release))
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Media service timed out")
+
+
+def pool_stats() -> dict:
+    return {
+        "pool_size": MEDIA_POOL_SIZE,
+        "queue_limit": MEDIA_QUEUE_LIMIT,
+        "pending": _pending
+    }
@@ -0,0 +1,302 @@
+# utils/media_queue.py
+# Background queue for lesson video uploads.
+# Jobs are persisted in MongoDB (media_jobs) and claimed atomically with a lease,
+# so workers can run inside the API process or as a separate process
+# (see media_worker.py) that shares the same videos folder.
+import asyncio
+import os
+from datetime import datetime, timedelta
+from beanie import PydanticObjectId, UpdateResponse
+from dotenv import load_dotenv
+from models.mediaJobModel import MediaJob, MediaJobStatus
+from models.lessonModel import Lesson, MediaStatus
+from utils.media_store import media_store
+from utils.uploads import VIDEOS_FOLDER, video_content_type
+from utils.media_content import register_content, release_content
+from utils.media_cache import media_cache
+from utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger("media_queue")
+
+MEDIA_WORKERS_INPROCESS = os.getenv("MEDIA_WORKERS_INPROCESS", "true").lower() == "true"
+MEDIA_WORKER_CONCURRENCY = int(os.getenv("MEDIA_WORKER_CONCURRENCY", "2"))
+MEDIA_JOB_MAX_ATTEMPTS = int(os.getenv("MEDIA_JOB_MAX_ATTEMPTS", "3"))
+MEDIA_JOB_LEASE_SECONDS = int(os.getenv("MEDIA_JOB_LEASE_SECONDS", "600"))
+MEDIA_JOB_RETRY_BASE_SECONDS = int(os.getenv("MEDIA_JOB_RETRY_BASE_SECONDS", "10"))
+MEDIA_JOB_POLL_SECONDS = float(os.getenv("MEDIA_JOB_POLL_SECONDS", "2"))
+
+_wakeup = asyncio.Event()
+_workers = []
+
+
+async def enqueue_lesson_upload(
+    lesson_id,
+    video_name: str,
+    replaces_video_name: str = None,
+    replaces_video_url: str = None,
+    replaces_public_id: str = None,
+    content_hash: str = None,
+    replaces_content_hash: str = None,
+    job_id: PydanticObjectId = None
+) -> MediaJob:
+    """Persist an upload job for a spooled lesson video and wake a worker"""
+    job = MediaJob(
+        id=job_id or PydanticObjectId(),
+        lesson_id=PydanticObjectId(lesson_id),
+        video_name=video_name,
+        replaces_video_name=replaces_video_name,
+        replaces_video_url=replaces_video_url,
+        replaces_public_id=replaces_public_id or media_store.public_id_from_url(replaces_video_url),
+        content_hash=content_hash,
+        replaces_content_hash=replaces_content_hash,
+        max_attempts=MEDIA_JOB_MAX_ATTEMPTS
+    )
+    await job.insert()
+    _wakeup.set()
+    return job
+
+
+async def enqueue_lesson_uploads(items) -> None:
+    """Persist upload jobs for many (job_id, lesson_id, video_name, content_hash) items in one insert"""
+    if not items:
+        return
+    await MediaJob.insert_many([
+        MediaJob(
+            id=job_id,
+            lesson_id=PydanticObjectId(lesson_id),
+            video_name=video_name,
+            content_hash=content_hash,
+            max_attempts=MEDIA_JOB_MAX_ATTEMPTS
+        )
+        for job_id, lesson_id, video_name, content_hash in items
+    ])
+    _wakeup.set()
+
+
+async def get_latest_job(lesson_id) -> MediaJob:
+    return await MediaJob.find(
+        MediaJob.lesson_id == PydanticObjectId(lesson_id)
+    ).sort(-MediaJob.created_at).first_or_none()
+
+
+async def claim_next_job():
+    """Atomically take a runnable job (or one whose lease expired with attempts left)"""
+    now = datetime.utcnow()
+    return await MediaJob.find_one({
+        "$or": [
+            {"status": MediaJobStatus.PENDING.value, "run_after": {"$lte": now}},
+            {
+                "status": MediaJobStatus.RUNNING.value,
+                "locked_until": {"$lt": now},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            },
+        ]
+    }).update(
+        {
+            "$set": {
+                "status": MediaJobStatus.RUNNING.value,
+                "locked_until": now + timedelta(seconds=MEDIA_JOB_LEASE_SECONDS),
+                "progress": 10,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        response_type=UpdateResponse.NEW_DOCUMENT
+    )
+
+
+async def fail_abandoned_jobs() -> int:
+    """Fail jobs whose worker died during their last attempt (claim_next_job skips them)"""
+    failed = 0
+    while True:
+        now = datetime.utcnow()
+        job = await MediaJob.find_one({
+            "status": MediaJobStatus.RUNNING.value,
+            "locked_until": {"$lt": now},
+            "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+        }).update(
+            # Take the lease so only one worker fails it
+            {"$set": {"locked_until": now + timedelta(seconds=MEDIA_JOB_LEASE_SECONDS), "updated_at": now}},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        if not job:
+            return failed
+        await _handle_failure(job, RuntimeError("Lease expired on the last attempt"))
+        failed += 1
+
+
+async def _set_job(job: MediaJob, **fields):
+    fields["updated_at"] = datetime.utcnow()
+    await MediaJob.find_one(MediaJob.id == job.id).update({"$set": fields})
+
+
+async def _set_lesson(job: MediaJob, **fields):
+    """Update the job's lesson only while this job is still its current upload"""
+    return await Lesson.get_pymongo_collection().update_one(
+        {
+            "_id": job.lesson_id,
+            # None: lessons written before current_job_id existed
+            "current_job_id": {"$in": [job.id, None]}
+        },
+        {"$set": fields}
+    )
+
+
+def _is_current(lesson: Lesson, job: MediaJob) -> bool:
+    return lesson.current_job_id in (None, job.id)
+
+
+def _remove_local(video_name: str):
+    if video_name:
+        media_cache.discard(video_name)
+        path = os.path.join(VIDEOS_FOLDER, video_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def process_job(job: MediaJob):
+    """Upload one spooled video and point its lesson at the result"""
+    lesson = await Lesson.get(job.lesson_id)
+    if not lesson:
+        # Lesson was deleted while queued - nothing to publish
+        _remove_local(job.video_name)
+        await _set_job(job, status=MediaJobStatus.DONE.value, progress=100, locked_until=None)
+        return
+
+    if not _is_current(lesson, job) or not os.path.exists(os.path.join(VIDEOS_FOLDER, job.video_name)):
+        # Superseded by a newer upload for the same lesson - never publish this one
+        _remove_local(job.video_name)
+        await _set_job(job, status=MediaJobStatus.DONE.value, progress=100, locked_until=None,
+                       error="Superseded by a newer upload")
+        return
+
+    await _set_lesson(job, media_status=MediaStatus.PROCESSING.value)
+
+    try:
+        upload_result = await media_store.upload(
+            os.path.join(VIDEOS_FOLDER, job.video_name),
+            resource_type=job.resource_type,
+            folder=job.folder
+        )
+    except Exception as e:
+        await _handle_failure(job, e)
+        return
+
+    await _set_job(job, progress=90)
+    video_name = job.video_name
+    video_url = upload_result["secure_url"]
+    public_id = upload_result["public_id"]
+    if job.content_hash:
+        content = await register_content(
+            job.resource_type, job.content_hash, video_url, upload_result["public_id"], job.video_name
+        )
+        if content["public_id"] != upload_result["public_id"]:
+            # Same bytes finished uploading for another lesson first - share theirs
+            _remove_local(job.video_name)
+            try:
+                await media_store.delete(public_id, resource_type=job.resource_type)
+            except Exception:
+                pass
+            video_name, video_url, public_id = content["video_name"], content["url"], content["public_id"]
+
+    result = await _set_lesson(
+        job,
+        video_name=video_name,
+        content_type=video_content_type(video_name),
+        video_url=video_url,
+        video_public_id=public_id,
+        content_hash=job.content_hash,
+        media_status=MediaStatus.READY.value
+    )
+
+    if result.matched_count == 0:
+        # Lesson was deleted or a newer upload superseded this job during the
+        # upload - don't leave the asset orphaned; the newer job owns the old video
+        if job.content_hash:
+            await release_content(job.resource_type, job.content_hash)
+        else:
+            _remove_local(job.video_name)
+            try:
+                await media_store.delete(public_id, resource_type=job.resource_type)
+            except Exception:
+                pass
+    elif job.replaces_content_hash:
+        await release_content(job.resource_type, job.replaces_content_hash)
+    elif job.replaces_video_name or job.replaces_public_id:
+        _remove_local(job.replaces_video_name)
+        if job.replaces_public_id:
+            try:
+                await media_store.delete(job.replaces_public_id, resource_type=job.resource_type)
+            except Exception:
+                pass  # If deletion fails, just continue
+
+    await _set_job(job, status=MediaJobStatus.DONE.value, progress=100, error=None, locked_until=None)
+
+
+async def _handle_failure(job: MediaJob, error: Exception):
+    logger.warning(
+        "Media job attempt failed",
+        extra={"job_id": str(job.id), "attempt": job.attempts, "error": str(error)}
+    )
+    if job.attempts < job.max_attempts:
+        backoff = MEDIA_JOB_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+        await _set_job(
+            job,
+            status=MediaJobStatus.PENDING.value,
+            run_after=datetime.utcnow() + timedelta(seconds=backoff),
+            locked_until=None,
+            progress=0,
+            error=str(error)
+        )
+        await _set_lesson(job, media_status=MediaStatus.PENDING.value)
+        return
+
+    await _set_job(job, status=MediaJobStatus.FAILED.value, locked_until=None, error=str(error))
+    _remove_local(job.video_name)
+    if job.replaces_video_url:
+        # A replacement failed - the lesson still serves its previous video
+        await _set_lesson(job, media_status=MediaStatus.READY.value)
+    else:
+        await _set_lesson(job, media_status=MediaStatus.FAILED.value)
+
+
+async def run_worker(stop_event: asyncio.Event):
+    """Claim and process jobs until stop_event is set"""
+    while not stop_event.is_set():
+        try:
+            job = await claim_next_job()
+        except Exception as e:
+            logger.exception("Media worker could not claim a job")
+            job = None
+
+        if not job:
+            try:
+                await fail_abandoned_jobs()
+            except Exception:
+                logger.exception("Media worker could not fail abandoned jobs")
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=MEDIA_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await process_job(job)
+        except Exception as e:
+            logger.exception("Media job crashed", extra={"job_id": str(job.id)})
+            await _handle_failure(job, e)
+
+
+def start_workers(stop_event: asyncio.Event, concurrency: int = MEDIA_WORKER_CONCURRENCY):
+    for _ in range(concurrency):
+        _workers.append(asyncio.create_task(run_worker(stop_event)))
+    return _workers
+
+
+async def stop_workers(stop_event: asyncio.Event):
+    stop_event.set()
+    _wakeup.set()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
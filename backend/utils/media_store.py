@@ -0,0 +1,256 @@
+# utils/media_store.py
+# Where course thumbnails and lesson videos are stored.
+# Controllers and workers only talk to `media_store`; MEDIA_BACKEND picks the
+# implementation:
+#   cloudinary - the real service (default)
+#   local      - files under MEDIA_LOCAL_ROOT served at MEDIA_LOCAL_BASE_URL,
+#                laid out like an S3 bucket (public_id is the object key)
+#   fake       - in-memory Cloudinary double with injected latency (utils/fake_cloudinary.py)
+# Blocking SDK / filesystem calls run on the bounded media pool (utils/media_executor.py).
+import os
+import re
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+from utils.media_executor import run_media_call, MEDIA_UPLOAD_TIMEOUT, MEDIA_DESTROY_TIMEOUT
+from utils.uploads import CHUNK_SIZE, VIDEO_EXTENSIONS
+
+load_dotenv()
+
+MEDIA_BACKEND = os.getenv("MEDIA_BACKEND", "cloudinary")  # cloudinary | local | fake
+MEDIA_LOCAL_ROOT = os.getenv("MEDIA_LOCAL_ROOT", "media")
+MEDIA_LOCAL_BASE_URL = os.getenv("MEDIA_LOCAL_BASE_URL", "/media").rstrip("/")
+
+# https://res.cloudinary.com/<cloud>/<type>/upload/v123/<folder>/<name>.<ext>
+_CLOUDINARY_URL = re.compile(r"/upload/(?:v\d+/)?(?P<public_id>.+?)(?:\.[^./]+)?$")
+
+
+class MediaStore(ABC):
+    """
+    Storage backend interface
+    upload() returns {"public_id", "secure_url", "resource_type"}; the
+    public_id is what delete()/delete_many()/url() take back.
+    A backend missing any abstract method fails when it is instantiated.
+    """
+    name = "base"
+
+    def configure(self):
+        """Called once at startup"""
+
+    @abstractmethod
+    async def upload(self, file, resource_type: str = "image", folder: str = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def delete(self, public_id: str, resource_type: str = "image") -> dict:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, public_ids, resource_type: str = "image") -> dict:
+        ...
+
+    @abstractmethod
+    def url(self, public_id: str, resource_type: str = "image") -> str:
+        ...
+
+    @abstractmethod
+    def public_id_from_url(self, url: str):
+        """Best-effort public_id for records that only kept the URL"""
+
+
+class CloudinaryStore(MediaStore):
+    """Cloudinary via its SDK; `uploader`/`api` are the SDK modules or doubles of them"""
+    name = "cloudinary"
+
+    def __init__(self, uploader=None, api=None):
+        self._uploader = uploader
+        self._api = api
+
+    def configure(self):
+        from utils.cloudinary import configure_cloudinary
+        configure_cloudinary()
+
+    @property
+    def uploader(self):
+        if self._uploader is None:
+            import cloudinary.uploader
+            self._uploader = cloudinary.uploader
+        return self._uploader
+
+    @property
+    def api(self):
+        if self._api is None:
+            import cloudinary.api
+            self._api = cloudinary.api
+        return self._api
+
+    async def upload(self, file, resource_type: str = "image", folder: str = None) -> dict:
+        options = {"resource_type": resource_type}
+        if folder:
+            options["folder"] = folder
+        result = await run_media_call(self.uploader.upload, file, timeout=MEDIA_UPLOAD_TIMEOUT, **options)
+        return {
+            "public_id": result["public_id"],
+            "secure_url": result["secure_url"],
+            "resource_type": result.get("resource_type", resource_type)
+        }
+
+    async def delete(self, public_id: str, resource_type: str = "image") -> dict:
+        return await run_media_call(
+            self.uploader.destroy, public_id, timeout=MEDIA_DESTROY_TIMEOUT, resource_type=resource_type
+        )
+
+    async def delete_many(self, public_ids, resource_type: str = "image") -> dict:
+        """Up to 100 ids per call (Admin API delete_resources)"""
+        return await run_media_call(
+            self.api.delete_resources, list(public_ids), timeout=MEDIA_DESTROY_TIMEOUT, resource_type=resource_type
+        )
+
+    def url(self, public_id: str, resource_type: str = "image") -> str:
+        import cloudinary.utils
+        return cloudinary.utils.cloudinary_url(public_id, resource_type=resource_type, secure=True)[0]
+
+    def public_id_from_url(self, url: str):
+        match = _CLOUDINARY_URL.search(url or "")
+        return match.group("public_id") if match else None
+
+
+class FakeStore(CloudinaryStore):
+    """Cloudinary double - same URLs and ids, no network"""
+    name = "fake"
+
+    def __init__(self):
+        from utils import fake_cloudinary
+        super().__init__(fake_cloudinary.uploader, fake_cloudinary.api)
+        self._cloud_name = fake_cloudinary.FAKE_CLOUD_NAME
+
+    def configure(self):
+        pass
+
+    def url(self, public_id: str, resource_type: str = "image") -> str:
+        return f"https://res.cloudinary.com/{self._cloud_name}/{resource_type}/upload/{public_id}"
+
+
+_IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF8", ".gif"),
+]
+
+# The only extensions LocalStore writes, and the type each is served with.
+# Anything else is stored as .bin and served as application/octet-stream, so an
+# uploaded .html or .svg never becomes active content on the API origin.
+LOCAL_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    **{f".{extension}": content_type for content_type, extension in VIDEO_EXTENSIONS.items()},
+}
+
+
+def _guess_extension(file) -> str:
+    """Allowlisted extension from the content (images) or the spooled name (videos); .bin otherwise"""
+    if isinstance(file, str):
+        extension = os.path.splitext(file)[1].lower()
+        return extension if extension in LOCAL_MEDIA_TYPES else ".bin"
+    position = file.tell()
+    head = file.read(16)
+    file.seek(position)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return ".avif"
+    for signature, extension in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return ".bin"
+
+
+def local_media_type(path: str) -> str:
+    """Type a LocalStore object is served with; never guessed beyond the allowlist"""
+    return LOCAL_MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+
+class LocalStore(MediaStore):
+    """
+    Files on local disk, one object per key (S3-style <folder>/<uuid>.<ext>)
+    run.py mounts MEDIA_LOCAL_ROOT at MEDIA_LOCAL_BASE_URL when this backend is on
+    (utils/local_media.LocalMediaFiles: allowlisted types and nosniff).
+    """
+    name = "local"
+
+    def __init__(self, root: str = MEDIA_LOCAL_ROOT, base_url: str = MEDIA_LOCAL_BASE_URL):
+        self.root = root
+        self.base_url = base_url
+
+    def configure(self):
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, public_id: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, public_id))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError("Invalid public_id")
+        return path
+
+    def _write(self, file, public_id: str):
+        path = self._path(public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = path + ".part"
+        try:
+            if isinstance(file, str):
+                shutil.copyfile(file, partial)
+            else:
+                with open(partial, "wb") as out:
+                    shutil.copyfileobj(file, out, CHUNK_SIZE)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+    def _remove(self, public_id: str) -> bool:
+        try:
+            os.remove(self._path(public_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def upload(self, file, resource_type: str = "image", folder: str = None) -> dict:
+        name = uuid.uuid4().hex + _guess_extension(file)
+        public_id = f"{folder or resource_type}/{name}"
+        await run_media_call(self._write, file, public_id, timeout=MEDIA_UPLOAD_TIMEOUT)
+        return {"public_id": public_id, "secure_url": self.url(public_id), "resource_type": resource_type}
+
+    async def delete(self, public_id: str, resource_type: str = "image") -> dict:
+        removed = await run_media_call(self._remove, public_id, timeout=MEDIA_DESTROY_TIMEOUT)
+        return {"result": "ok" if removed else "not found"}
+
+    async def delete_many(self, public_ids, resource_type: str = "image") -> dict:
+        public_ids = list(public_ids)
+        removed = await run_media_call(
+            lambda: [self._remove(public_id) for public_id in public_ids], timeout=MEDIA_DESTROY_TIMEOUT
+        )
+        return {"deleted": {
+            public_id: "deleted" if ok else "not_found" for public_id, ok in zip(public_ids, removed)
+        }}
+
+    def url(self, public_id: str, resource_type: str = "image") -> str:
+        return f"{self.base_url}/{public_id}"
+
+    def public_id_from_url(self, url: str):
+        prefix = self.base_url + "/"
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+
+def _make_store(kind: str) -> MediaStore:
+    if kind == "local":
+        return LocalStore()
+    if kind == "fake":
+        return FakeStore()
+    return CloudinaryStore()
+
+
+media_store = _make_store(MEDIA_BACKEND)
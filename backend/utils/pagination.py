@@ -0,0 +1,50 @@
+# utils/pagination.py
+# Opaque keyset cursors over (created_at, _id).
+# Deep pages cost the same as the first one because MongoDB seeks straight
+# into the (created_at, _id) index instead of walking skipped documents.
+import base64
+import json
+from datetime import datetime
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, doc_id) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) from a cursor, 400 if it was tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), PydanticObjectId(data["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(cursor: str) -> dict:
+    """Mongo filter for documents strictly after the cursor in (created_at, _id) order"""
+    created_at, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": doc_id}},
+        ]
+    }
+
+
+def next_cursor(items: list, limit: int):
+    """
+    Trim a page fetched with limit + 1 and build the cursor for the next one
+    Returns (page, cursor or None when this is the last page).
+    `items` may hold documents or dicts with created_at/_id.
+    """
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    last = page[-1]
+    if isinstance(last, dict):
+        return page, encode_cursor(last["created_at"], last["_id"])
+    return page, encode_cursor(last.created_at, last.id)
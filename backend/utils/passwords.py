@@ -0,0 +1,97 @@
+# utils/passwords.py
+# bcrypt hashing/verification off the event loop.
+# Each call burns ~200ms+ of CPU, so it runs on a process pool sized to the
+# machine's cores; when too many calls are waiting we shed load with 503.
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(os.cpu_count() or 1)))
+# Max hash/verify calls running + queued before new ones get 503
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", str(PASSWORD_POOL_SIZE * 4)))
+PASSWORD_RETRY_AFTER = os.getenv("PASSWORD_RETRY_AFTER", "2")  # seconds
+
+_pool = None
+_pending = 0
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, hashed: str, rounds: int):
+    """Returns (matches, new_hash); new_hash is set when the cost changed"""
+    if not bcrypt.verify(password, hashed):
+        return False, None
+    if bcrypt.using(rounds=rounds).needs_update(hashed):
+        return True, _hash(password, rounds)
+    return True, None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # forkserver: workers don't inherit the event loop, Mongo client or log threads
+        _pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_POOL_SIZE, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker died) so the next call starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(fn, *args):
+    global _pending
+    if _pending >= PASSWORD_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": PASSWORD_RETRY_AFTER}
+        )
+    _pending += 1
+    pool = _get_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": PASSWORD_RETRY_AFTER}
+        )
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _submit(_hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_password(password: str, hashed: str):
+    """
+    Check a password against its stored hash
+    Returns (matches, new_hash). new_hash is a rehash at the current
+    BCRYPT_ROUNDS when the stored cost differs, for the caller to persist.
+    """
+    return await _submit(_verify, password, hashed, BCRYPT_ROUNDS)
+
+
+def shutdown_password_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
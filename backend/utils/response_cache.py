@@ -0,0 +1,178 @@
+# utils/response_cache.py
+# Cache for serialized public responses (course catalog pages).
+# Entries live under a namespace generation; writers bump the generation to
+# invalidate every page at once, and stale generations age out via TTL/LRU.
+#
+# The memory backend is private to one process: a generation bump in one uvicorn
+# worker is invisible to the others, which keep serving their stale pages. It is
+# therefore only used with a single worker. With WEB_CONCURRENCY > 1 (uvicorn's
+# --workers default) the "auto" backend is redis, and asking for "memory" is refused.
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "auto")  # auto | memory | redis | fakeredis | off
+# Number of API worker processes sharing the cache (uvicorn reads the same variable)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class LRUTTLBackend:
+    """
+    In-process LRU with per-entry expiry
+    Per worker process: other uvicorn workers would only see an invalidation
+    once their own entries expire, so this is for single-worker deployments.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}  # Generation counters are never evicted
+
+    async def get(self, key: str):
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisBackend:
+    """Any client with the redis.asyncio get/set(ex=)/incr API"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str):
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int = None):
+        await self.client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class FakeRedis:
+    """Local stand-in for redis.asyncio.Redis covering what RedisBackend uses"""
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key):
+        value, expires_at = self._data.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        if isinstance(value, str):
+            value = value.encode()
+        self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def incr(self, key):
+        value = int(await self.get(key) or 0) + 1
+        await self.set(key, str(value))
+        return value
+
+
+def _make_backend(kind: str, workers: int = WEB_CONCURRENCY):
+    if kind == "auto":
+        kind = "redis" if workers > 1 else "memory"
+    if kind == "off":
+        return None
+    if kind == "redis":
+        # Optional dependency - only needed when RESPONSE_CACHE_BACKEND=redis
+        import redis.asyncio as redis
+        return RedisBackend(redis.from_url(REDIS_URL))
+    if kind == "fakeredis":
+        return RedisBackend(FakeRedis())
+    if kind == "memory":
+        if workers > 1:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=memory is per process and would serve stale pages "
+                f"across {workers} workers; use redis (or off)"
+            )
+        return LRUTTLBackend()
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {kind}")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 7232 weak comparison against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """Namespaced cache of (etag, body) pairs with bulk invalidation"""
+
+    def __init__(self, namespace: str, backend=None, ttl: int = RESPONSE_CACHE_TTL):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+
+    async def _prefix(self) -> str:
+        generation = await self.backend.get(f"{self.namespace}:gen")
+        return f"{self.namespace}:{int(generation or 0)}:"
+
+    async def get_or_build(self, key: str, build):
+        """
+        Return (etag, body) for key, calling `await build()` for the body on a miss
+        The generation is read before building, so a page built while a write
+        invalidates the namespace is stored under the old generation and never served.
+        """
+        if self.backend is None:
+            body = await build()
+            return make_etag(body), body
+
+        prefix = await self._prefix()
+        value = await self.backend.get(prefix + key)
+        if value is not None:
+            etag, body = value.split(b"\n", 1)
+            return etag.decode(), body
+
+        body = await build()
+        etag = make_etag(body)
+        await self.backend.set(prefix + key, etag.encode() + b"\n" + body, self.ttl)
+        return etag, body
+
+    async def invalidate(self):
+        """Drop every entry in this namespace"""
+        if self.backend is not None:
+            await self.backend.incr(f"{self.namespace}:gen")
+
+
+# Public course catalog pages (/api/v1/course/all)
+course_catalog_cache = ResponseCache("courses", _make_backend(RESPONSE_CACHE_BACKEND))
@@ -0,0 +1,147 @@
+# utils/resumable_uploads.py
+# Spool files and housekeeping for resumable (tus-style) lesson uploads.
+# Each session owns one file preallocated to the declared length; chunks are
+# written at their offset with pwrite, so nothing is buffered or appended.
+# A sweeper removes sessions (and their files) once they expire.
+import asyncio
+import fcntl
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from models.uploadSessionModel import UploadSession
+from utils.uploads import VIDEOS_FOLDER, PARTIAL_SUFFIX
+from utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger("resumable_uploads")
+
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+UPLOAD_SESSION_SWEEP_SECONDS = int(os.getenv("UPLOAD_SESSION_SWEEP_SECONDS", "600"))
+# How long one PATCH may hold a session before another may take over
+UPLOAD_CHUNK_LEASE_SECONDS = int(os.getenv("UPLOAD_CHUNK_LEASE_SECONDS", "300"))
+# A writer extends its lease (and records progress) this often while bytes keep arriving
+UPLOAD_CHUNK_RENEW_SECONDS = max(1, UPLOAD_CHUNK_LEASE_SECONDS // 3)
+# Open sessions one teacher may hold at a time (each reserves its full length on disk)
+UPLOAD_SESSION_MAX_OPEN_PER_TEACHER = int(os.getenv("UPLOAD_SESSION_MAX_OPEN_PER_TEACHER", "10"))
+
+# Subfolder, so the media cache (which indexes files directly in VIDEOS_FOLDER) ignores it
+UPLOADS_FOLDER = os.path.join(VIDEOS_FOLDER, "uploads")
+os.makedirs(UPLOADS_FOLDER, exist_ok=True)
+
+_sweeper = None
+
+
+def session_path(upload_id) -> str:
+    return os.path.join(UPLOADS_FOLDER, f"{upload_id}{PARTIAL_SUFFIX}")
+
+
+def _preallocate(path: str, length: int):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if length and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, length)
+        else:
+            os.ftruncate(fd, length)
+    finally:
+        os.close(fd)
+
+
+async def preallocate(path: str, length: int):
+    """Create the spool file with all `length` bytes reserved up front"""
+    await run_in_threadpool(_preallocate, path, length)
+
+
+def open_for_writing(path: str) -> int:
+    return os.open(path, os.O_WRONLY)
+
+
+def pwrite_all(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _same_file(fd: int, path: str) -> bool:
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+def pwrite_chunk(fd: int, path: str, data: bytes, offset: int) -> bool:
+    """
+    pwrite under a shared flock, only while `path` still names the file behind `fd`.
+    Returns False once the spool was finalized (moved away) or removed, so a
+    writer that outlived its lease never touches a published video.
+    """
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    try:
+        if not _same_file(fd, path):
+            return False
+        pwrite_all(fd, data, offset)
+        return True
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def open_for_finalize(path: str):
+    """Open the spool holding an exclusive flock: in-flight chunk writes finish first, later ones are refused"""
+    spooled = open(path, "rb")
+    fcntl.flock(spooled.fileno(), fcntl.LOCK_EX)
+    return spooled
+
+
+def remove_session_file(upload_id):
+    try:
+        os.remove(session_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+async def sweep_expired_sessions() -> int:
+    """Delete expired sessions and their spool files"""
+    expired = await UploadSession.find({"expires_at": {"$lt": datetime.utcnow()}}).to_list()
+    removed = 0
+    for session in expired:
+        # Document first, conditionally: a chunk that arrived since the find
+        # pushed expires_at forward, and that session must keep its file
+        deleted = await UploadSession.get_pymongo_collection().delete_one(
+            {"_id": session.id, "expires_at": {"$lt": datetime.utcnow()}}
+        )
+        if deleted.deleted_count == 1:
+            await run_in_threadpool(remove_session_file, session.id)
+            removed += 1
+    if removed:
+        logger.info("Expired upload sessions removed", extra={"sessions": removed})
+    return removed
+
+
+async def _run_sweeper(stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        try:
+            await sweep_expired_sessions()
+        except Exception:
+            logger.exception("Upload session sweep failed")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=UPLOAD_SESSION_SWEEP_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_session_sweeper(stop_event: asyncio.Event):
+    global _sweeper
+    _sweeper = asyncio.create_task(_run_sweeper(stop_event))
+    return _sweeper
+
+
+async def stop_session_sweeper(stop_event: asyncio.Event):
+    global _sweeper
+    stop_event.set()
+    if _sweeper is not None:
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
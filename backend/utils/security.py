@@ -1,3 +1,7 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
 from jose import jwt
 from datetime import datetime,timedelta
 
@@ -5,6 +9,18 @@ SECRET_KEY="secret_ha_bhai_secret_ha"
 ALGORITHM="HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES=60*24
 
+# Verified claims cache: repeat requests with the same token skip signature checks
+JWT_CACHE_SIZE=int(os.getenv("JWT_CACHE_SIZE","4096"))
+# "jose" (default) or "pyjwt" - PyJWT decodes faster and is used when installed
+JWT_BACKEND=os.getenv("JWT_BACKEND","jose")
+
+try:
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
+_claims_cache = OrderedDict()  # sha256(token) -> (claims, exp timestamp)
+
 def create_access_token(data:dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -14,11 +30,41 @@ def create_access_token(data:dict):
 
 
 
-def verify_access_token(token: str):
+def _decode_token(token: str):
+    if JWT_BACKEND == "pyjwt" and pyjwt is not None:
+        try:
+            return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except pyjwt.PyJWTError:
+            return None
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+def verify_access_token(token: str):
+    """Decode and verify a token, reusing cached claims until the token's exp"""
+    digest = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+
+    cached = _claims_cache.get(digest)
+    if cached is not None:
+        claims, expires_at = cached
+        if expires_at > now:
+            _claims_cache.move_to_end(digest)
+            return dict(claims)
+        del _claims_cache[digest]
+
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and JWT_CACHE_SIZE > 0:
+        _claims_cache[digest] = (dict(payload), expires_at)
+        if len(_claims_cache) > JWT_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return payload
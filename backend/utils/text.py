@@ -0,0 +1,21 @@
+# utils/text.py
+# Text normalization for index-backed lookups (course title autocomplete).
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+# Appended to a normalized prefix to get the exclusive upper bound of its range
+PREFIX_RANGE_END = "\U0010ffff"
+
+
+def normalize_text(value: str) -> str:
+    """Case-folded, accent-stripped, single-spaced form of value"""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", stripped.casefold()).strip()
+
+
+def prefix_range(prefix: str) -> dict:
+    """Range filter matching strings that start with the normalized prefix"""
+    normalized = normalize_text(prefix)
+    return {"$gte": normalized, "$lt": normalized + PREFIX_RANGE_END}
@@ -0,0 +1,165 @@
+# utils/thumbnails.py
+# Responsive course thumbnail variants.
+# Decoding/resizing/encoding is CPU bound, so it runs on a process pool (like
+# password hashing); when too much is waiting new thumbnails skip variants
+# rather than queueing. Pillow is optional - without it courses simply keep
+# only the original image.
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pymongo import ReturnDocument
+from dotenv import load_dotenv
+from models.mediaContentModel import MediaContent
+from models.courseModel import ThumbnailVariant
+from utils.media_store import media_store
+from utils.logger import get_logger
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Optional dependency: pip install Pillow
+    Image = None
+
+load_dotenv()
+logger = get_logger("thumbnails")
+
+THUMBNAIL_WIDTHS = [int(w) for w in os.getenv("THUMBNAIL_WIDTHS", "320,640,1280").split(",") if w.strip()]
+# "webp", "avif" or both (avif needs a Pillow build with libavif)
+THUMBNAIL_FORMATS = [f.strip().lower() for f in os.getenv("THUMBNAIL_FORMATS", "webp").split(",") if f.strip()]
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_POOL_SIZE = int(os.getenv("THUMBNAIL_POOL_SIZE", str(max((os.cpu_count() or 2) // 2, 1))))
+THUMBNAIL_QUEUE_LIMIT = int(os.getenv("THUMBNAIL_QUEUE_LIMIT", str(THUMBNAIL_POOL_SIZE * 4)))
+THUMBNAIL_FOLDER = "courses/variants"
+
+_pool = None
+_pending = 0
+
+
+def _render(data: bytes, widths, formats, quality: int):
+    """
+    Runs in a worker process. Returns [(width, height, format, bytes)]
+    Only pixels are written back out - EXIF, ICC and XMP are dropped.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)  # Bake in the orientation before EXIF is dropped
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    # Never upscale; an image narrower than every width still gets one variant
+    targets = sorted({width for width in widths if width < image.width}) or [image.width]
+    variants = []
+    for width in targets:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            out = io.BytesIO()
+            resized.save(out, format=fmt.upper(), quality=quality)
+            variants.append((width, height, fmt, out.getvalue()))
+    return variants
+
+
+def _supported_formats():
+    if Image is None:
+        return []
+    return [fmt for fmt in THUMBNAIL_FORMATS if features.check(fmt)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # forkserver: workers don't inherit the event loop, Mongo client or log threads
+        _pool = ProcessPoolExecutor(
+            max_workers=THUMBNAIL_POOL_SIZE, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker died, e.g. on a decompression bomb) so the next call starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def render_variants(data: bytes):
+    """Resized, re-encoded variants of an image; [] when Pillow or capacity is missing"""
+    global _pending
+    formats = _supported_formats()
+    if not formats:
+        return []
+    if _pending >= THUMBNAIL_QUEUE_LIMIT:
+        logger.warning("Thumbnail pool busy, skipping variants", extra={"pending": _pending})
+        return []
+    _pending += 1
+    pool = _get_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            pool, _render, data, THUMBNAIL_WIDTHS, formats, THUMBNAIL_QUALITY
+        )
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        logger.warning("Thumbnail worker died, skipping variants")
+        return []
+    finally:
+        _pending -= 1
+
+
+async def _upload_variant(width: int, height: int, fmt: str, body: bytes) -> dict:
+    result = await media_store.upload(io.BytesIO(body), folder=THUMBNAIL_FOLDER)
+    return {
+        "width": width,
+        "height": height,
+        "format": fmt,
+        "url": result["secure_url"],
+        "public_id": result["public_id"]
+    }
+
+
+async def ensure_variants(content: dict, data: bytes):
+    """
+    Variants for a stored thumbnail (a media_contents entry)
+    Rendered and uploaded once per distinct image; later courses using the
+    same bytes get the saved list. Failures leave the course with no variants.
+    """
+    if content.get("variants"):
+        return content["variants"]
+    try:
+        rendered = await render_variants(data)
+        if not rendered:
+            return []
+        variants = await asyncio.gather(*(_upload_variant(*variant) for variant in rendered))
+    except Exception as e:
+        logger.warning("Thumbnail variants failed", extra={"public_id": content.get("public_id"), "error": str(e)})
+        return []
+
+    saved = await MediaContent.get_pymongo_collection().find_one_and_update(
+        {"_id": content["_id"], "variants": {"$in": [None, []]}},
+        {"$set": {"variants": list(variants), "updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
+    )
+    if saved is None:
+        # Another request stored variants first (or the image was released) - drop ours
+        await asyncio.gather(
+            *(media_store.delete(variant["public_id"]) for variant in variants), return_exceptions=True
+        )
+        current = await MediaContent.get_pymongo_collection().find_one({"_id": content["_id"]}, {"variants": 1})
+        return (current or {}).get("variants") or []
+    return saved["variants"]
+
+
+def course_variants(variants) -> list:
+    """Course.thumbnail_variants entries for stored variants"""
+    return [
+        ThumbnailVariant(width=v["width"], height=v["height"], format=v["format"], url=v["url"])
+        for v in variants
+    ]
+
+
+def shutdown_thumbnail_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,168 @@
+# utils/uploads.py
+import os
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024  # 1MB read/write window per upload
+MAX_VIDEO_SIZE = 50 * 1024 * 1024  # 50MB
+# Whole bulk lesson request; each video is still capped at MAX_VIDEO_SIZE
+MAX_BULK_UPLOAD_SIZE = int(os.getenv("MAX_BULK_UPLOAD_SIZE", str(2 * 1024 * 1024 * 1024)))
+ALLOWED_VIDEO_TYPES = ["video/mp4", "video/mpeg", "video/quicktime", "video/x-msvideo", "video/webm"]
+# Extension a stored video gets for its (validated) declared type. Never taken
+# from the client's filename - an "x.html" must not be served back as HTML
+VIDEO_EXTENSIONS = {
+    "video/mp4": "mp4",
+    "video/mpeg": "mpeg",
+    "video/quicktime": "mov",
+    "video/x-msvideo": "avi",
+    "video/webm": "webm",
+}
+MULTIPART_OVERHEAD = 64 * 1024  # room for form fields and boundaries
+
+# Create videos folder if it doesn't exist
+VIDEOS_FOLDER = "videos"
+os.makedirs(VIDEOS_FOLDER, exist_ok=True)
+# In-progress writes; renamed into place once complete
+PARTIAL_SUFFIX = ".part"
+
+
+def video_extension(content_type: str) -> str:
+    """Stored extension for an allowed video type; 400 for anything else"""
+    extension = VIDEO_EXTENSIONS.get(content_type)
+    if not extension:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only MP4, MPEG, MOV, AVI, and WebM videos are allowed"
+        )
+    return extension
+
+
+def video_content_type(video_name: str) -> str:
+    """Content type for a stored video by its extension; octet-stream when it isn't an allowed one"""
+    extension = video_name.rsplit(".", 1)[-1].lower() if "." in video_name else ""
+    for content_type, allowed in VIDEO_EXTENSIONS.items():
+        if extension == allowed:
+            return content_type
+    return "application/octet-stream"
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)}MB"
+    )
+
+
+def _write_chunk(out_file, chunk: bytes, hasher):
+    out_file.write(chunk)
+    if hasher is not None:
+        hasher.update(chunk)
+
+
+async def save_upload_to_disk(
+    upload: UploadFile,
+    destination: str,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE,
+    hasher=None
+) -> int:
+    """
+    Stream an UploadFile to disk in bounded chunks
+    - Never holds more than one chunk in memory
+    - Aborts as soon as more than max_bytes have arrived
+    - Writes to `destination + PARTIAL_SUFFIX` and renames it into place, so
+      `destination` only ever exists complete
+    - Removes the partial file on any failure
+    - Feeds every chunk to `hasher` (hashlib object) when given
+    Returns the number of bytes written.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    written = 0
+    partial = destination + PARTIAL_SUFFIX
+    out_file = await run_in_threadpool(open, partial, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise _too_large(max_bytes)
+            await run_in_threadpool(_write_chunk, out_file, chunk, hasher)
+    except BaseException:
+        out_file.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    out_file.close()
+    await run_in_threadpool(os.replace, partial, destination)
+    return written
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies while they are still arriving
+    - Checks Content-Length up front when the client sends it
+    - Counts streamed bytes otherwise and stops reading past the limit
+    `limits` is a list of (method, path_prefix, max_file_bytes) tuples;
+    the body may exceed max_file_bytes by MULTIPART_OVERHEAD.
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, scope):
+        for method, prefix, max_file_bytes in self.limits:
+            if scope["method"] == method and scope["path"].startswith(prefix):
+                return max_file_bytes
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        max_file_bytes = self._limit_for(scope)
+        if max_file_bytes is None:
+            return await self.app(scope, receive, send)
+        max_bytes = max_file_bytes + MULTIPART_OVERHEAD
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            return await self._reject(send, max_file_bytes)
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise _too_large(max_file_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            if response_started or e.status_code != 413:
+                raise
+            await self._reject(send, max_file_bytes)
+
+    async def _reject(self, send, max_file_bytes):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": _too_large(max_file_bytes).detail}
+        )
+        await response({"type": "http"}, None, send)